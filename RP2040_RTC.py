@@ -1,388 +1,2564 @@
-# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
-#
-#    Raspberry Pi Pico RP2040 RTC Library
-#
-# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
-#
-# Adapted from code by DWiskow and danjperron:
-#   - https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1810708
-#   - https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1810679
-#
-# Also adapted from the Official Raspberry Pi Pico SDK:
-#   - https://github.com/raspberrypi/pico-sdk/blob/afc10f3599c27147a6f34781b7102d86f58aa5f6/src/rp2_common/hardware_rtc/rtc.c
-# 
-# RP2040 Datasheet:
-#   - Availible: https://datasheets.raspberrypi.org/rp2040/rp2040-datasheet.pdf
-#   - Datasheet last accessed on June 4th 2021
-#   - See section 4.8 for information about the pico's built in Real Time Clock
-#     (RTC)
-#   - Section 4.8.6 shows the RTC_BASE address (0x4005C000)
-#   - Section 4.8.6 shows details of the RD2040 setup registers used to program
-#     the RTC
-#   - Section 4.8.4 notes that writing to RTC registers can take 2 clock
-#     periods additional to the time it takes for the write to get to the
-#     system clock. A delay is thus implemented after upating RTC registers.
-#   - Also read section 2.1.2. on Atomic Register Access. Explanation of use of
-#     atomic register access by danjperron: 
-#     https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1811105
-#
-# IMPORTANT NOTES:
-#   - The Raspberry Pi Pico has no backup battery. RTC settings will be lost if
-#     power is lost.
-#   - This library will not set bit #8 of CTRL Register 0x4005e00c to force 'no
-#     leap year' for years divisible by 100. See RP2040 Datasheet section 4.8.6
-#     for info on this CTRL bit.
-#   - The Day Of The Week (DOTW) stored in the RP2040 register follows a format
-#     of '1-Monday…0-Sunday ISO 8601 mod 7', while Micropython's utime library
-#     follows a format of '0-6 for Mon-Sun'.
-#   - There is no timezone information
-#   - This library is largely incomplete, and only lightly tested.
-#
-# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
-# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
-# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
-# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
-# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
-# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
-# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
-# SOFTWARE.
-# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
-
-from machine import mem32
-from machine import disable_irq
-from machine import enable_irq
-
-from _thread import allocate_lock
-
-from utime import sleep_us
-
-from math import floor
-
-
-class rp2RTC:
-    """
-    Raspberry Pi Pico RTC class - functions that manage the internal RP2040
-    Real Time Clock
-    
-    ≡≡≡ Methods ≡≡≡
-    setRTC(year, month, day, hour, minute, second):
-        Sets the RP2040 internal RTC to a spectific date and time.
-    
-    localtime():
-        Returns the date and time stored in the RP2040 internal RTC.
-        
-    weekDay(year, month, day):
-        Calculates the weekday. 0 = Sunday, 6 = Saturday.
-        
-    isLeapYear(year):
-        Calculates whether a given year is a leap year.
-    
-    __validDateTime(year, month, day, hour, minute, second):
-        This method validates a set of date/time information.
-    
-    rtc_running():
-        Returns True if the RP2040 RTC is running
-    """
-    
-    # RP2040 RTC memory register constants
-    __RTC_BASE_MEM = 0x4005c000
-    __ATOMIC_BITMASK_SET = 0x2000
-
-    # Legal date/time field values for RP2040 RTC
-    __LEGAL_YEAR = range(4096)
-    __LEGAL_MONTH = range(1,13)
-    __LEGAL_DAY = range(1,32) # 1..[28,29,30,31], depending on the month
-    __LEGAL_HOUR = range(24)
-    __LEGAL_MINUTE = range(60)
-    __LEGAL_SECOND = range(60)
-
-    # Memory Address Offsets
-    __RTC_CTRL_RTC_ACTIVE_BITS = 0x00000002
-    
-    __RTC_RTC_0_DOTW_BITS = 0x07000000
-    __RTC_RTC_0_HOUR_BITS = 0x001f0000
-    __RTC_RTC_0_MIN_BITS = 0x00003f00
-    __RTC_RTC_0_SEC_BITS = 0x0000003f
-
-    __RTC_RTC_1_YEAR_BITS = 0x00fff000
-    __RTC_RTC_1_MONTH_BITS = 0x00000f00
-    __RTC_RTC_1_DAY_BITS = 0x0000001f
-    
-    __RTCAccessLock = allocate_lock()
-    
-    @staticmethod
-    def setRTC(year, month, day, hour, minute, second):        
-        """
-        Sets the RP2040 internal RTC to a specific date and time.
-        
-        ≡≡≡ Required Parameters ≡≡≡
-        year:   int, representing a valid year in the range of 0 - 4095
-        month:  int, representing a valid month in the range of 1 - 12
-        day:    int, representing a valid date in the range of 1..[28,29,30,31]
-        hour:   int, representing a valid hour in the range of 0 - 23
-        minute: int, representing a valid minute in the range of 0 - 59
-        second: int, representing a valid second in the range of 0 - 59
-        
-        ≡≡≡ Raises ≡≡≡
-        TypeError:  if the supplied parameter type is not an integer
-        ValueError: if the supplied parameter is outside the legal range
-        
-        ≡≡≡ Returns ≡≡≡
-        bool: True if successful, False if unsuccessful.
-        """
-        
-        # Make sure RTC is running
-        if not rp2RTC.rtc_running():
-            return False
-        
-        # Error Checking. Raises TypeError or ValueError
-        rp2RTC.__validDateTime(year, month, day, hour, minute, second)
-
-        # Get weekday
-        wday = rp2RTC.weekDay(year, month, day)
-        
-        clkPeriod_us = 0
-        
-        try:
-            # Find the period of one RTC clock cycle in microseconds
-            clk_rtcDivider = (mem32[rp2RTC.__RTC_BASE_MEM] & 0xffff) + 1 
-            clkPeriod_us = int(1000000 / clk_rtcDivider)
-            
-            # Enter critical section
-            #irqState = disable_irq()
-            
-            rp2RTC.__RTCAccessLock.acquire()
-
-            # Store date information to RTC registers
-            mem32[rp2RTC.__RTC_BASE_MEM + 4] = (year << 12) | (month  << 8) | day
-            mem32[rp2RTC.__RTC_BASE_MEM + 8] = ((hour << 16) | (minute << 8) | second) | (wday << 24)
-
-            # Set the LOAD bit in the CTRL register
-            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = 0x10
-
-        except:
-            raise
-
-        finally:
-            # End critical section
-            #enable_irq(irqState)
-            
-            rp2RTC.__RTCAccessLock.release()
-            
-            # Writing to the RTC registers will take 2 clk_rtc clock periods to
-            # arrive, additional to the clk_sys (system clock) domain, as per
-            # RP2040 Datasheet Section 4.8.4.
-            # Consequence: Reading localtime() too soon after updating the rtc
-            # registers will return the date/time of the RTC clock prior to the
-            # update.
-            sleep_us(clkPeriod_us * 3)
-
-        return True
-
-
-    @staticmethod
-    def localtime():
-        """
-        Returns the time stored in the RP2040 internal RTC.
-        
-        ≡≡≡ Returns ≡≡≡
-        tuple: (year, month, day, hour, minute, second, dotw)
-            year:   int, representing a year in the range of 0 - 4095
-            month:  int, representing a month in the range of 1 - 12
-            day:    int, representing a date in the range of 1 - 31
-            hour:   int, representing a hour in the range of 0 - 23
-            minute: int, representing a minute in the range of 0 - 59
-            second: int, representing a second in the range of 0 - 59
-            dotw:   int, representing the weekday (0 = Sun, 6 = Sat)
-        
-        bool: False if the onboard RTC is not running.
-        """
-        
-        # Make sure RTC is running
-        if not rp2RTC.rtc_running():
-            return False
- 
-        # Note: RTC_0 should be read before RTC_1
-        rtc_0 = mem32[rp2RTC.__RTC_BASE_MEM + 0x1c]
-        rtc_1 = mem32[rp2RTC.__RTC_BASE_MEM + 0x18]         
- 
-        dotw = (rtc_0 & rp2RTC.__RTC_RTC_0_DOTW_BITS ) >> 24
-        hour = (rtc_0 & rp2RTC.__RTC_RTC_0_HOUR_BITS ) >> 16
-        minute = (rtc_0 & rp2RTC.__RTC_RTC_0_MIN_BITS ) >> 8
-        second = (rtc_0 & rp2RTC.__RTC_RTC_0_SEC_BITS ) >> 0
-        year = (rtc_1 & rp2RTC.__RTC_RTC_1_YEAR_BITS ) >> 12
-        month = (rtc_1 & rp2RTC.__RTC_RTC_1_MONTH_BITS) >> 8
-        day = (rtc_1 & rp2RTC.__RTC_RTC_1_DAY_BITS ) >> 0
-
-        return (year, month, day, hour, minute, second, dotw)
-    
-    
-    @staticmethod
-    def weekDay(year, month, day, asString=False):
-        """
-        Calculates the weekday. 0 = Sunday, 6 = Saturday.
-        
-        ≡≡≡ Required Parameters ≡≡≡
-        year:   int, representing a valid year
-        month:  int, representing a valid month in the range of 1 - 12
-        day:    int, representing a valid date in the range of 1..[28,29,30,31]
-        
-        ≡≡≡ Optional Parameters ≡≡≡
-        asString: bool, if True the weekday is returned as a string.
-        
-        ≡≡≡ Returns ≡≡≡
-        int: represents the weekday where 0 = Sunday, 6 = Saturday.
-        str: weekday is returned as a string if 'asString' parameter = True
-        """
-        weekdayString=['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday',
-                       'Friday', 'Saturday']
-        # Doomsday dates by month
-        doomsdays = [3, 28, 14, 4, 9, 6, 11, 8, 5, 10, 7, 12] 
-        if rp2RTC.isLeapYear(year):
-            doomsdays[0] = 4
-            doomsdays[1] = 29
-        
-        # The year's anchor day for each doomsday
-        anchorDay = 2 + year + floor(year/4) - floor(year/100) + floor(year/400)
-
-        dayOfWeek = (day - doomsdays[month-1] + anchorDay) % 7
-        
-        if asString:
-            return weekdayString[dayOfWeek]
-        else:
-            return dayOfWeek
-
-
-    @staticmethod
-    def isLeapYear(year):
-        """
-        Calculates whether a given year is a leap year.
-        
-        ≡≡≡ Required Parameters ≡≡≡
-        year:   int, representing a valid 4-digit year
-        
-        ≡≡≡ Returns ≡≡≡
-        bool: True = is a leap year, False = is not a leap year
-        """
-        if year % 4 == 0 and year % 100 != 0:
-            return True
-        elif year % 400 == 0:
-            return True
-        else:
-            return False
-
-
-    @staticmethod
-    def __validDateTime(year, month, day, hour, minute, second):
-        """
-        This method validates a set of date/time information.
-        
-        ≡≡≡ Required Parameters ≡≡≡
-        year:   int, representing a valid year in the range of 0 - 4095
-        month:  int, representing a valid month in the range of 1 - 12
-        day:    int, representing a valid date in the range of 1..[28,29,30,31]
-        hour:   int, representing a valid hour in the range of 0 - 23
-        minute: int, representing a valid minute in the range of 0 - 59
-        second: int, representing a valid second in the range of 0 - 59
-        
-        ≡≡≡ Raises ≡≡≡
-        TypeError:  if the supplied parameter type is not an integer
-        ValueError: if the supplied parameter is outside the legal range
-        
-        ≡≡≡ Returns ≡≡≡
-        bool: True if the data types and values are legal
-        """
-        parameters = {'year'   : (year, rp2RTC.__LEGAL_YEAR),
-                      'month'  : (month, rp2RTC.__LEGAL_MONTH),
-                      'day'    : (day, rp2RTC.__LEGAL_DAY),
-                      'hour'   : (hour, rp2RTC.__LEGAL_HOUR),
-                      'minute' : (minute, rp2RTC.__LEGAL_MINUTE),
-                      'second' : (second, rp2RTC.__LEGAL_SECOND)
-                      }
-
-
-        # Check if inputs are integers
-        for key in parameters:
-            if not isinstance(parameters[key][0], int):
-                raise TypeError('Parameter ' +
-                                key +
-                                ' received parameter of type ' +
-                                str(type(parameters[key][0])) +
-                                ' - expected parameter of type \'int\'.')
-
-
-        # Check if inputs are valid integers
-        err = False
-        errMin = 0
-        errMax = 0
-
-        for key in parameters:
-            
-            # Check the 'day' parameter
-            if key == 'day':
-                # If month is not valid, allow it to fail when processing its
-                # own key
-                if parameters['month'][0] not in parameters['month'][1]:
-                    break
-                
-                # Months with 30 days:
-                elif parameters['month'][0] in [4,6,9,11] and parameters[key][0] not in range(1,31):
-                    err = True
-                    errMin = 1
-                    errMax = 30
-                
-                # February:
-                elif parameters['month'][0] == 2 and parameters[key][0] not in range(1,29):                  
-                    errMin = 1
-                    if rp2RTC.isLeapYear(parameters['year'][0]):
-                        errMax = 29
-                    else:
-                        errMax = 28
-                    
-                    if parameters[key][0] not in range(1,errMax + 1):
-                       err = True 
-                
-                # Months with 31 days:
-                elif parameters[key][0] not in range(1,32):
-                    err = True
-                    errMin = 1
-                    errMax = 31
-                
-                    
-            # Check all parameters other than 'day'
-            elif parameters[key][0] not in parameters[key][1]:
-                err = True
-                errMin = min(parameters[key][1])
-                errMax = max(parameters[key][1])
-                
-            if err:
-                errMsg = ('Parameter \'' +
-                          key +
-                          '\' received value of ' +
-                          str(parameters[key][0]) +
-                          ' - must supply an integer from ' +
-                          str(errMin) +
-                          ' to ' +
-                          str(errMax) +
-                          ' inclusive')
-                
-                if key == 'day':
-                    errMsg += ' for month ' + str(parameters['month'][0])
-                              
-                raise ValueError(errMsg)
-        else:
-            return True
-
-
-    @staticmethod
-    def rtc_running():
-        """Returns True if the RP2040 RTC is running
-        
-        ≡≡≡ Returns ≡≡≡
-        bool: True if the RP2040 RTC is running, False if it is not running
-        """
-        ctrlRegister = mem32[rp2RTC.__RTC_BASE_MEM + 0x0c]
-        if (ctrlRegister & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS) > 0:
-            return True
-        else:
-            return False
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    Raspberry Pi Pico RP2040 RTC Library
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Adapted from code by DWiskow and danjperron:
+#   - https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1810708
+#   - https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1810679
+#
+# Also adapted from the Official Raspberry Pi Pico SDK:
+#   - https://github.com/raspberrypi/pico-sdk/blob/afc10f3599c27147a6f34781b7102d86f58aa5f6/src/rp2_common/hardware_rtc/rtc.c
+# 
+# RP2040 Datasheet:
+#   - Availible: https://datasheets.raspberrypi.org/rp2040/rp2040-datasheet.pdf
+#   - Datasheet last accessed on June 4th 2021
+#   - See section 4.8 for information about the pico's built in Real Time Clock
+#     (RTC)
+#   - Section 4.8.6 shows the RTC_BASE address (0x4005C000)
+#   - Section 4.8.6 shows details of the RD2040 setup registers used to program
+#     the RTC
+#   - Section 4.8.4 notes that writing to RTC registers can take 2 clock
+#     periods additional to the time it takes for the write to get to the
+#     system clock. A delay is thus implemented after upating RTC registers.
+#   - Also read section 2.1.2. on Atomic Register Access. Explanation of use of
+#     atomic register access by danjperron: 
+#     https://www.raspberrypi.org/forums/viewtopic.php?f=146&t=300275&p=1807232#p1811105
+#
+# IMPORTANT NOTES:
+#   - The Raspberry Pi Pico has no backup battery. RTC settings will be lost if
+#     power is lost.
+#   - This library will not set bit #8 of CTRL Register 0x4005e00c to force 'no
+#     leap year' for years divisible by 100. See RP2040 Datasheet section 4.8.6
+#     for info on this CTRL bit.
+#   - The Day Of The Week (DOTW) stored in the RP2040 register follows a format
+#     of '1-Monday…0-Sunday ISO 8601 mod 7', while Micropython's utime library
+#     follows a format of '0-6 for Mon-Sun'.
+#   - The RTC has no timezone information. Keep it in UTC and pass an
+#     RP2040_RTC_tz.rp2RTCTimezone to localtime() for local time.
+#   - This library is largely incomplete, and only lightly tested.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+try:
+    from machine import mem32
+    from machine import disable_irq
+    from machine import enable_irq
+except ImportError:
+    # Not running on an RP2040 (e.g. CPython on a development host). A register
+    # backend, such as RP2040_RTC_sim.rp2RTCSim, must be installed with
+    # rp2RTC.setBackend() before the RTC can be accessed.
+    mem32 = None
+
+_DEFAULT_MEM32 = mem32
+
+try:
+    # Finishes the time sets started by rp2RTC.setRTC_nowait()
+    from machine import Timer as _Timer
+except ImportError:
+    _Timer = None
+
+try:
+    from micropython import schedule as _schedule
+except ImportError:
+    _schedule = None
+
+from _thread import allocate_lock
+
+try:
+    from utime import sleep_us
+    from utime import ticks_us
+    from utime import ticks_ms
+    from utime import ticks_add
+    from utime import ticks_diff
+except ImportError:
+    from time import sleep as _sleep
+    from time import perf_counter_ns as _perf_counter_ns
+
+    def sleep_us(us):
+        _sleep(us / 1000000)
+
+    # Same wraparound (period 2**30) as MicroPython's ticks functions
+    _TICKS_MAX = 0x3fffffff
+    _TICKS_HALFPERIOD = 0x20000000
+
+    def ticks_us():
+        return (_perf_counter_ns() // 1000) & _TICKS_MAX
+
+    def ticks_ms():
+        return (_perf_counter_ns() // 1000000) & _TICKS_MAX
+
+    def ticks_add(ticks, delta):
+        return (ticks + delta) & _TICKS_MAX
+
+    def ticks_diff(ticks1, ticks2):
+        return (((ticks1 - ticks2 + _TICKS_HALFPERIOD) & _TICKS_MAX) -
+                _TICKS_HALFPERIOD)
+
+_DEFAULT_SLEEP_US = sleep_us
+_DEFAULT_TICKS_US = ticks_us
+
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# Lock wait and settle time counting in setRTC(), setRTC_nowait() and
+# setClockDivider(), see rp2RTC.instrument(). Set to const(0) to compile the
+# checks out of those methods.
+_INSTRUMENTATION = const(1)
+
+from array import array
+
+try:
+    # Only used by the bulk (_many) methods, when given NumPy arrays
+    import numpy as _np
+except ImportError:
+    _np = None
+
+try:
+    # Native/viper versions of the hot paths, see rp2RTC.useNative(). Cannot be
+    # compiled where the native code emitters are not availible.
+    import RP2040_RTC_native as _native
+except (ImportError, SyntaxError):
+    _native = None
+
+
+class rp2RTC:
+    """
+    Raspberry Pi Pico RTC class - functions that manage the internal RP2040
+    Real Time Clock
+    
+    ≡≡≡ Methods ≡≡≡
+    setRTC(year, month, day, hour, minute, second):
+        Sets the RP2040 internal RTC to a spectific date and time.
+    
+    setRTC_nowait(year, month, day, hour, minute, second):
+        Starts setting the RP2040 internal RTC without waiting, returning a
+        handle that is polled for completion. A one-shot timer completes it
+        if the handle is not polled.
+    
+    setRTC_async(year, month, day, hour, minute, second):
+        Sets the RP2040 internal RTC, yielding to the uasyncio scheduler until
+        the new time is latched.
+    
+    localtime(tz=None):
+        Returns the date and time stored in the RP2040 internal RTC, or the
+        local time in a timezone.
+    
+    localtime_into(buf):
+        Stores the date and time from the RP2040 internal RTC into 'buf'
+        without allocating memory.
+    
+    time(epoch=EPOCH_UNIX):
+        Returns the seconds since the epoch stored in the RP2040 internal RTC.
+    
+    raw_now():
+        Returns the time stored in the RP2040 internal RTC as a packed int
+        that orders chronologically.
+    
+    readRegisters(words=None, index=0):
+        Reads the raw RTC_1 and RTC_0 registers, optionally into 'words'
+        without allocating memory.
+    
+    raw_pack(year, month, day, hour, minute, second):
+        Packs a date and time into a raw value.
+    
+    raw_field(raw, field):
+        Decodes a single field of a raw value.
+    
+    raw_diff(raw1, raw2):
+        Calculates the seconds between two raw values.
+    
+    raw_add(raw, seconds):
+        Adds a number of seconds to a raw value.
+    
+    time_us(epoch=EPOCH_UNIX):
+        Returns the seconds since the epoch, the microseconds since the start
+        of that second and an error bound, using ticks_us().
+    
+    syncEdge(epoch=EPOCH_UNIX, timeout_us=1100000):
+        Waits for the RTC seconds to change, to align time_us() with the RTC.
+    
+    syncRTC(seconds, us=0, ticks=None, epoch=EPOCH_UNIX):
+        Sets the RP2040 internal RTC so that its seconds start on the seconds
+        of a reference time, returning the alignment error.
+        
+    weekDay(year, month, day):
+        Calculates the weekday. 0 = Sunday, 6 = Saturday.
+        
+    isLeapYear(year):
+        Calculates whether a given year is a leap year.
+    
+    useWeekdayTable(enable=True):
+        Makes weekDay() use a precomputed table of anchor days and leap years.
+    
+    buildWeekdayTable():
+        Returns the packed anchor day/leap year table for years 0 - 4095.
+    
+    __validDateTime(year, month, day, hour, minute, second):
+        This method validates a set of date/time information.
+    
+    validate(year, month, day, hour, minute, second):
+        Validates a set of date/time information, raising TypeError or
+        ValueError.
+    
+    validate_code(year, month, day, hour, minute, second):
+        Validates a set of date/time information, returning an error code
+        instead of raising an exception.
+    
+    validationMessage(code, year, month, day, hour, minute, second):
+        Describes an error code returned by validate_code().
+    
+    weekDay_many(years, months, days, out=None):
+        Calculates the weekdays of arrays of dates.
+    
+    validate_many(years, months, days, hours, minutes, seconds, out=None):
+        Validates arrays of date/time information.
+    
+    daysFromCivil(year, month, day):
+        Calculates the number of days from 1970-01-01 to a date.
+    
+    civilFromDays(days):
+        Calculates the date that is a number of days from 1970-01-01.
+    
+    gmtime(t, epoch=EPOCH_UNIX):
+        Converts seconds since the epoch to a date and time.
+    
+    mktime(t, epoch=EPOCH_UNIX):
+        Converts a date and time to seconds since the epoch.
+    
+    add_seconds(t, seconds):
+        Adds a number of seconds to a date and time.
+    
+    diff_seconds(t1, t2):
+        Calculates the number of seconds between two dates and times.
+    
+    calendar(start, end=(4095, 12, 31), step=1, months=False):
+        Returns a generator of the dates in a range, with their weekdays.
+    
+    rtc_running():
+        Returns True if the RP2040 RTC is running
+    
+    clockDivider():
+        Returns the number of clk_rtc cycles per RTC second.
+    
+    setClockDivider(divider):
+        Changes the number of clk_rtc cycles per RTC second, e.g. to trim the
+        RTC's rate.
+    
+    consistentReads(enable=True):
+        Enables re-reading RTC_0 to guarantee that RTC_0 and RTC_1 belong to
+        the same second.
+    
+    readRetries(reset=False):
+        Returns the number of re-reads done by consistent snapshot reads.
+    
+    arm():
+        Checks once that the RTC is running, so that later calls can skip the
+        check.
+    
+    disarm():
+        Drops the cached running state of arm().
+    
+    setBackend(registers, sleep=None, ticks=None):
+        Replaces the register backend used in place of machine.mem32.
+    
+    useNative(enable=True):
+        Switches the hot paths between native/viper code and pure Python.
+    
+    instrument(enable=True):
+        Records call counts, latency histograms, lock waits and settle times.
+    
+    stats(reset=False):
+        Returns the statistics recorded since instrument() was enabled.
+    """
+    
+    # RP2040 RTC memory register constants
+    __RTC_BASE_MEM = 0x4005c000
+    __ATOMIC_BITMASK_SET = 0x2000
+    __ATOMIC_BITMASK_CLR = 0x3000
+
+    # Precomputed register addresses. These are above MicroPython's small int
+    # range, so computing them on each access would allocate on the heap.
+    __RTC_CTRL_MEM = __RTC_BASE_MEM + 0x0c
+    __RTC_RTC_1_MEM = __RTC_BASE_MEM + 0x18
+    __RTC_RTC_0_MEM = __RTC_BASE_MEM + 0x1c
+
+    # Legal date/time field values for RP2040 RTC, as (min, max) inclusive,
+    # indexed by the FIELD_ constants
+    __FIELD_LIMITS = ((0, 4095), # year
+                      (1, 12),   # month
+                      (1, 31),   # day: 1..[28,29,30,31], depending on the month
+                      (0, 23),   # hour
+                      (0, 59),   # minute
+                      (0, 59))   # second
+    __FIELD_NAMES = ('year', 'month', 'day', 'hour', 'minute', 'second')
+    
+    # Date/time fields and error codes returned by validate_code()
+    FIELD_YEAR = 0
+    FIELD_MONTH = 1
+    FIELD_DAY = 2
+    FIELD_HOUR = 3
+    FIELD_MINUTE = 4
+    FIELD_SECOND = 5
+    
+    VALID = 0
+    ERR_TYPE = 0x10
+    ERR_VALUE = 0x20
+
+    # Memory Address Offsets
+    __RTC_CTRL_RTC_ENABLE_BITS = 0x00000001
+    __RTC_CTRL_RTC_ACTIVE_BITS = 0x00000002
+    __RTC_CTRL_LOAD_BITS = 0x00000010
+    
+    __RTC_RTC_0_DOTW_BITS = 0x07000000
+    __RTC_RTC_0_HOUR_BITS = 0x001f0000
+    __RTC_RTC_0_MIN_BITS = 0x00003f00
+    __RTC_RTC_0_SEC_BITS = 0x0000003f
+
+    __RTC_RTC_1_YEAR_BITS = 0x00fff000
+    __RTC_RTC_1_MONTH_BITS = 0x00000f00
+    __RTC_RTC_1_DAY_BITS = 0x0000001f
+    
+    # Raw values (see raw_now()): the RTC_1 date fields above the RTC_0 time
+    # fields, and the shift and mask of each field, indexed by the FIELD_
+    # constants
+    __RAW_DATE_BITS = 0x00ffff1f
+    __RAW_TIME_BITS = 0x001f3f3f
+    __RAW_DATE_SHIFT = 24
+    __RAW_SHIFTS = (36, 32, 24, 16, 8, 0)
+    __RAW_MASKS = (0xfff, 0xf, 0x1f, 0x1f, 0x3f, 0x3f)
+    
+    __RTCAccessLock = allocate_lock()
+    
+    # Selectable epochs for time()
+    EPOCH_UNIX = 1970
+    EPOCH_MICROPYTHON = 2000
+    
+    # Cache for time(): (RTC_1 date word, epoch, seconds from the epoch to the
+    # start of that date). Replaced as a whole so readers never see a mix.
+    __timeCache = (-1, -1, 0)
+    
+    # Second edge for time_us(): (ticks_us() at the start of the second,
+    # ticks_ms() at the same time, seconds since the epoch, epoch, error in
+    # microseconds), or None. Replaced as a whole so readers never see a mix.
+    __edge = None
+    
+    # Previous register read of time_us(): (ticks_us() before the read,
+    # seconds since the epoch, epoch), or None
+    __edgeLast = None
+    
+    # Sequence counter of writes to the RTC registers, a seqlock: odd while
+    # setRTC(), setRTC_nowait() or setClockDivider() is writing the registers
+    # or waiting for them to settle, and incremented again once done.
+    # Writers hold __RTCAccessLock, readers take no lock and read again if the
+    # counter was odd or changed, up to __SEQUENCE_SPINS times (so that an
+    # interrupt handler cannot spin forever on a write it interrupted).
+    __sequence = array('I', [0])
+    __SEQUENCE_SPINS = 1000
+    
+    # Register words read by localtime_into(), see readRegisters()
+    __words = array('I', [0, 0])
+    
+    # Microseconds from the start of the register writes of syncRTC() until
+    # the RTC restarts, as measured by the last syncRTC(), or None before the
+    # first (5 clk_rtc periods are assumed). syncRTC() starts writing this long
+    # before the reference second.
+    __syncDelay_us = None
+    
+    # Shortest time before the reference second in which syncRTC() can
+    # prepare the write, otherwise the following second is used
+    __SYNC_LEAD_US = 2000
+    
+    # Consistent snapshot reads, see consistentReads()
+    __READ_RETRIES = 3
+    __consistentReads = False
+    __readRetries = 0
+    
+    # Cached RTC running state, see arm()
+    __armed = False
+    
+    # Weekday calculation
+    __WEEKDAY_STRINGS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday',
+                         'Thursday', 'Friday', 'Saturday')
+    __DOOMSDAYS = (3, 28, 14, 4, 9, 6, 11, 8, 5, 10, 7, 12)
+    
+    # Month lengths in a non-leap year
+    __MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+    
+    # Packed anchor day/leap year table, see useWeekdayTable()
+    __weekdayTable = None
+    
+    # Native code requested, see useNative()
+    __native = False
+    
+    # Instrumentation, see instrument(). __stats holds a record per
+    # instrumented method while enabled, and is None while disabled:
+    # [calls, total us, max us, lock waits, lock wait us, settle us,
+    #  then the latency histogram]. __wrapped holds the (method, timing
+    # wrapper) installed in place of each method.
+    # localtime_into() is not wrapped, as the wrapper would allocate.
+    __INSTRUMENTED = ('setRTC', 'setRTC_nowait', 'localtime', 'time',
+                      'raw_now', 'time_us', 'syncEdge', 'syncRTC',
+                      'setClockDivider')
+    __HISTOGRAM_BUCKETS = 16
+    __stats = None
+    __wrapped = {}
+    
+    # States of a time set started by setRTC_nowait()
+    __SET_DONE = 0
+    __SET_STOPPING = 1
+    __SET_STARTING = 2
+    
+    @staticmethod
+    def setRTC(year, month, day, hour, minute, second):        
+        """
+        Sets the RP2040 internal RTC to a specific date and time.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if successful, False if unsuccessful.
+        """
+        
+        # Make sure RTC is running
+        if not rp2RTC.__armed and not rp2RTC.rtc_running():
+            return False
+        
+        # The RTC is reconfigured, so the cached running state and second edge
+        # are dropped
+        rp2RTC.__armed = False
+        rp2RTC.__edge = None
+        rp2RTC.__edgeLast = None
+        
+        # Error Checking. Raises TypeError or ValueError
+        rp2RTC.__validDateTime(year, month, day, hour, minute, second)
+
+        # Get weekday
+        wday = rp2RTC.weekDay(year, month, day)
+        
+        # Find the period of one RTC clock cycle in microseconds
+        clk_rtcDivider = (mem32[rp2RTC.__RTC_BASE_MEM] & 0xffff) + 1 
+        clkPeriod_us = int(1000000 / clk_rtcDivider)
+        
+        # Enter critical section
+        #irqState = disable_irq()
+        
+        if _INSTRUMENTATION and rp2RTC.__stats is not None:
+            rp2RTC.__acquireCounted('setRTC')
+        else:
+            rp2RTC.__RTCAccessLock.acquire()
+        
+        # Readers retry until the write has settled
+        sequence = rp2RTC.__sequence
+        sequence[0] = (sequence[0] + 1) & 0x3fffffff
+        
+        try:
+            # Store date information to RTC registers
+            mem32[rp2RTC.__RTC_BASE_MEM + 4] = (year << 12) | (month  << 8) | day
+            mem32[rp2RTC.__RTC_BASE_MEM + 8] = ((hour << 16) | (minute << 8) | second) | (wday << 24)
+
+            # Set the LOAD bit in the CTRL register
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = 0x10
+
+        finally:
+            # Writing to the RTC registers will take 2 clk_rtc clock periods to
+            # arrive, additional to the clk_sys (system clock) domain, as per
+            # RP2040 Datasheet Section 4.8.4.
+            # Consequence: Reading localtime() too soon after updating the rtc
+            # registers will return the date/time of the RTC clock prior to the
+            # update. The lock is held, and the sequence odd, until then.
+            if _INSTRUMENTATION and rp2RTC.__stats is not None:
+                record = rp2RTC.__stats['setRTC']
+                start = ticks_us()
+                sleep_us(clkPeriod_us * 3)
+                record[5] += ticks_diff(ticks_us(), start)
+            else:
+                sleep_us(clkPeriod_us * 3)
+            
+            sequence[0] = (sequence[0] + 1) & 0x3fffffff
+            
+            # End critical section
+            #enable_irq(irqState)
+            
+            rp2RTC.__RTCAccessLock.release()
+
+        return True
+    
+    
+    @staticmethod
+    def setRTC_nowait(year, month, day, hour, minute, second):
+        """
+        Starts setting the RP2040 internal RTC to a specific date and time,
+        without blocking. The update follows the sequence of the Pico SDK's
+        rtc_set_datetime():
+            1. RTC_ENABLE is cleared (by this method)
+            2. once RTC_ACTIVE is clear, the SETUP registers are written, and
+               LOAD and RTC_ENABLE are set
+            3. once RTC_ACTIVE is set again, the new time has been latched
+        Each step takes about 2 clk_rtc periods to reach the RTC.
+        
+        The returned handle's done() method polls the RTC registers and
+        completes the update. It does not have to be called: a one-shot
+        machine.Timer also advances it every millisecond (through
+        micropython.schedule()) until the update is complete, so the RTC is
+        never left stopped. The timer does not wait for the RTC access lock:
+        if other code holds it, the step is retried on the next tick. Where machine.Timer is not availible (e.g.
+        CPython), the update is only completed by done(), wait() or
+        setRTC_async().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        rp2RTCPendingSet: handle for the update, see rp2RTCPendingSet.done()
+        bool: False if the onboard RTC is not running.
+        """
+        
+        # Make sure RTC is running
+        if not rp2RTC.__armed and not rp2RTC.rtc_running():
+            return False
+        
+        # The RTC is reconfigured, so the cached running state and second edge
+        # are dropped
+        rp2RTC.__armed = False
+        rp2RTC.__edge = None
+        rp2RTC.__edgeLast = None
+        
+        # Error Checking. Raises TypeError or ValueError
+        rp2RTC.__validDateTime(year, month, day, hour, minute, second)
+
+        # Get weekday
+        wday = rp2RTC.weekDay(year, month, day)
+        
+        if _INSTRUMENTATION and rp2RTC.__stats is not None:
+            rp2RTC.__acquireCounted('setRTC_nowait')
+        else:
+            rp2RTC.__RTCAccessLock.acquire()
+        sequence = rp2RTC.__sequence
+        sequence[0] = (sequence[0] + 1) & 0x3fffffff
+        try:
+            # Stop the RTC, the new time is written once it has stopped
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_CLR + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+        finally:
+            sequence[0] = (sequence[0] + 1) & 0x3fffffff
+            rp2RTC.__RTCAccessLock.release()
+        
+        return rp2RTCPendingSet(rp2RTC.__setStep,
+                                rp2RTC.__SET_STOPPING,
+                                (year << 12) | (month  << 8) | day,
+                                ((hour << 16) | (minute << 8) | second) | (wday << 24))
+    
+    
+    @staticmethod
+    async def setRTC_async(year, month, day, hour, minute, second):
+        """
+        Sets the RP2040 internal RTC to a specific date and time, yielding to
+        the uasyncio scheduler while waiting for the RTC to latch the new time.
+        See setRTC_nowait().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if successful, False if unsuccessful.
+        """
+        # Imported here, so that only programs using setRTC_async() pay for
+        # loading uasyncio
+        try:
+            import uasyncio as asyncio
+        except ImportError:
+            import asyncio
+        
+        pending = rp2RTC.setRTC_nowait(year, month, day, hour, minute, second)
+        if pending is False:
+            return False
+        
+        while not pending.done():
+            await asyncio.sleep(0)
+        
+        return True
+    
+    
+    @staticmethod
+    def __setStep(state, setup_0, setup_1, blocking):
+        """
+        Advances a time set started by setRTC_nowait() by polling RTC_ACTIVE.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        state:    int, current state (__SET_STOPPING or __SET_STARTING)
+        setup_0:  int, value to write to the SETUP_0 register (date)
+        setup_1:  int, value to write to the SETUP_1 register (time)
+        blocking: bool, False to leave the state unchanged instead of waiting
+                  for the RTC access lock. The lock is not reentrant, so a
+                  step run by micropython.schedule() between the bytecodes of
+                  code holding it (e.g. syncRTC()) would otherwise deadlock.
+        
+        ≡≡≡ Returns ≡≡≡
+        int: the new state, __SET_DONE once the new time has been latched
+        """
+        active = mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS
+        
+        if state == rp2RTC.__SET_STOPPING:
+            if active:
+                return state
+            
+            if not blocking:
+                if not rp2RTC.__RTCAccessLock.acquire(0):
+                    return state
+            elif _INSTRUMENTATION and rp2RTC.__stats is not None:
+                rp2RTC.__acquireCounted('setRTC_nowait')
+            else:
+                rp2RTC.__RTCAccessLock.acquire()
+            sequence = rp2RTC.__sequence
+            sequence[0] = (sequence[0] + 1) & 0x3fffffff
+            try:
+                mem32[rp2RTC.__RTC_BASE_MEM + 4] = setup_0
+                mem32[rp2RTC.__RTC_BASE_MEM + 8] = setup_1
+                mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = rp2RTC.__RTC_CTRL_LOAD_BITS
+                mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+            finally:
+                sequence[0] = (sequence[0] + 1) & 0x3fffffff
+                rp2RTC.__RTCAccessLock.release()
+            return rp2RTC.__SET_STARTING
+        
+        if state == rp2RTC.__SET_STARTING and not active:
+            return state
+        
+        return rp2RTC.__SET_DONE
+
+
+    @staticmethod
+    def readRegisters(words=None, index=0):
+        """
+        Reads the raw RTC_1 (date) and RTC_0 (time) registers. This is the
+        only place they are read for the time, by localtime(),
+        localtime_into(), time(), raw_now(), rp2RTCRing.append(),
+        rp2RTCAlarm.poll() and the QUERY request of rp2RTCSync, and the
+        reader for other modules that need the raw registers.
+        
+        RTC_0 is read before RTC_1. The registers are read again while
+        setRTC(), setRTC_nowait() or setClockDivider() is writing them (see
+        __sequence), up to __SEQUENCE_SPINS times, and until RTC_0 is
+        unchanged if consistentReads() is enabled. Each re-read is counted in
+        readRetries(). No lock is taken, and whether the RTC is running is not
+        checked.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        words:  array('I') to store the registers in, at words[index] (RTC_1)
+                and words[index + 1] (RTC_0), so that nothing is allocated on
+                the heap. By default they are returned as a tuple.
+        index:  int, position in words
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (rtc_1, rtc_0), or None if words is given
+        """
+        sequence = rp2RTC.__sequence
+        spins = rp2RTC.__SEQUENCE_SPINS
+        while True:
+            start = sequence[0]
+            rtc_0 = mem32[rp2RTC.__RTC_RTC_0_MEM]
+            rtc_1 = mem32[rp2RTC.__RTC_RTC_1_MEM]
+            if (start == sequence[0] and not start & 1) or not spins:
+                break
+            spins -= 1
+            rp2RTC.__readRetries += 1
+        
+        if rp2RTC.__consistentReads:
+            # Re-read until RTC_0 is unchanged, so RTC_1 belongs to the same
+            # second (see consistentReads())
+            retries = rp2RTC.__READ_RETRIES
+            while retries and mem32[rp2RTC.__RTC_RTC_0_MEM] != rtc_0:
+                rtc_0 = mem32[rp2RTC.__RTC_RTC_0_MEM]
+                rtc_1 = mem32[rp2RTC.__RTC_RTC_1_MEM]
+                retries -= 1
+                rp2RTC.__readRetries += 1
+        
+        if words is None:
+            return (rtc_1, rtc_0)
+        words[index] = rtc_1
+        words[index + 1] = rtc_0
+    
+    
+    @staticmethod
+    def localtime(tz=None):
+        """
+        Returns the time stored in the RP2040 internal RTC.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        tz:     rp2RTCTimezone (see RP2040_RTC_tz.py), to return the local
+                time of a timezone instead. The RTC must be set to UTC.
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw)
+            year:   int, representing a year in the range of 0 - 4095
+            month:  int, representing a month in the range of 1 - 12
+            day:    int, representing a date in the range of 1 - 31
+            hour:   int, representing a hour in the range of 0 - 23
+            minute: int, representing a minute in the range of 0 - 59
+            second: int, representing a second in the range of 0 - 59
+            dotw:   int, representing the weekday (0 = Sun, 6 = Sat)
+        
+        bool: False if the onboard RTC is not running.
+        """
+        if tz is not None:
+            return tz.localtime()
+        
+        # Make sure RTC is running
+        if not rp2RTC.__armed and not rp2RTC.rtc_running():
+            return False
+ 
+        (rtc_1, rtc_0) = rp2RTC.readRegisters()
+ 
+        dotw = (rtc_0 & rp2RTC.__RTC_RTC_0_DOTW_BITS ) >> 24
+        hour = (rtc_0 & rp2RTC.__RTC_RTC_0_HOUR_BITS ) >> 16
+        minute = (rtc_0 & rp2RTC.__RTC_RTC_0_MIN_BITS ) >> 8
+        second = (rtc_0 & rp2RTC.__RTC_RTC_0_SEC_BITS ) >> 0
+        year = (rtc_1 & rp2RTC.__RTC_RTC_1_YEAR_BITS ) >> 12
+        month = (rtc_1 & rp2RTC.__RTC_RTC_1_MONTH_BITS) >> 8
+        day = (rtc_1 & rp2RTC.__RTC_RTC_1_DAY_BITS ) >> 0
+
+        return (year, month, day, hour, minute, second, dotw)
+    
+    
+    @staticmethod
+    def localtime_into(buf):
+        """
+        Stores the time from the RP2040 internal RTC into a preallocated
+        buffer. Nothing is allocated on the heap, so this method may be called
+        while micropython.heap_lock() is held. The registers are read through
+        one preallocated array, so it should not be called from an interrupt
+        handler that can interrupt another call (use rp2RTCRing.append()).
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        buf:    array('H'), array('I') or list with at least 7 elements. The
+                first 7 are set to (year, month, day, hour, minute, second,
+                dotw), as returned by localtime().
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if successful, False if the onboard RTC is not running
+              (buf is not modified).
+        """
+        
+        # Make sure RTC is running. rtc_running() is not used, as it computes
+        # the CTRL register address.
+        if (not rp2RTC.__armed and
+                not mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS):
+            return False
+        
+        # The registers are read into preallocated words, as returning them
+        # would allocate a tuple
+        words = rp2RTC.__words
+        rp2RTC.readRegisters(words)
+        rtc_1 = words[0]
+        rtc_0 = words[1]
+        
+        buf[0] = (rtc_1 & rp2RTC.__RTC_RTC_1_YEAR_BITS ) >> 12
+        buf[1] = (rtc_1 & rp2RTC.__RTC_RTC_1_MONTH_BITS) >> 8
+        buf[2] = (rtc_1 & rp2RTC.__RTC_RTC_1_DAY_BITS ) >> 0
+        buf[3] = (rtc_0 & rp2RTC.__RTC_RTC_0_HOUR_BITS ) >> 16
+        buf[4] = (rtc_0 & rp2RTC.__RTC_RTC_0_MIN_BITS ) >> 8
+        buf[5] = (rtc_0 & rp2RTC.__RTC_RTC_0_SEC_BITS ) >> 0
+        buf[6] = (rtc_0 & rp2RTC.__RTC_RTC_0_DOTW_BITS ) >> 24
+        
+        return True
+    
+    
+    @staticmethod
+    def time(epoch=EPOCH_UNIX):
+        """
+        Returns the time stored in the RP2040 internal RTC as seconds since the
+        epoch. The seconds from the epoch to the start of the current day are
+        cached, and only recalculated when the date in RTC_1 changes.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        epoch:  int, the year of the epoch (January 1st, 00:00:00). Use
+                rp2RTC.EPOCH_UNIX (1970, default) or rp2RTC.EPOCH_MICROPYTHON
+                (2000, as used by utime.time()).
+        
+        ≡≡≡ Returns ≡≡≡
+        int: seconds since the epoch, negative for times before the epoch
+        
+        bool: False if the onboard RTC is not running.
+        """
+        
+        # Make sure RTC is running
+        if (not rp2RTC.__armed and
+                not mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS):
+            return False
+        
+        (rtc_1, rtc_0) = rp2RTC.readRegisters()
+        
+        cache = rp2RTC.__timeCache
+        if cache[0] != rtc_1 or cache[1] != epoch:
+            days = (rp2RTC.daysFromCivil(
+                        (rtc_1 & rp2RTC.__RTC_RTC_1_YEAR_BITS ) >> 12,
+                        (rtc_1 & rp2RTC.__RTC_RTC_1_MONTH_BITS) >> 8,
+                        (rtc_1 & rp2RTC.__RTC_RTC_1_DAY_BITS ) >> 0) -
+                    rp2RTC.daysFromCivil(epoch, 1, 1))
+            cache = (rtc_1, epoch, days * 86400)
+            rp2RTC.__timeCache = cache
+        
+        return (cache[2] +
+                ((rtc_0 & rp2RTC.__RTC_RTC_0_HOUR_BITS ) >> 16) * 3600 +
+                ((rtc_0 & rp2RTC.__RTC_RTC_0_MIN_BITS ) >> 8) * 60 +
+                (rtc_0 & rp2RTC.__RTC_RTC_0_SEC_BITS ))
+    
+    
+    @staticmethod
+    def raw_now():
+        """
+        Returns the time stored in the RP2040 internal RTC as a single int
+        packing the RTC_1 date and RTC_0 time fields, without decoding them:
+        
+            year << 36 | month << 32 | day << 24 | hour << 16 | minute << 8 |
+            second
+        
+        Ordering raw values as ints orders them chronologically, and
+        raw_diff(), raw_add() and raw_field() work on them without a full
+        decode. The weekday is not included.
+        
+        ≡≡≡ Returns ≡≡≡
+        int: the packed time. On MicroPython, values are above the small int
+             range, so each is allocated on the heap (one int, rather than a
+             tuple of seven).
+        
+        bool: False if the onboard RTC is not running.
+        """
+        
+        # Make sure RTC is running
+        if (not rp2RTC.__armed and
+                not mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS):
+            return False
+        
+        (rtc_1, rtc_0) = rp2RTC.readRegisters()
+        
+        return (((rtc_1 & rp2RTC.__RAW_DATE_BITS) << rp2RTC.__RAW_DATE_SHIFT) |
+                (rtc_0 & rp2RTC.__RAW_TIME_BITS))
+    
+    
+    @staticmethod
+    def raw_pack(year, month, day, hour, minute, second):
+        """
+        Packs a date and time into a raw value, as returned by raw_now().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year, month, day, hour, minute, second: int, as for setRTC()
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the date or time are not of type int
+        ValueError: if the date or time are not legal
+        
+        ≡≡≡ Returns ≡≡≡
+        int: the packed time
+        """
+        rp2RTC.__validDateTime(year, month, day, hour, minute, second)
+        return ((year << 36) | (month << 32) | (day << 24) | (hour << 16) |
+                (minute << 8) | second)
+    
+    
+    @staticmethod
+    def raw_field(raw, field):
+        """
+        Decodes a single field of a raw value.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        raw:    int, as returned by raw_now() or raw_pack()
+        field:  int, rp2RTC.FIELD_YEAR, FIELD_MONTH, FIELD_DAY, FIELD_HOUR,
+                FIELD_MINUTE or FIELD_SECOND
+        
+        ≡≡≡ Returns ≡≡≡
+        int: the value of the field
+        """
+        return (raw >> rp2RTC.__RAW_SHIFTS[field]) & rp2RTC.__RAW_MASKS[field]
+    
+    
+    @staticmethod
+    def raw_diff(raw1, raw2):
+        """
+        Calculates the number of seconds from one raw value to another. Raw
+        values on the same day are subtracted field by field; the dates are
+        only converted to day counts when they differ.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        raw1:   int, as returned by raw_now() or raw_pack()
+        raw2:   int, as returned by raw_now() or raw_pack()
+        
+        ≡≡≡ Returns ≡≡≡
+        int: seconds from raw2 to raw1, negative if raw1 is earlier
+        """
+        time1 = raw1 & rp2RTC.__RAW_TIME_BITS
+        time2 = raw2 & rp2RTC.__RAW_TIME_BITS
+        seconds = (((time1 >> 16) - (time2 >> 16)) * 3600 +
+                   (((time1 >> 8) & 0x3f) - ((time2 >> 8) & 0x3f)) * 60 +
+                   (time1 & 0x3f) - (time2 & 0x3f))
+        
+        date1 = raw1 >> rp2RTC.__RAW_DATE_SHIFT
+        date2 = raw2 >> rp2RTC.__RAW_DATE_SHIFT
+        if date1 != date2:
+            seconds += (rp2RTC.daysFromCivil(date1 >> 12,
+                                               (date1 >> 8) & 0xf,
+                                               date1 & 0x1f) -
+                        rp2RTC.daysFromCivil(date2 >> 12,
+                                               (date2 >> 8) & 0xf,
+                                               date2 & 0x1f)) * 86400
+        return seconds
+    
+    
+    @staticmethod
+    def raw_add(raw, seconds):
+        """
+        Adds a number of seconds to a raw value. The date is only converted
+        to a day count when the result is on another day.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        raw:     int, as returned by raw_now() or raw_pack()
+        seconds: int, seconds to add, negative to subtract
+        
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if the result is outside of the years 0 - 4095
+        
+        ≡≡≡ Returns ≡≡≡
+        int: the raw value of the later (or earlier) time
+        """
+        time = raw & rp2RTC.__RAW_TIME_BITS
+        secondOfDay = ((time >> 16) * 3600 + ((time >> 8) & 0x3f) * 60 +
+                       (time & 0x3f) + seconds)
+        
+        date = raw >> rp2RTC.__RAW_DATE_SHIFT
+        if not 0 <= secondOfDay < 86400:
+            days = secondOfDay // 86400
+            secondOfDay -= days * 86400
+            (year, month, day) = rp2RTC.civilFromDays(
+                rp2RTC.daysFromCivil(date >> 12, (date >> 8) & 0xf,
+                                       date & 0x1f) + days)
+            if not 0 <= year <= 4095:
+                raise ValueError('Result in year ' + str(year) +
+                                 ' - the RTC holds years 0 - 4095.')
+            date = (year << 12) | (month << 8) | day
+        
+        minutes = secondOfDay // 60
+        return ((date << rp2RTC.__RAW_DATE_SHIFT) |
+                ((minutes // 60) << 16) | ((minutes % 60) << 8) |
+                (secondOfDay % 60))
+    
+    
+    @staticmethod
+    def time_us(epoch=EPOCH_UNIX):
+        """
+        Returns the time stored in the RP2040 internal RTC with microsecond
+        resolution, by measuring the time since the RTC's last second edge
+        with ticks_us().
+        
+        The edge is found by syncEdge(), or by time_us() itself when two calls
+        less than a second apart see the seconds change. Calls in the middle of
+        a second read no registers at all: only calls within the error bound of
+        an edge, or the first call of each second, read the RTC. These keep the
+        edge in step with the RTC, including across ticks_us() wraparound.
+        
+        The error bound assumes that clk_rtc and the ticks_us() timer run from
+        the same crystal, as on the Pico with the default clock divider (see
+        setClockDivider()). The edge is dropped by setRTC() and
+        setBackend(), and whenever the RTC disagrees with it.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        epoch:  int, the year of the epoch, as for time()
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (seconds, microseconds, error)
+            seconds:      int, seconds since the epoch, as returned by time()
+            microseconds: int, microseconds since the start of that second, in
+                          the range of 0 - 999999
+            error:        int, bound in microseconds on the error of
+                          microseconds. 1000000 if no edge is known yet (the
+                          microseconds are then 0).
+        
+        bool: False if the onboard RTC is not running.
+        """
+        edge = rp2RTC.__edge
+        if edge is not None and edge[3] == epoch:
+            elapsed = ticks_diff(ticks_us(), edge[0])
+            
+            # Within the second, unless ticks_us() wrapped around since the
+            # edge, which ticks_ms() would show
+            if (edge[4] <= elapsed < 1000000 - edge[4] and
+                    ticks_diff(ticks_ms(), edge[1]) < 2000):
+                return (edge[2], elapsed, edge[4])
+        
+        return rp2RTC.__timeUsRead(epoch)
+    
+    
+    @staticmethod
+    def __timeUsRead(epoch):
+        """
+        time_us() when the registers need to be read: checks the edge against
+        the RTC and moves it to the current second, or captures a new edge.
+        """
+        before = ticks_us()
+        seconds = rp2RTC.time(epoch)
+        after = ticks_us()
+        if seconds is False:
+            rp2RTC.__edge = None
+            return False
+        
+        last = rp2RTC.__edgeLast
+        rp2RTC.__edgeLast = (before, seconds, epoch)
+        
+        edge = rp2RTC.__edge
+        if edge is not None and edge[3] == epoch:
+            error = edge[4]
+            
+            # Expected start of this second. The delta is reduced to the ticks
+            # period, so that any time since the edge can be added.
+            delta = (seconds - edge[2]) * 1000000 % 0x40000000
+            if delta >= 0x20000000:
+                delta -= 0x40000000
+            start = ticks_add(edge[0], delta)
+            
+            # The register was read between 'before' and 'after'
+            if (ticks_diff(after, start) >= -error and
+                    ticks_diff(before, start) < 1000000 + error):
+                elapsed = ticks_diff(before, start)
+                edge = (start,
+                        ticks_add(ticks_ms(), -(elapsed // 1000)),
+                        seconds, epoch, error)
+            else:
+                edge = None
+        else:
+            edge = None
+        
+        # The seconds changed since the last read: the edge is between the two
+        if last is not None and last[2] == epoch and last[1] == seconds - 1:
+            width = ticks_diff(after, last[0])
+            error = (width + 1) // 2
+            if 0 <= width < 1000000 and (edge is None or error < edge[4]):
+                start = ticks_add(last[0], width // 2)
+                edge = (start,
+                        ticks_add(ticks_ms(), -(ticks_diff(after, start) // 1000)),
+                        seconds, epoch, error)
+        
+        rp2RTC.__edge = edge
+        if edge is None:
+            return (seconds, 0, 1000000)
+        
+        elapsed = ticks_diff(before, edge[0])
+        if elapsed < 0:
+            elapsed = 0
+        elif elapsed > 999999:
+            elapsed = 999999
+        return (seconds, elapsed, edge[4])
+    
+    
+    @staticmethod
+    def syncEdge(epoch=EPOCH_UNIX, timeout_us=1100000):
+        """
+        Polls the RTC until its seconds change, and records ticks_us() at that
+        edge for time_us(). Blocks for up to a second.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        epoch:      int, the year of the epoch, as for time()
+        timeout_us: int, microseconds to wait for the seconds to change
+        
+        ≡≡≡ Returns ≡≡≡
+        int: bound in microseconds on the error of the recorded edge
+        
+        bool: False if the onboard RTC is not running, or the seconds did not
+              change within timeout_us.
+        """
+        if not rp2RTC.__armed and not rp2RTC.rtc_running():
+            return False
+        
+        start = ticks_us()
+        last = start
+        second = mem32[rp2RTC.__RTC_RTC_0_MEM] & rp2RTC.__RTC_RTC_0_SEC_BITS
+        
+        while True:
+            before = ticks_us()
+            current = mem32[rp2RTC.__RTC_RTC_0_MEM] & rp2RTC.__RTC_RTC_0_SEC_BITS
+            after = ticks_us()
+            if current != second:
+                break
+            if ticks_diff(after, start) > timeout_us:
+                return False
+            last = before
+        
+        # The edge is between the last read of the old second and this read
+        width = ticks_diff(after, last)
+        edgeTicks = ticks_add(last, width // 2)
+        seconds = rp2RTC.time(epoch)
+        if seconds is False:
+            return False
+        
+        error = (width + 1) // 2
+        rp2RTC.__edge = (edgeTicks,
+                         ticks_add(ticks_ms(), -(ticks_diff(ticks_us(), edgeTicks) // 1000)),
+                         seconds, epoch, error)
+        rp2RTC.__edgeLast = None
+        return error
+    
+    
+    @staticmethod
+    def syncRTC(seconds, us=0, ticks=None, epoch=EPOCH_UNIX):
+        """
+        Sets the RP2040 internal RTC from a reference time with a fraction of a
+        second, so that the RTC's seconds start on the reference's seconds.
+        setRTC() starts a new RTC second whenever it is called, so the RTC can
+        be up to a second behind its reference; this method instead waits for
+        the next second of the reference, less the time the writes take to
+        restart the RTC, which is measured on every call.
+        
+        The RTC is stopped (RTC_ENABLE cleared), the SETUP registers are
+        written and LOAD and RTC_ENABLE are set, as in the Pico SDK's
+        rtc_set_datetime(). The RTC counter restarts from the start of a
+        second when RTC_ACTIVE is set again. Blocks for up to a second.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        seconds: int, whole seconds since the epoch of the reference time
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        us:      int, microseconds of the reference time, in the range of
+                 0 - 999999
+        ticks:   int, ticks_us() at which the reference time was taken (e.g.
+                 when a time message arrived). If None, the reference time is
+                 taken to be now.
+        epoch:   int, the year of the epoch, as for time()
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if seconds or us is not an integer
+        ValueError: if us is outside the legal range, or the time is outside
+                    the years 0 - 4095
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (error_us, errorBound_us)
+            error_us:      int, microseconds by which the RTC's seconds start
+                           after the reference's (negative if before)
+            errorBound_us: int, bound on the error of error_us, from the
+                           polling of RTC_ACTIVE
+        
+        bool: False if the onboard RTC is not running.
+        """
+        if ticks is None:
+            ticks = ticks_us()
+        
+        if not isinstance(seconds, int):
+            raise TypeError('Parameter seconds received parameter of type ' +
+                            str(type(seconds)) +
+                            ' - expected parameter of type \'int\'.')
+        if not isinstance(us, int):
+            raise TypeError('Parameter us received parameter of type ' +
+                            str(type(us)) +
+                            ' - expected parameter of type \'int\'.')
+        if not 0 <= us <= 999999:
+            raise ValueError('Parameter \'us\' received value of ' +
+                             str(us) +
+                             ' - must supply an integer from 0 to 999999 inclusive')
+        
+        if not rp2RTC.__armed and not rp2RTC.rtc_running():
+            return False
+        
+        rp2RTC.__armed = False
+        rp2RTC.__edge = None
+        rp2RTC.__edgeLast = None
+        
+        clkPeriod_us = 1000000 // rp2RTC.clockDivider() + 1
+        delay = rp2RTC.__syncDelay_us
+        if delay is None:
+            delay = clkPeriod_us * 5
+        
+        # The next reference second that leaves time to prepare the writes
+        target = seconds + 1
+        edge = ticks_add(ticks, 1000000 - us)
+        while ticks_diff(edge, ticks_us()) - delay < rp2RTC.__SYNC_LEAD_US:
+            target += 1
+            edge = ticks_add(edge, 1000000)
+        
+        # Date and time of the target second
+        days = target // 86400 + rp2RTC.daysFromCivil(epoch, 1, 1)
+        (year, month, day) = rp2RTC.civilFromDays(days)
+        if not 0 <= year <= 4095:
+            raise ValueError('Parameter seconds received value of ' +
+                             str(seconds) +
+                             ' - the time must be in the years 0 to 4095 inclusive')
+        second = target % 86400
+        setup_0 = (year << 12) | (month << 8) | day
+        setup_1 = (((second // 3600) << 16) | ((second // 60 % 60) << 8) |
+                   (second % 60) | (rp2RTC.weekDay(year, month, day) << 24))
+        
+        # Wait until the writes have to start
+        wait = ticks_diff(edge, ticks_us()) - delay
+        if wait > 0:
+            sleep_us(wait)
+        while ticks_diff(edge, ticks_us()) > delay:
+            pass
+        
+        if _INSTRUMENTATION and rp2RTC.__stats is not None:
+            rp2RTC.__acquireCounted('syncRTC')
+        else:
+            rp2RTC.__RTCAccessLock.acquire()
+        sequence = rp2RTC.__sequence
+        sequence[0] = (sequence[0] + 1) & 0x3fffffff
+        try:
+            start = ticks_us()
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_CLR + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+            while mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS:
+                sleep_us(1)
+            
+            mem32[rp2RTC.__RTC_BASE_MEM + 4] = setup_0
+            mem32[rp2RTC.__RTC_BASE_MEM + 8] = setup_1
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = rp2RTC.__RTC_CTRL_LOAD_BITS
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+            
+            # The RTC restarts between the last poll that finds it stopped
+            # and the first that finds it running
+            last = ticks_us()
+            while True:
+                before = ticks_us()
+                active = mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS
+                if active:
+                    break
+                last = before
+                sleep_us(1)
+            restart = ticks_us()
+            
+            if _INSTRUMENTATION and rp2RTC.__stats is not None:
+                rp2RTC.__stats['syncRTC'][5] += ticks_diff(restart, start)
+        finally:
+            sequence[0] = (sequence[0] + 1) & 0x3fffffff
+            rp2RTC.__RTCAccessLock.release()
+        
+        width = ticks_diff(restart, last)
+        restart = ticks_add(last, width // 2)
+        bound = (width + 1) // 2
+        rp2RTC.__syncDelay_us = ticks_diff(restart, start)
+        
+        # The new second's edge is known, so time_us() needs no syncEdge()
+        rp2RTC.__edge = (restart,
+                         ticks_add(ticks_ms(), -(ticks_diff(ticks_us(), restart) // 1000)),
+                         target, epoch, bound)
+        
+        return (ticks_diff(restart, edge), bound)
+    
+    
+    @staticmethod
+    def weekDay(year, month, day, asString=False):
+        """
+        Calculates the weekday. 0 = Sunday, 6 = Saturday.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        asString: bool, if True the weekday is returned as a string.
+        
+        ≡≡≡ Returns ≡≡≡
+        int: represents the weekday where 0 = Sunday, 6 = Saturday.
+        str: weekday is returned as a string if 'asString' parameter = True
+        """
+        table = rp2RTC.__weekdayTable
+        if table is not None and 0 <= year < 4096:
+            # Two years per byte: bits 0-2 anchor day, bit 3 leap year
+            entry = table[year >> 1] >> ((year & 1) << 2)
+            anchorDay = entry & 0x7
+            leap = entry & 0x8
+        else:
+            # The year's anchor day for each doomsday
+            anchorDay = 2 + year + year // 4 - year // 100 + year // 400
+            leap = rp2RTC.isLeapYear(year)
+        
+        # Doomsday dates by month. In leap years the doomsdays of January and
+        # February are a day later.
+        doomsday = rp2RTC.__DOOMSDAYS[month-1]
+        if leap and month <= 2:
+            doomsday += 1
+
+        dayOfWeek = (day - doomsday + anchorDay) % 7
+        
+        if asString:
+            return rp2RTC.__WEEKDAY_STRINGS[dayOfWeek]
+        else:
+            return dayOfWeek
+
+
+    @staticmethod
+    def isLeapYear(year):
+        """
+        Calculates whether a given year is a leap year.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid 4-digit year
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True = is a leap year, False = is not a leap year
+        """
+        if year % 4 == 0 and year % 100 != 0:
+            return True
+        elif year % 400 == 0:
+            return True
+        else:
+            return False
+
+
+    @staticmethod
+    def useWeekdayTable(enable=True):
+        """
+        Makes weekDay() look up the anchor day and leap year of years 0 - 4095
+        in a precomputed table, instead of calculating them on every call.
+        
+        The table packs 4 bits per year (3 bit anchor day, 1 leap year bit),
+        which is 2048 bytes. If the RP2040_RTC_weekdays module is availible it
+        is used, which costs no RAM when that module is frozen into the
+        firmware. Otherwise the table is built in a 2048 byte bytearray.
+        
+        While the table is in use, the pure Python weekDay() is used in place
+        of the native one (see useNative()), which does not read the table.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        enable: bool, True to use the table, False to release it
+        """
+        if not enable:
+            rp2RTC.__weekdayTable = None
+        else:
+            try:
+                from RP2040_RTC_weekdays import WEEKDAY_TABLE
+            except ImportError:
+                WEEKDAY_TABLE = rp2RTC.buildWeekdayTable()
+            rp2RTC.__weekdayTable = WEEKDAY_TABLE
+        
+        rp2RTC.__installMethods()
+    
+    
+    @staticmethod
+    def buildWeekdayTable():
+        """
+        Builds the packed table used by useWeekdayTable(). Year 'y' is stored
+        in the low (even years) or high (odd years) 4 bits of byte y // 2:
+            bits 0 - 2: the year's doomsday anchor day, 0 = Sunday, 6 = Saturday
+            bit 3:      1 if the year is a leap year
+        
+        ≡≡≡ Returns ≡≡≡
+        bytearray: 2048 bytes, covering the years 0 - 4095
+        """
+        table = bytearray(2048)
+        for year in range(4096):
+            entry = (2 + year + year // 4 - year // 100 + year // 400) % 7
+            if rp2RTC.isLeapYear(year):
+                entry |= 0x8
+            table[year >> 1] |= entry << ((year & 1) << 2)
+        return table
+    
+    
+    @staticmethod
+    def weekDay_many(years, months, days, out=None):
+        """
+        Calculates the weekdays of a batch of dates, given as parallel arrays.
+        Each result is the same as weekDay(year, month, day) for that date.
+        
+        NumPy arrays (on CPython) are processed with vectorized operations,
+        any other sequences (e.g. array('H') on MicroPython) element by element
+        without a method call per date. NumPy arrays must have an integer
+        dtype.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        years:  sequence of int, each representing a valid year
+        months: sequence of int, each in the range of 1 - 12
+        days:   sequence of int, each in the range of 1..[28,29,30,31]
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        out:    preallocated sequence to store the results in. By default a
+                new array('b') (or NumPy int8 array) is returned.
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if a NumPy array has a dtype other than an integer one
+        
+        ≡≡≡ Returns ≡≡≡
+        array: weekdays where 0 = Sunday, 6 = Saturday
+        """
+        if _np is not None and (isinstance(years, _np.ndarray) or
+                                isinstance(months, _np.ndarray) or
+                                isinstance(days, _np.ndarray)):
+            arrays = []
+            for (name, values) in (('years', years), ('months', months),
+                                   ('days', days)):
+                values = _np.asarray(values)
+                # Checked before converting, as a conversion to int64 would
+                # truncate floats (2024.9 to 2024) instead of rejecting them
+                if values.dtype.kind not in 'iu':
+                    raise TypeError('Parameter ' + name + ' received array ' +
+                                    'of dtype \'' + str(values.dtype) +
+                                    '\' - expected an integer dtype.')
+                arrays.append(values.astype(_np.int64))
+            (years, months, days) = arrays
+            
+            leap = (((years % 4 == 0) & (years % 100 != 0)) |
+                    (years % 400 == 0))
+            anchorDay = (2 + years + years // 4 - years // 100 +
+                         years // 400)
+            doomsday = (_np.array(rp2RTC.__DOOMSDAYS)[months - 1] +
+                        (leap & (months <= 2)))
+            result = ((days - doomsday + anchorDay) % 7).astype(_np.int8)
+            
+            if out is None:
+                return result
+            out[:] = result
+            return out
+        
+        count = len(years)
+        if out is None:
+            out = array('b', bytes(count))
+        
+        table = rp2RTC.__weekdayTable
+        doomsdays = rp2RTC.__DOOMSDAYS
+        isLeapYear = rp2RTC.isLeapYear
+        
+        for i in range(count):
+            year = years[i]
+            month = months[i]
+            
+            # As in weekDay()
+            if table is not None and 0 <= year < 4096:
+                entry = table[year >> 1] >> ((year & 1) << 2)
+                anchorDay = entry & 0x7
+                leap = entry & 0x8
+            else:
+                anchorDay = 2 + year + year // 4 - year // 100 + year // 400
+                leap = isLeapYear(year)
+            
+            doomsday = doomsdays[month-1]
+            if leap and month <= 2:
+                doomsday += 1
+            
+            out[i] = (days[i] - doomsday + anchorDay) % 7
+        
+        return out
+    
+    
+    @staticmethod
+    def validate_many(years, months, days, hours, minutes, seconds, out=None):
+        """
+        Validates a batch of date/time information, given as parallel arrays.
+        Each result is 1 (True) if __validDateTime() would accept the values,
+        and 0 (False) if it would raise an exception.
+        
+        NumPy arrays (on CPython) are processed with vectorized operations,
+        any other sequences (e.g. array('H') on MicroPython) element by element
+        without a method call per entry. NumPy arrays must have an integer
+        dtype: if any has another dtype (float, object or bool), every entry
+        is 0.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        years:   sequence of int
+        months:  sequence of int
+        days:    sequence of int
+        hours:   sequence of int
+        minutes: sequence of int
+        seconds: sequence of int
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        out:    preallocated sequence to store the results in. By default a
+                new array('b') (or NumPy bool array) is returned.
+        
+        ≡≡≡ Returns ≡≡≡
+        array: 1 where the date/time is valid, 0 where it is not
+        """
+        if _np is not None and (isinstance(years, _np.ndarray) or
+                                isinstance(months, _np.ndarray) or
+                                isinstance(days, _np.ndarray) or
+                                isinstance(hours, _np.ndarray) or
+                                isinstance(minutes, _np.ndarray) or
+                                isinstance(seconds, _np.ndarray)):
+            years = _np.asarray(years)
+            months = _np.asarray(months)
+            days = _np.asarray(days)
+            hours = _np.asarray(hours)
+            minutes = _np.asarray(minutes)
+            seconds = _np.asarray(seconds)
+            
+            # __validDateTime() only accepts integers. Arrays of any other
+            # dtype (including bool) are rejected as a whole, before any
+            # arithmetic is done on them.
+            integers = True
+            for values in (years, months, days, hours, minutes, seconds):
+                if values.dtype.kind not in 'iu':
+                    integers = False
+            
+            if not integers:
+                result = _np.zeros(_np.broadcast(years, months, days, hours,
+                                                 minutes, seconds).shape,
+                                   dtype=bool)
+            else:
+                validMonth = (months >= 1) & (months <= 12)
+                leap = (((years % 4 == 0) & (years % 100 != 0)) |
+                        (years % 400 == 0))
+                monthDays = (_np.array(rp2RTC.__MONTH_DAYS)[_np.where(validMonth, months - 1, 0)] +
+                             (leap & (months == 2)))
+                result = ((years >= 0) & (years <= 4095) & validMonth &
+                          (days >= 1) & (days <= monthDays) &
+                          (hours >= 0) & (hours <= 23) &
+                          (minutes >= 0) & (minutes <= 59) &
+                          (seconds >= 0) & (seconds <= 59))
+            
+            if out is None:
+                return result
+            out[:] = result
+            return out
+        
+        count = len(years)
+        if out is None:
+            out = array('b', bytes(count))
+        
+        monthDays = rp2RTC.__MONTH_DAYS
+        isLeapYear = rp2RTC.isLeapYear
+        
+        for i in range(count):
+            year = years[i]
+            month = months[i]
+            day = days[i]
+            hour = hours[i]
+            minute = minutes[i]
+            second = seconds[i]
+            
+            # As in __validDateTime()
+            if not (isinstance(year, int) and isinstance(month, int) and
+                    isinstance(day, int) and isinstance(hour, int) and
+                    isinstance(minute, int) and isinstance(second, int)):
+                out[i] = 0
+            elif not (0 <= year <= 4095 and 1 <= month <= 12 and
+                      0 <= hour <= 23 and 0 <= minute <= 59 and
+                      0 <= second <= 59):
+                out[i] = 0
+            elif month == 2 and isLeapYear(year):
+                out[i] = 1 <= day <= 29
+            else:
+                out[i] = 1 <= day <= monthDays[month-1]
+        
+        return out
+    
+    
+    @staticmethod
+    def __validDateTime(year, month, day, hour, minute, second):
+        """
+        This method validates a set of date/time information.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the data types and values are legal
+        """
+        return rp2RTC.validate(year, month, day, hour, minute, second)
+    
+    
+    @staticmethod
+    def validate(year, month, day, hour, minute, second):
+        """
+        Validates a set of date/time information, raising the exception and
+        message of validationMessage() for the first error found by
+        validate_code(). setRTC() and the other methods taking a date and time
+        validate it with this method, as do rp2RTCAlarm.at() and
+        rp2RTCParse.pack(), so their messages are the same.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the data types and values are legal
+        """
+        code = rp2RTC.validate_code(year, month, day, hour, minute, second)
+        if code == rp2RTC.VALID:
+            return True
+        
+        # Only build the message when there is an error
+        errMsg = rp2RTC.validationMessage(code, year, month, day, hour, minute,
+                                          second)
+        if code & rp2RTC.ERR_TYPE:
+            raise TypeError(errMsg)
+        raise ValueError(errMsg)
+    
+    
+    @staticmethod
+    def validate_code(year, month, day, hour, minute, second):
+        """
+        Validates a set of date/time information like __validDateTime(), but
+        returns an error code instead of raising an exception. Nothing is
+        allocated on the heap, which makes it suitable for checking high rates
+        of untrusted input.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+        
+        ≡≡≡ Returns ≡≡≡
+        int: rp2RTC.VALID (0) if the data types and values are legal, else
+             rp2RTC.ERR_TYPE or rp2RTC.ERR_VALUE combined with the field
+             (rp2RTC.FIELD_YEAR ... rp2RTC.FIELD_SECOND) of the first error.
+             validationMessage() describes the error.
+        """
+        
+        # Check if inputs are integers
+        if not isinstance(year, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_YEAR
+        if not isinstance(month, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_MONTH
+        if not isinstance(day, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_DAY
+        if not isinstance(hour, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_HOUR
+        if not isinstance(minute, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_MINUTE
+        if not isinstance(second, int):
+            return rp2RTC.ERR_TYPE | rp2RTC.FIELD_SECOND
+        
+        # Check if inputs are valid integers
+        if not 0 <= year <= 4095:
+            return rp2RTC.ERR_VALUE | rp2RTC.FIELD_YEAR
+        if not 1 <= month <= 12:
+            return rp2RTC.ERR_VALUE | rp2RTC.FIELD_MONTH
+        if not 1 <= day <= rp2RTC.__MONTH_DAYS[month-1]:
+            # February 29th
+            if not (month == 2 and day == 29 and rp2RTC.isLeapYear(year)):
+                return rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY
+        if not 0 <= hour <= 23:
+            return rp2RTC.ERR_VALUE | rp2RTC.FIELD_HOUR
+        if not 0 <= minute <= 59:
+            return rp2RTC.ERR_VALUE | rp2RTC.FIELD_MINUTE
+        if not 0 <= second <= 59:
+            return rp2RTC.ERR_VALUE | rp2RTC.FIELD_SECOND
+        
+        return rp2RTC.VALID
+    
+    
+    @staticmethod
+    def validationMessage(code, year, month, day, hour, minute, second):
+        """
+        Describes an error code returned by validate_code(), with the message
+        __validDateTime() raises for it.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        code:   int, error code returned by validate_code()
+        year, month, day, hour, minute, second:
+                the values that were passed to validate_code()
+        
+        ≡≡≡ Returns ≡≡≡
+        str: human-readable description of the error, or None if code is
+             rp2RTC.VALID
+        """
+        if code == rp2RTC.VALID:
+            return None
+        
+        field = code & 0x0f
+        key = rp2RTC.__FIELD_NAMES[field]
+        value = (year, month, day, hour, minute, second)[field]
+        
+        if code & rp2RTC.ERR_TYPE:
+            return ('Parameter ' +
+                    key +
+                    ' received parameter of type ' +
+                    str(type(value)) +
+                    ' - expected parameter of type \'int\'.')
+        
+        (errMin, errMax) = rp2RTC.__FIELD_LIMITS[field]
+        if field == rp2RTC.FIELD_DAY:
+            errMax = rp2RTC.__MONTH_DAYS[month-1]
+            if month == 2 and rp2RTC.isLeapYear(year):
+                errMax = 29
+        
+        errMsg = ('Parameter \'' +
+                  key +
+                  '\' received value of ' +
+                  str(value) +
+                  ' - must supply an integer from ' +
+                  str(errMin) +
+                  ' to ' +
+                  str(errMax) +
+                  ' inclusive')
+        
+        if field == rp2RTC.FIELD_DAY:
+            errMsg += ' for month ' + str(month)
+        
+        return errMsg
+
+
+    @staticmethod
+    def daysFromCivil(year, month, day):
+        """
+        Calculates the number of days from 1970-01-01 to a date, using the
+        leap year rules of isLeapYear().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        
+        ≡≡≡ Returns ≡≡≡
+        int: days since 1970-01-01, negative for earlier dates
+        """
+        # Count years from March, so that the leap day is the last day of the
+        # year, in 400 year eras of 146097 days. Algorithm by Howard Hinnant:
+        # https://howardhinnant.github.io/date_algorithms.html#days_from_civil
+        if month <= 2:
+            year -= 1
+        era = year // 400
+        yearOfEra = year - era * 400
+        dayOfYear = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+        dayOfEra = (yearOfEra * 365 + yearOfEra // 4 - yearOfEra // 100 +
+                    dayOfYear)
+        return era * 146097 + dayOfEra - 719468
+    
+    
+    @staticmethod
+    def civilFromDays(days):
+        """
+        Calculates the date that is a number of days from 1970-01-01, the
+        inverse of daysFromCivil().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        days:   int, days since 1970-01-01, negative for earlier dates
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day)
+        """
+        # Algorithm by Howard Hinnant:
+        # https://howardhinnant.github.io/date_algorithms.html#civil_from_days
+        days += 719468
+        era = days // 146097
+        dayOfEra = days - era * 146097
+        yearOfEra = (dayOfEra - dayOfEra // 1460 + dayOfEra // 36524 -
+                     dayOfEra // 146096) // 365
+        dayOfYear = dayOfEra - (365 * yearOfEra + yearOfEra // 4 -
+                                yearOfEra // 100)
+        monthFromMarch = (5 * dayOfYear + 2) // 153
+        day = dayOfYear - (153 * monthFromMarch + 2) // 5 + 1
+        month = monthFromMarch + 3 if monthFromMarch < 10 else monthFromMarch - 9
+        year = yearOfEra + era * 400
+        if month <= 2:
+            year += 1
+        return (year, month, day)
+    
+    
+    @staticmethod
+    def gmtime(t, epoch=EPOCH_UNIX):
+        """
+        Converts seconds since the epoch to a date and time, without reading
+        the RTC. The inverse of mktime().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        t:      int, seconds since the epoch, negative for earlier times
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        epoch:  int, the year of the epoch, as for time()
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if t is not an int
+        ValueError: if the time is outside of the years 0 - 4095
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw), as returned by
+               localtime()
+        """
+        if not isinstance(t, int):
+            raise TypeError('Parameter t received parameter of type ' +
+                            str(type(t)) +
+                            ' - expected parameter of type \'int\'.')
+        
+        days = t // 86400
+        second = t - days * 86400
+        if epoch != rp2RTC.EPOCH_UNIX:
+            days += rp2RTC.daysFromCivil(epoch, 1, 1)
+        
+        (year, month, day) = rp2RTC.civilFromDays(days)
+        if not 0 <= year <= 4095:
+            raise ValueError('Parameter t received value of ' + str(t) +
+                             ' - the time must be in the years 0 to 4095 inclusive')
+        
+        # 1970-01-01 was a Thursday
+        return (year, month, day, second // 3600, second // 60 % 60,
+                second % 60, (days + 4) % 7)
+    
+    
+    @staticmethod
+    def mktime(t, epoch=EPOCH_UNIX):
+        """
+        Converts a date and time to seconds since the epoch, without reading
+        the RTC. The inverse of gmtime().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        t:      tuple, (year, month, day, hour, minute, second), with any
+                further fields (e.g. dotw from localtime()) ignored
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        epoch:  int, the year of the epoch, as for time()
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the date or time are not of type int
+        ValueError: if the date or time are not legal
+        
+        ≡≡≡ Returns ≡≡≡
+        int: seconds since the epoch, negative for times before the epoch
+        """
+        (year, month, day, hour, minute, second) = t[0:6]
+        rp2RTC.__validDateTime(year, month, day, hour, minute, second)
+        
+        days = rp2RTC.daysFromCivil(year, month, day)
+        if epoch != rp2RTC.EPOCH_UNIX:
+            days -= rp2RTC.daysFromCivil(epoch, 1, 1)
+        return days * 86400 + hour * 3600 + minute * 60 + second
+    
+    
+    @staticmethod
+    def add_seconds(t, seconds):
+        """
+        Adds a number of seconds to a date and time.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        t:       tuple, (year, month, day, hour, minute, second), as for
+                 mktime()
+        seconds: int, seconds to add, negative to subtract
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the date or time are not of type int
+        ValueError: if the date or time are not legal, or the result is
+                    outside of the years 0 - 4095
+        
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw), as returned by
+               gmtime()
+        """
+        return rp2RTC.gmtime(rp2RTC.mktime(t) + seconds)
+    
+    
+    @staticmethod
+    def diff_seconds(t1, t2):
+        """
+        Calculates the number of seconds from one date and time to another.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        t1:     tuple, (year, month, day, hour, minute, second), as for
+                mktime()
+        t2:     tuple, (year, month, day, hour, minute, second), as for
+                mktime()
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the dates or times are not of type int
+        ValueError: if the dates or times are not legal
+        
+        ≡≡≡ Returns ≡≡≡
+        int: seconds from t2 to t1, negative if t1 is earlier
+        """
+        return rp2RTC.mktime(t1) - rp2RTC.mktime(t2)
+    
+    
+    @staticmethod
+    def calendar(start, end=(4095, 12, 31), step=1, months=False):
+        """
+        Returns a generator of the dates from start to end, with their
+        weekdays. The weekday, leap year and month length are updated from
+        one date to the next, instead of being calculated for each date as
+        weekDay() and isLeapYear() do.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        start:  tuple, (year, month, day) of the first date
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        end:    tuple, (year, month, day) of the last date, inclusive
+        step:   int, number of days (or months) from one date to the next
+        months: bool, if True, step is a number of months. The day of start
+                is kept, or is the last day of months that are shorter (e.g.
+                January 31st, February 28th, March 31st).
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the dates or step are not of type int
+        ValueError: if the dates are not legal, or step is less than 1
+        
+        ≡≡≡ Returns ≡≡≡
+        generator: of (year, month, day, dotw) tuples, dotw as returned by
+                   weekDay()
+        """
+        (year, month, day) = start
+        rp2RTC.__validDateTime(year, month, day, 0, 0, 0)
+        rp2RTC.__validDateTime(end[0], end[1], end[2], 0, 0, 0)
+        if not isinstance(step, int):
+            raise TypeError('Parameter step received parameter of type ' +
+                            str(type(step)) +
+                            ' - expected parameter of type \'int\'.')
+        if step < 1:
+            raise ValueError('Parameter step received value of ' + str(step) +
+                             ' - expected 1 or more')
+        
+        # Dates compare as (year << 9) | (month << 5) | day
+        last = (end[0] << 9) | (end[1] << 5) | end[2]
+        if months:
+            return rp2RTC.__calendarMonths(year, month, day, last, step)
+        return rp2RTC.__calendarDays(year, month, day, last, step)
+    
+    
+    @staticmethod
+    def __calendarDays(year, month, day, last, step):
+        """
+        calendar() in steps of days.
+        """
+        monthLengths = rp2RTC.__MONTH_DAYS
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        monthDays = monthLengths[month - 1] + (leap and month == 2)
+        dotw = rp2RTC.weekDay(year, month, day)
+        stepDotw = step % 7
+        
+        while (year << 9) | (month << 5) | day <= last:
+            yield (year, month, day, dotw)
+            
+            dotw += stepDotw
+            if dotw >= 7:
+                dotw -= 7
+            
+            day += step
+            while day > monthDays:
+                day -= monthDays
+                month += 1
+                if month > 12:
+                    month = 1
+                    year += 1
+                    leap = year % 4 == 0 and (year % 100 != 0 or
+                                              year % 400 == 0)
+                monthDays = monthLengths[month - 1] + (leap and month == 2)
+    
+    
+    @staticmethod
+    def __calendarMonths(year, month, day, last, step):
+        """
+        calendar() in steps of months. day is the day of the start date, and
+        date is the day of the month yielded, clamped to the month's length.
+        """
+        monthLengths = rp2RTC.__MONTH_DAYS
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        monthDays = monthLengths[month - 1] + (leap and month == 2)
+        date = day
+        dotw = rp2RTC.weekDay(year, month, day)
+        
+        while (year << 9) | (month << 5) | date <= last:
+            yield (year, month, date, dotw)
+            
+            # Days to the same date of the next month are the days left in
+            # this month, then the date in the next month
+            days = -date
+            for _ in range(step):
+                days += monthDays
+                month += 1
+                if month > 12:
+                    month = 1
+                    year += 1
+                    leap = year % 4 == 0 and (year % 100 != 0 or
+                                              year % 400 == 0)
+                monthDays = monthLengths[month - 1] + (leap and month == 2)
+            
+            date = day if day <= monthDays else monthDays
+            dotw = (dotw + days + date) % 7
+    
+    
+    @staticmethod
+    def rtc_running():
+        """Returns True if the RP2040 RTC is running
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the RP2040 RTC is running, False if it is not running
+        """
+        ctrlRegister = mem32[rp2RTC.__RTC_CTRL_MEM]
+        if (ctrlRegister & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS) > 0:
+            return True
+        else:
+            return False
+    
+    
+    @staticmethod
+    def clockDivider():
+        """
+        Returns the divider of clk_rtc that makes one RTC second (CLKDIV_M1 + 1).
+        This is 46875 on the Pico, where clk_rtc is 46875 Hz.
+        
+        ≡≡≡ Returns ≡≡≡
+        int: clk_rtc cycles per RTC second, in the range of 1 - 65536
+        """
+        return (mem32[rp2RTC.__RTC_BASE_MEM] & 0xffff) + 1
+    
+    
+    @staticmethod
+    def setClockDivider(divider):
+        """
+        Sets the divider of clk_rtc that makes one RTC second, to trim the
+        RTC's rate (one step is about 21 ppm on the Pico). The RP2040
+        Datasheet only allows CLKDIV_M1 to be changed while the RTC is
+        disabled, so a running RTC is stopped, and restarted once the divider
+        is written. The RTC can lose up to a second, so it should be set again
+        afterwards (see setRTC()).
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        divider: int, clk_rtc cycles per RTC second, in the range of 1 - 65536
+        
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the RTC was running (and has been restarted), False if
+              it was not running (the divider is still written).
+        """
+        if not isinstance(divider, int):
+            raise TypeError('Parameter divider received parameter of type ' +
+                            str(type(divider)) +
+                            ' - expected parameter of type \'int\'.')
+        if not 1 <= divider <= 65536:
+            raise ValueError('Parameter \'divider\' received value of ' +
+                             str(divider) +
+                             ' - must supply an integer from 1 to 65536 inclusive')
+        
+        # The RTC is reconfigured, so the cached running state and second edge
+        # are dropped
+        rp2RTC.__armed = False
+        rp2RTC.__edge = None
+        rp2RTC.__edgeLast = None
+        
+        running = rp2RTC.rtc_running()
+        
+        # Wait one clk_rtc period at a time for the RTC to stop and start
+        clkPeriod_us = 1000000 // rp2RTC.clockDivider() + 1
+        
+        record = None
+        if _INSTRUMENTATION and rp2RTC.__stats is not None:
+            record = rp2RTC.__stats['setClockDivider']
+            rp2RTC.__acquireCounted('setClockDivider')
+        else:
+            rp2RTC.__RTCAccessLock.acquire()
+        start = ticks_us()
+        sequence = rp2RTC.__sequence
+        sequence[0] = (sequence[0] + 1) & 0x3fffffff
+        try:
+            mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_CLR + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+            while mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS:
+                sleep_us(clkPeriod_us)
+            
+            mem32[rp2RTC.__RTC_BASE_MEM] = divider - 1
+            
+            if running:
+                mem32[rp2RTC.__RTC_BASE_MEM + rp2RTC.__ATOMIC_BITMASK_SET + 0xc] = rp2RTC.__RTC_CTRL_RTC_ENABLE_BITS
+                while not mem32[rp2RTC.__RTC_CTRL_MEM] & rp2RTC.__RTC_CTRL_RTC_ACTIVE_BITS:
+                    sleep_us(clkPeriod_us)
+        finally:
+            sequence[0] = (sequence[0] + 1) & 0x3fffffff
+            rp2RTC.__RTCAccessLock.release()
+        
+        if _INSTRUMENTATION and record is not None:
+            record[5] += ticks_diff(ticks_us(), start)
+        
+        return running
+
+
+    @staticmethod
+    def consistentReads(enable=True):
+        """
+        Enables or disables consistent snapshot reads in localtime(),
+        localtime_into() and time().
+        
+        RTC_0 (time) and RTC_1 (date) are read separately. If the RTC counts a
+        second between the two reads (e.g. at 23:59:59 -> 00:00:00), the date
+        can belong to a different second than the time. When enabled, RTC_0 is
+        read again after RTC_1 and both are re-read, up to 3 times, until RTC_0
+        is unchanged. No lock is taken.
+        
+        The RP2040 latches RTC_1 when RTC_0 is read, so this is only needed if
+        the registers are not read in that order, or the backend does not
+        latch.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        enable: bool, True to enable consistent snapshot reads
+        """
+        rp2RTC.__consistentReads = bool(enable)
+        
+        # The native localtime() and localtime_into() do not re-read
+        rp2RTC.__installMethods()
+    
+    
+    @staticmethod
+    def readRetries(reset=False):
+        """
+        Returns the number of times a consistent snapshot read had to re-read
+        the RTC registers, or a read had to be repeated because setRTC(),
+        setRTC_nowait() or setClockDivider() was writing them at the same
+        time.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        reset:  bool, if True the counter is reset to 0 after being read
+        
+        ≡≡≡ Returns ≡≡≡
+        int: number of re-reads since the counter was last reset
+        """
+        retries = rp2RTC.__readRetries
+        if reset:
+            rp2RTC.__readRetries = 0
+        return retries
+    
+    
+    @staticmethod
+    def arm():
+        """
+        Checks once whether the RP2040 RTC is running and caches the result.
+        While armed, localtime(), localtime_into(), time() and setRTC() do not
+        read the CTRL register on every call. Call arm() again to re-validate.
+        
+        The cached state is dropped by setRTC(), setBackend() and disarm(). If
+        the RTC is stopped by other code while armed, the readings returned are
+        those of the stopped clock.
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the RTC is running (armed), False if it is not running
+        """
+        rp2RTC.__armed = rp2RTC.rtc_running()
+        return rp2RTC.__armed
+    
+    
+    @staticmethod
+    def disarm():
+        """
+        Drops the cached running state, so that every call checks whether the
+        RTC is running again.
+        """
+        rp2RTC.__armed = False
+    
+    
+    @staticmethod
+    def setBackend(registers, sleep=None, ticks=None):
+        """
+        Replaces the register backend used to access the RTC. By default this
+        is machine.mem32, but any object that supports 32-bit word indexing by
+        absolute address (reads and writes) may be used, such as the host-side
+        simulator in RP2040_RTC_sim.py.
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        registers: object indexable like machine.mem32, or None to restore
+                   machine.mem32 (or no backend, when not on MicroPython)
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        sleep:  function taking a delay in microseconds, used in place of
+                utime.sleep_us (e.g. to advance a simulated clock). If None,
+                utime.sleep_us is used.
+        ticks:  function used in place of utime.ticks_us by time_us() and
+                syncEdge(), returning microseconds that wrap around like
+                utime.ticks_us (e.g. the simulated clock). If None,
+                utime.ticks_us is used.
+        
+        ≡≡≡ Returns ≡≡≡
+        object: the register backend that was previously installed
+        """
+        global mem32, sleep_us, ticks_us
+        
+        rp2RTC.__armed = False
+        rp2RTC.__edge = None
+        rp2RTC.__edgeLast = None
+        previous = mem32
+        
+        if registers is None:
+            try:
+                from machine import mem32 as registers
+            except ImportError:
+                pass
+        mem32 = registers
+        
+        if sleep is None:
+            sleep = _DEFAULT_SLEEP_US
+        sleep_us = sleep
+        
+        if ticks is None:
+            ticks = _DEFAULT_TICKS_US
+        ticks_us = ticks
+        
+        # The native register access only works with the default backend
+        rp2RTC.__installMethods()
+        
+        return previous
+    
+    
+    @staticmethod
+    def useNative(enable=True):
+        """
+        Switches localtime(), localtime_into(), weekDay() and isLeapYear()
+        between the @micropython.native/@micropython.viper versions in
+        RP2040_RTC_native.py and the pure Python versions in this file. The
+        native versions are enabled when this module is imported, if they can
+        be compiled.
+        
+        The native localtime() and localtime_into() read the registers
+        directly, so they are only used on the RP2040 with the default
+        (machine.mem32) register backend, and not while consistentReads() is
+        enabled. The native weekDay() is not used while useWeekdayTable() is
+        enabled.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        enable: bool, True to use native code, False to use pure Python
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if native code is in use
+        """
+        rp2RTC.__native = bool(enable)
+        rp2RTC.__installMethods()
+        
+        return bool(enable) and _native is not None
+    
+    
+    @staticmethod
+    def __installMethods():
+        """
+        Installs the native or pure Python version of each method that
+        useNative() can replace, for the current native setting, register
+        backend, consistentReads() and useWeekdayTable() settings.
+        """
+        for name in _PYTHON_METHODS:
+            setattr(rp2RTC, name, staticmethod(_PYTHON_METHODS[name]))
+        
+        if rp2RTC.__native and _native is not None:
+            if rp2RTC.__weekdayTable is None:
+                rp2RTC.weekDay = staticmethod(_native.weekDay)
+            rp2RTC.isLeapYear = staticmethod(_native.isLeapYear)
+            
+            if (_native.REGISTERS and mem32 is _DEFAULT_MEM32 and
+                    not rp2RTC.__consistentReads):
+                _native.setFallback(rp2RTC.__sequence,
+                                    _PYTHON_METHODS['localtime'],
+                                    _PYTHON_METHODS['localtime_into'])
+                rp2RTC.localtime = staticmethod(_native.localtime)
+                rp2RTC.localtime_into = staticmethod(_native.localtime_into)
+        
+        # Time the newly installed methods
+        if rp2RTC.__stats is not None:
+            rp2RTC.__wrapMethods()
+    
+    
+    @staticmethod
+    def instrument(enable=True):
+        """
+        Enables or disables instrumentation. While enabled, each call of
+        setRTC(), setRTC_nowait(), localtime(), time(), raw_now(), time_us(),
+        syncEdge(), syncRTC() and setClockDivider() is counted and timed, by
+        a wrapper installed in place of the method, and setRTC(),
+        setRTC_nowait(), syncRTC() and setClockDivider() also count the times
+        they had to wait for the RTC access lock, and the time spent waiting
+        for the RTC to settle. See stats().
+        
+        localtime_into() is not instrumented: the wrapper allocates on the
+        heap, which localtime_into() guarantees not to do.
+        
+        While disabled, the methods run without wrappers, so the only cost is
+        one check in the methods that take the lock. Setting _INSTRUMENTATION
+        to const(0) at the top of RP2040_RTC.py removes that check when the
+        module is compiled, and instrument() then only records the call
+        counts and latencies.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        enable: bool, True to enable instrumentation, False to disable it and
+                drop the statistics
+        """
+        if not enable:
+            rp2RTC.__stats = None
+            for name in rp2RTC.__wrapped:
+                (method, wrapper) = rp2RTC.__wrapped[name]
+                if getattr(rp2RTC, name) is wrapper:
+                    setattr(rp2RTC, name, staticmethod(method))
+            rp2RTC.__wrapped = {}
+            return
+        
+        if rp2RTC.__stats is None:
+            stats = {}
+            for name in rp2RTC.__INSTRUMENTED:
+                stats[name] = [0] * (6 + rp2RTC.__HISTOGRAM_BUCKETS)
+            rp2RTC.__stats = stats
+        rp2RTC.__wrapMethods()
+    
+    
+    @staticmethod
+    def stats(reset=False):
+        """
+        Returns the statistics recorded while instrument() is enabled, for
+        each method that has been called.
+        
+        ≡≡≡ Optional Parameters ≡≡≡
+        reset:  bool, if True the statistics are reset to 0 after being read
+        
+        ≡≡≡ Returns ≡≡≡
+        dict: of method name to a dict of:
+            calls:        int, number of calls
+            total_us:     int, microseconds spent in the method
+            max_us:       int, longest call in microseconds
+            histogram:    tuple of 16 ints, the number of calls that took
+                          0 us, 1 us, 2 - 3 us, 4 - 7 us, ... and 16384 us or
+                          more
+            lock_waits:   int, number of times the RTC access lock was held
+                          by another thread
+            lock_wait_us: int, microseconds spent waiting for the lock
+            settle_us:    int, microseconds spent waiting for register writes
+                          to reach the RTC
+              (empty if instrumentation is disabled)
+        """
+        stats = rp2RTC.__stats
+        result = {}
+        if stats is None:
+            return result
+        
+        for name in stats:
+            record = stats[name]
+            if record[0] or record[3] or record[5]:
+                result[name] = {
+                    'calls': record[0],
+                    'total_us': record[1],
+                    'max_us': record[2],
+                    'histogram': tuple(record[6:]),
+                    'lock_waits': record[3],
+                    'lock_wait_us': record[4],
+                    'settle_us': record[5],
+                }
+            if reset:
+                for i in range(len(record)):
+                    record[i] = 0
+        return result
+    
+    
+    @staticmethod
+    def __wrapMethods():
+        """
+        Installs a timing wrapper in place of each instrumented method that
+        does not have one.
+        """
+        for name in rp2RTC.__INSTRUMENTED:
+            method = getattr(rp2RTC, name)
+            if name in rp2RTC.__wrapped and rp2RTC.__wrapped[name][1] is method:
+                continue
+            wrapper = rp2RTC.__timed(rp2RTC.__stats[name], method)
+            rp2RTC.__wrapped[name] = (method, wrapper)
+            setattr(rp2RTC, name, staticmethod(wrapper))
+    
+    
+    @staticmethod
+    def __timed(record, method):
+        """
+        Returns a wrapper of method that counts and times each call into
+        record.
+        """
+        last = len(record) - 1
+        
+        def timed(*args, **kwargs):
+            start = ticks_us()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = ticks_diff(ticks_us(), start)
+                record[0] += 1
+                record[1] += elapsed
+                if elapsed > record[2]:
+                    record[2] = elapsed
+                
+                # Bucket of the number of bits of elapsed
+                bucket = 6
+                while elapsed and bucket < last:
+                    elapsed >>= 1
+                    bucket += 1
+                record[bucket] += 1
+        
+        return timed
+    
+    
+    @staticmethod
+    def __acquireCounted(name):
+        """
+        Takes the RTC access lock, counting a wait for it in the statistics of
+        a method.
+        """
+        lock = rp2RTC.__RTCAccessLock
+        if lock.acquire(0):
+            return
+        
+        start = ticks_us()
+        lock.acquire()
+        stats = rp2RTC.__stats
+        if stats is not None:
+            stats[name][3] += 1
+            stats[name][4] += ticks_diff(ticks_us(), start)
+
+
+
+class rp2RTCPendingSet:
+    """
+    Handle for a time set started by rp2RTC.setRTC_nowait()
+    
+    ≡≡≡ Methods ≡≡≡
+    done():
+        Polls the RTC, returns True once the new time has been latched.
+    
+    wait():
+        Polls the RTC until the new time has been latched.
+    """
+    
+    def __init__(self, step, state, setup_0, setup_1):
+        self.__step = step
+        self.__state = state
+        self.__setup_0 = setup_0
+        self.__setup_1 = setup_1
+        
+        # Set while done() runs, so that the timer does not run it again from
+        # inside itself
+        self.__busy = False
+        
+        # Bound once, so that the timer callback does not allocate
+        self.__tickCallback = self.__tick
+        self.__finishCallback = self.__finish
+        self.__timer = None
+        if _Timer is not None:
+            self.__timer = _Timer()
+            self.__arm()
+    
+    
+    def done(self):
+        """
+        Polls the RTC registers, and continues the update when the RTC is
+        ready. Call repeatedly until it returns True.
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the RTC has latched the new time
+        """
+        return self.__poll(True)
+    
+    
+    def wait(self):
+        """
+        Polls the RTC registers until the RTC has latched the new time.
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True
+        """
+        while not self.done():
+            pass
+        return True
+    
+    
+    def __poll(self, blocking):
+        """
+        Advances the update by one step, see done().
+        
+        ≡≡≡ Required Parameters ≡≡≡
+        blocking: bool, False to skip the step if the RTC access lock is held
+        
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the RTC has latched the new time
+        """
+        if self.__state and not self.__busy:
+            self.__busy = True
+            try:
+                self.__state = self.__step(self.__state,
+                                           self.__setup_0,
+                                           self.__setup_1,
+                                           blocking)
+            finally:
+                self.__busy = False
+        return not self.__state
+    
+    
+    def __arm(self):
+        """
+        Starts the one-shot timer that continues the update.
+        """
+        timer = self.__timer
+        timer.init(mode=timer.ONE_SHOT, period=1,
+                   callback=self.__tickCallback)
+    
+    
+    def __tick(self, _):
+        """
+        Timer callback, possibly in interrupt context: runs __finish() through
+        micropython.schedule(), as done() takes the RTC access lock.
+        """
+        if _schedule is None:
+            self.__finish(None)
+            return
+        try:
+            _schedule(self.__finishCallback, None)
+        except RuntimeError:
+            # Schedule queue is full, try again on the next tick
+            self.__arm()
+    
+    
+    def __finish(self, _):
+        """
+        Continues the update, and re-arms the timer until it is complete. The
+        RTC access lock is not waited for, as this may run while the main
+        program holds it; the step is retried on the next tick instead.
+        """
+        if not self.__poll(False):
+            self.__arm()
+
+
+# Pure Python implementations of the methods that useNative() can replace
+_PYTHON_METHODS = {
+    'localtime': rp2RTC.localtime,
+    'localtime_into': rp2RTC.localtime_into,
+    'weekDay': rp2RTC.weekDay,
+    'isLeapYear': rp2RTC.isLeapYear,
+}
+
+rp2RTC.useNative()
@@ -0,0 +1,433 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Alarms
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Wall-clock alarms using the match registers (IRQ_SETUP_0/1) of the RP2040 RTC.
+# Pending alarms are kept in a heap, and the hardware match is always
+# programmed for the earliest one. When it fires, the due callbacks are handed
+# to micropython.schedule() and the match is re-armed for the next alarm.
+#
+# Adapted from the Official Raspberry Pi Pico SDK:
+#   - https://github.com/raspberrypi/pico-sdk/blob/afc10f3599c27147a6f34781b7102d86f58aa5f6/src/rp2_common/hardware_rtc/rtc.c
+#     (rtc_set_alarm(), rtc_enable_alarm() and rtc_disable_alarm())
+#
+# RP2040 Datasheet:
+#   - Section 4.8.5 describes the RTC alarm/interrupt
+#   - Section 4.8.6 shows the IRQ_SETUP_0/1 and INTR/INTE registers
+#
+# IMPORTANT NOTES:
+#   - MicroPython's rp2 port does not expose the RTC interrupt (RTC_IRQ, 25) to
+#     Python code. start() therefore uses a machine.Timer that reads the INTR
+#     and RTC registers (no allocation) and only runs irq() when the match has
+#     fired or the earliest alarm is due. Firmware that can attach a handler to
+#     RTC_IRQ may call irq() from it instead, but should also call poll() or
+#     irq() after setRTC().
+#   - The hardware match only fires while the RTC is at exactly the programmed
+#     second. Alarms that are already due, or become due while the match is
+#     being programmed, are dispatched straight away by irq(), and alarms that
+#     the RTC skipped (e.g. when setRTC() moved it forward past them) by the
+#     next poll().
+#   - Alarms are in the same time as the RTC (see setRTC()). Alarms set for a
+#     time before a backwards setRTC() only fire once the RTC reaches them.
+#   - Callbacks receive the 'arg' given to at(). Where micropython.schedule()
+#     is not availible (e.g. CPython), or its queue is full, callbacks are
+#     called directly by irq().
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+try:
+    from heapq import heappush
+    from heapq import heappop
+except ImportError:
+    from uheapq import heappush
+    from uheapq import heappop
+
+try:
+    from micropython import schedule
+except ImportError:
+    schedule = None
+
+from array import array
+
+# The register backend (RP2040_RTC.mem32) is looked up on each access, so
+# that rp2RTC.setBackend() also applies to alarms
+import RP2040_RTC
+
+from RP2040_RTC import rp2RTC
+
+
+class rp2RTCAlarm:
+    """
+    Raspberry Pi Pico RTC alarms - wall-clock callbacks using the RP2040 RTC
+    match registers
+
+    ≡≡≡ Methods ≡≡≡
+    at(year, month, day, hour, minute, second, callback, arg=None):
+        Adds an alarm, returning its id.
+
+    cancel(alarmId):
+        Removes a pending alarm.
+
+    clear():
+        Removes all pending alarms and disables the hardware match.
+
+    pending():
+        Returns the number of pending alarms.
+
+    irq(_=None):
+        Dispatches the due alarms and re-arms the hardware match.
+
+    poll(_=None):
+        Runs irq() if the hardware match has fired or the earliest alarm is
+        due.
+
+    start(period_ms=250):
+        Starts a machine.Timer that calls poll().
+
+    stop():
+        Stops the machine.Timer started by start().
+    """
+
+    # RP2040 RTC memory register constants, precomputed as in rp2RTC
+    __RTC_BASE_MEM = 0x4005c000
+    __ATOMIC_BITMASK_SET = 0x2000
+    __ATOMIC_BITMASK_CLR = 0x3000
+
+    __RTC_IRQ_SETUP_0_MEM = __RTC_BASE_MEM + 0x10
+    __RTC_IRQ_SETUP_0_SET_MEM = __RTC_IRQ_SETUP_0_MEM + __ATOMIC_BITMASK_SET
+    __RTC_IRQ_SETUP_0_CLR_MEM = __RTC_IRQ_SETUP_0_MEM + __ATOMIC_BITMASK_CLR
+    __RTC_IRQ_SETUP_1_MEM = __RTC_BASE_MEM + 0x14
+    __RTC_INTR_MEM = __RTC_BASE_MEM + 0x20
+    __RTC_INTE_SET_MEM = __RTC_BASE_MEM + 0x24 + __ATOMIC_BITMASK_SET
+
+    # Memory Address Offsets
+    __RTC_IRQ_SETUP_0_MATCH_ACTIVE_BITS = 0x20000000
+    __RTC_IRQ_SETUP_0_MATCH_ENA_BITS = 0x10000000
+    __RTC_IRQ_SETUP_0_DATE_ENA_BITS = 0x07000000 # year, month and day
+    __RTC_IRQ_SETUP_1_TIME_ENA_BITS = 0x70000000 # hour, minute and second
+    __RTC_INTR_RTC_BITS = 0x00000001
+
+    __RTC_RTC_1_DATE_BITS = 0x00ffff1f
+    __RTC_RTC_0_TIME_BITS = 0x001f3f3f
+
+    # Pending alarms: a heap of (key, alarmId), where key is the date and time
+    # packed as in IRQ_SETUP_0/1, (date << 24) | time, so that keys sort in
+    # time order. Callbacks are kept by id, so that a cancelled alarm is only
+    # removed from the heap when it reaches the top.
+    __heap = []
+    __callbacks = {}
+    __nextId = 1
+
+    # Key programmed into the match registers, or None if disabled, and its
+    # date and time halves for poll(). __NEVER is a date after every date.
+    __NEVER = 0x1000000
+    __armedKey = None
+    __armedDate = __NEVER
+    __armedTime = 0
+
+    # RTC_1 and RTC_0 as read by poll()
+    __words = array('I', [0, 0])
+
+    # Reentrancy guard: set while the heap is being changed. An irq() that
+    # arrives meanwhile only sets __again, and the running irq() repeats.
+    __busy = False
+    __again = False
+
+    # Set between poll() scheduling irq() and irq() running
+    __scheduled = False
+
+    __timer = None
+
+    @staticmethod
+    def at(year, month, day, hour, minute, second, callback, arg=None):
+        """
+        Adds an alarm that calls callback(arg) when the RTC reaches a specific
+        date and time. If that time has already passed, the callback is
+        dispatched straight away.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        year:     int, representing a valid year in the range of 0 - 4095
+        month:    int, representing a valid month in the range of 1 - 12
+        day:      int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:     int, representing a valid hour in the range of 0 - 23
+        minute:   int, representing a valid minute in the range of 0 - 59
+        second:   int, representing a valid second in the range of 0 - 59
+        callback: function taking one argument
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        arg:      object passed to callback
+
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+
+        ≡≡≡ Returns ≡≡≡
+        int: id of the alarm, for cancel()
+        """
+        # Error Checking. Raises TypeError or ValueError
+        rp2RTC.validate(year, month, day, hour, minute, second)
+
+        key = ((((year << 12) | (month << 8) | day) << 24) |
+               (hour << 16) | (minute << 8) | second)
+
+        # A callback may add alarms while irq() is dispatching, in which case
+        # that irq() stays responsible for re-arming
+        busy = rp2RTCAlarm.__busy
+        rp2RTCAlarm.__busy = True
+        try:
+            alarmId = rp2RTCAlarm.__nextId
+            rp2RTCAlarm.__nextId = alarmId + 1
+            rp2RTCAlarm.__callbacks[alarmId] = (callback, arg)
+            heappush(rp2RTCAlarm.__heap, (key, alarmId))
+        finally:
+            rp2RTCAlarm.__busy = busy
+
+        rp2RTCAlarm.irq()
+        return alarmId
+
+
+    @staticmethod
+    def cancel(alarmId):
+        """
+        Removes a pending alarm. If it was the earliest, the hardware match
+        is programmed for the next one.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        alarmId: int, id returned by at()
+
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the alarm was pending, False if it had already been
+              dispatched or cancelled
+        """
+        if rp2RTCAlarm.__callbacks.pop(alarmId, None) is None:
+            return False
+
+        # irq() drops the cancelled alarm and re-programs the match
+        heap = rp2RTCAlarm.__heap
+        if heap and heap[0][1] == alarmId:
+            rp2RTCAlarm.irq()
+        return True
+
+
+    @staticmethod
+    def clear():
+        """
+        Removes all pending alarms and disables the hardware match.
+        """
+        busy = rp2RTCAlarm.__busy
+        rp2RTCAlarm.__busy = True
+        try:
+            rp2RTCAlarm.__callbacks.clear()
+            rp2RTCAlarm.__heap = []
+        finally:
+            rp2RTCAlarm.__busy = busy
+
+        rp2RTCAlarm.irq()
+
+
+    @staticmethod
+    def pending():
+        """
+        Returns the number of pending alarms.
+
+        ≡≡≡ Returns ≡≡≡
+        int: number of alarms that have not been dispatched or cancelled
+        """
+        return len(rp2RTCAlarm.__callbacks)
+
+
+    @staticmethod
+    def irq(_=None):
+        """
+        Dispatches every alarm that is due, then programs the hardware match
+        for the earliest pending alarm (or disables it if there is none). Can
+        be called at any time, e.g. from an RTC_IRQ handler, a timer or
+        micropython.schedule().
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        _:      ignored, so that irq() can be used as a callback
+        """
+        rp2RTCAlarm.__scheduled = False
+
+        if rp2RTCAlarm.__busy:
+            rp2RTCAlarm.__again = True
+            return
+
+        rp2RTCAlarm.__busy = True
+        try:
+            again = True
+            while again:
+                rp2RTCAlarm.__again = False
+                rp2RTCAlarm.__dispatch(rp2RTCAlarm.__now())
+                rp2RTCAlarm.__program()
+
+                # The RTC may have passed the new alarm while it was being
+                # programmed, in which case the match never fires
+                heap = rp2RTCAlarm.__heap
+                again = (rp2RTCAlarm.__again or
+                         (heap and heap[0][0] <= rp2RTCAlarm.__now()))
+        finally:
+            rp2RTCAlarm.__busy = False
+
+
+    @staticmethod
+    def poll(_=None):
+        """
+        Checks the INTR register and the time of the RTC, and runs irq()
+        (through micropython.schedule() where availible) if the hardware
+        match has fired or the RTC is at or past the earliest alarm (e.g.
+        after setRTC() moved it forward past the alarm, so that the match
+        never fires). Does not allocate on the heap, so may be called from a
+        hard interrupt handler.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        _:      ignored, so that poll() can be used as a timer callback
+
+        ≡≡≡ Returns ≡≡≡
+        bool: True if the hardware match has fired or an alarm is due
+        """
+        if not RP2040_RTC.mem32[rp2RTCAlarm.__RTC_INTR_MEM] & \
+                rp2RTCAlarm.__RTC_INTR_RTC_BITS:
+            # Compared as date and time halves, as the packed key is too large
+            # for a small int on MicroPython
+            words = rp2RTCAlarm.__words
+            rp2RTC.readRegisters(words)
+            date = words[0] & rp2RTCAlarm.__RTC_RTC_1_DATE_BITS
+            if date < rp2RTCAlarm.__armedDate or (
+                    date == rp2RTCAlarm.__armedDate and
+                    words[1] & rp2RTCAlarm.__RTC_RTC_0_TIME_BITS <
+                    rp2RTCAlarm.__armedTime):
+                return False
+
+        if schedule is None:
+            rp2RTCAlarm.irq()
+        elif not rp2RTCAlarm.__scheduled:
+            try:
+                schedule(rp2RTCAlarm.irq, None)
+                rp2RTCAlarm.__scheduled = True
+            except RuntimeError:
+                # Schedule queue is full, try again on the next poll
+                pass
+        return True
+
+
+    @staticmethod
+    def start(period_ms=250):
+        """
+        Starts a periodic machine.Timer that calls poll(). Alarms are then
+        dispatched within period_ms of the hardware match firing.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        period_ms: int, timer period in milliseconds
+        """
+        from machine import Timer
+
+        rp2RTCAlarm.stop()
+        rp2RTCAlarm.__timer = Timer(period=period_ms, mode=Timer.PERIODIC,
+                                    callback=rp2RTCAlarm.poll)
+
+
+    @staticmethod
+    def stop():
+        """
+        Stops the machine.Timer started by start(). Pending alarms are kept.
+        """
+        if rp2RTCAlarm.__timer is not None:
+            rp2RTCAlarm.__timer.deinit()
+            rp2RTCAlarm.__timer = None
+
+
+    @staticmethod
+    def __now():
+        """
+        Returns the date and time of the RTC as a key, which is packed as
+        rp2RTC.raw_now() packs it, or -1 if the RTC is not running.
+        """
+        now = rp2RTC.raw_now()
+        if now is False:
+            return -1
+        return now
+
+
+    @staticmethod
+    def __dispatch(now):
+        """
+        Removes the alarms due at 'now' from the heap and hands their
+        callbacks on.
+        """
+        heap = rp2RTCAlarm.__heap
+        callbacks = rp2RTCAlarm.__callbacks
+
+        while heap and heap[0][0] <= now:
+            entry = callbacks.pop(heappop(heap)[1], None)
+            if entry is None:
+                continue # Cancelled
+
+            (callback, arg) = entry
+            if schedule is None:
+                callback(arg)
+                continue
+            try:
+                schedule(callback, arg)
+            except RuntimeError:
+                # Schedule queue is full
+                callback(arg)
+
+
+    @staticmethod
+    def __program():
+        """
+        Programs the hardware match for the earliest pending alarm, following
+        rtc_set_alarm() of the Pico SDK.
+        """
+        heap = rp2RTCAlarm.__heap
+        callbacks = rp2RTCAlarm.__callbacks
+
+        # Drop cancelled alarms, so that the match is set for a live one
+        while heap and heap[0][1] not in callbacks:
+            heappop(heap)
+
+        key = heap[0][0] if heap else None
+        if key == rp2RTCAlarm.__armedKey:
+            return
+
+        mem32 = RP2040_RTC.mem32
+
+        # Disable the match, and wait for it to stop
+        mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_0_CLR_MEM] = \
+            rp2RTCAlarm.__RTC_IRQ_SETUP_0_MATCH_ENA_BITS
+        while (mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_0_MEM] &
+               rp2RTCAlarm.__RTC_IRQ_SETUP_0_MATCH_ACTIVE_BITS):
+            pass
+        rp2RTCAlarm.__armedKey = None
+        rp2RTCAlarm.__armedDate = rp2RTCAlarm.__NEVER
+
+        if key is None:
+            return
+
+        # Match on every date and time field, but not the day of the week
+        mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_0_MEM] = \
+            (key >> 24) | rp2RTCAlarm.__RTC_IRQ_SETUP_0_DATE_ENA_BITS
+        mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_1_MEM] = \
+            (key & 0xffffff) | rp2RTCAlarm.__RTC_IRQ_SETUP_1_TIME_ENA_BITS
+
+        # Enable the interrupt, then the match, and wait for it to start
+        mem32[rp2RTCAlarm.__RTC_INTE_SET_MEM] = rp2RTCAlarm.__RTC_INTR_RTC_BITS
+        mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_0_SET_MEM] = \
+            rp2RTCAlarm.__RTC_IRQ_SETUP_0_MATCH_ENA_BITS
+        while not (mem32[rp2RTCAlarm.__RTC_IRQ_SETUP_0_MEM] &
+                   rp2RTCAlarm.__RTC_IRQ_SETUP_0_MATCH_ACTIVE_BITS):
+            pass
+        rp2RTCAlarm.__armedKey = key
+        rp2RTCAlarm.__armedTime = key & 0xffffff
+        rp2RTCAlarm.__armedDate = key >> 24
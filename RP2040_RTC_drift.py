@@ -0,0 +1,255 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Drift
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Measures how fast or slow the RP2040 RTC runs against a reference clock (an
+# NTP or GPS derived time, a host over serial, or the virtual clock of
+# RP2040_RTC_sim.py), in parts per million (ppm), and cancels the error by
+# trimming the clk_rtc divider, with the remainder corrected in software. The
+# RTC then needs to be set from the reference far less often.
+#
+# RP2040 Datasheet:
+#   - Section 4.8.6 shows the CLKDIV_M1 register. clk_rtc is 46875 Hz on the
+#     Pico, so one step of the divider changes the rate by about 21 ppm.
+#
+# IMPORTANT NOTES:
+#   - Every sample() calls rp2RTC.syncEdge(), which blocks for up to a second.
+#     The ppm estimate is the drift between the first and the latest sample,
+#     so its error falls as the samples get further apart.
+#   - trim() stops and restarts the RTC (see rp2RTC.setClockDivider()), so the
+#     RTC should be set from the reference after it.
+#   - correction_us() assumes the RTC was set from the reference when reset()
+#     was last called.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from RP2040_RTC import rp2RTC
+
+
+class rp2RTCDrift:
+    """
+    Raspberry Pi Pico RTC drift - measures the rate error of the RP2040 RTC
+    against a reference clock, and trims it
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCDrift(reference, referenceError_us=0, epoch=rp2RTC.EPOCH_UNIX):
+        Creates a drift estimator for a reference clock.
+
+    sample():
+        Reads the RTC and the reference, returning the ppm estimate.
+
+    ppm():
+        Returns the ppm estimate of the latest sample().
+
+    ppmError():
+        Returns a bound on the error of ppm().
+
+    trim():
+        Adjusts the clk_rtc divider to cancel the estimated drift.
+
+    correction_us():
+        Returns the microseconds to add to RTC readings for the drift of
+        ppm() since reset().
+
+    resyncInterval(maxError_us, corrected=True):
+        Returns how long the RTC stays within maxError_us of the reference.
+
+    reset():
+        Drops the samples, e.g. after the RTC has been set.
+    """
+
+    def __init__(self, reference, referenceError_us=0, epoch=rp2RTC.EPOCH_UNIX):
+        """
+        ≡≡≡ Required Parameters ≡≡≡
+        reference:         function returning the reference time, as int
+                           microseconds since the epoch
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        referenceError_us: int, bound on the error of each reference reading,
+                           in microseconds
+        epoch:             int, the year of the epoch of reference(), as for
+                           rp2RTC.time()
+        """
+        self.__reference = reference
+        self.__referenceError_us = referenceError_us
+        self.__epoch = epoch
+
+        # First sample since reset(): (RTC us, reference us, error us)
+        self.__first = None
+        self.__ppm = None
+        self.__ppmError = None
+
+        # RTC time at reset(), in us, from which correction_us() counts
+        self.__origin = None
+
+
+    def sample(self):
+        """
+        Reads the RTC (at a second edge, see rp2RTC.syncEdge()) and the
+        reference, and updates the ppm estimate from the first sample since
+        reset(). Blocks for up to a second.
+
+        ≡≡≡ Returns ≡≡≡
+        float: the estimated drift in ppm, positive if the RTC runs fast, or
+               None if there is only one sample
+
+        bool: False if the onboard RTC is not running.
+        """
+        if rp2RTC.syncEdge(self.__epoch) is False:
+            return False
+        now = rp2RTC.time_us(self.__epoch)
+        reference = self.__reference()
+        if now is False:
+            return False
+
+        rtc = now[0] * 1000000 + now[1]
+        error = now[2] + self.__referenceError_us
+
+        if self.__first is None:
+            self.__first = (rtc, reference, error)
+            return None
+
+        (rtc0, reference0, error0) = self.__first
+        span = reference - reference0
+        if span <= 0:
+            return self.__ppm
+
+        self.__ppm = ((rtc - rtc0) - span) * 1000000 / span
+        self.__ppmError = (error0 + error) * 1000000 / span
+        return self.__ppm
+
+
+    def ppm(self):
+        """
+        Returns the drift estimated by the latest sample(), or after trim(),
+        the drift that the divider could not cancel.
+
+        ≡≡≡ Returns ≡≡≡
+        float: drift in ppm, positive if the RTC runs fast, or None if there
+               are fewer than two samples
+        """
+        return self.__ppm
+
+
+    def ppmError(self):
+        """
+        Returns a bound on the error of ppm(), from the error bounds of the
+        first and latest samples and the time between them.
+
+        ≡≡≡ Returns ≡≡≡
+        float: bound in ppm, or None if there are fewer than two samples
+        """
+        return self.__ppmError
+
+
+    def trim(self):
+        """
+        Adjusts the clk_rtc divider by the estimated drift, rounded to the
+        nearest step, and drops the samples. The RTC is stopped while the
+        divider is changed, so it should be set from the reference afterwards,
+        followed by reset().
+
+        ≡≡≡ Returns ≡≡≡
+        float: the drift in ppm that the divider could not cancel, which
+               becomes ppm() and is corrected by correction_us()
+
+        bool: False if there is no estimate, or the RTC is not running (the
+              divider, ppm() and the samples are left unchanged).
+        """
+        if self.__ppm is None:
+            return False
+
+        # A fast RTC needs more clk_rtc cycles per second
+        previous = rp2RTC.clockDivider()
+        exact = previous * (1 + self.__ppm / 1000000)
+        divider = int(exact + 0.5)
+        if divider < 1:
+            divider = 1
+        elif divider > 65536:
+            divider = 65536
+
+        if not rp2RTC.setClockDivider(divider):
+            # The divider is written even though the RTC is not running. It is
+            # restored, so that ppm() still describes the divider in use.
+            rp2RTC.setClockDivider(previous)
+            return False
+
+        # The error of the estimate carries over to the remaining drift
+        self.__ppm = (exact / divider - 1) * 1000000
+        self.reset()
+        return self.__ppm
+
+
+    def correction_us(self):
+        """
+        Returns the microseconds to add to the RTC time to correct for the
+        drift of ppm() since reset() was last called.
+
+        ≡≡≡ Returns ≡≡≡
+        int: correction in microseconds, 0 if the drift is not known
+        """
+        ppm = self.__ppm
+        if ppm is None or self.__origin is None:
+            return 0
+
+        now = rp2RTC.time_us(self.__epoch)
+        if now is False:
+            return 0
+
+        # The RTC counted (1 + ppm / 1000000) seconds for every second
+        elapsed = now[0] * 1000000 + now[1] - self.__origin
+        return -int(elapsed * ppm / (1000000 + ppm))
+
+
+    def resyncInterval(self, maxError_us, corrected=True):
+        """
+        Returns how long the RTC stays within maxError_us of the reference
+        after being set, at the estimated drift.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        maxError_us: int, the largest acceptable error in microseconds
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        corrected:   bool, True if the RTC time is corrected with
+                     correction_us(), so only the error of the estimate
+                     counts
+
+        ≡≡≡ Returns ≡≡≡
+        float: seconds between resyncs, or None if the drift is not known
+        """
+        if self.__ppmError is None:
+            return None
+
+        ppm = self.__ppmError
+        if not corrected:
+            ppm += abs(self.__ppm)
+
+        if ppm <= 0:
+            return float('inf')
+        return maxError_us / ppm
+
+
+    def reset(self):
+        """
+        Drops the samples. Call this after setting the RTC from the
+        reference: the next sample() starts a new measurement, and
+        correction_us() counts from now. ppm() is kept until the next
+        measurement replaces it.
+        """
+        self.__first = None
+
+        now = rp2RTC.time_us(self.__epoch)
+        if now is False:
+            self.__origin = None
+        else:
+            self.__origin = now[0] * 1000000 + now[1]
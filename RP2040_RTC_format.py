@@ -0,0 +1,268 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Formatting
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Formats the time of the RP2040 RTC as ISO 8601 or with a subset of strftime()
+# into a preallocated buffer, for timestamped logging without allocating a
+# string per line.
+#
+# The format is compiled once into a template holding its literal text. Each
+# render() reads the RTC with rp2RTC.localtime_into() and writes only the
+# fields that changed since the previous render(): the date fields when the
+# date (RTC_1) changes, and the hour and minute digits when they change.
+#
+# Supported strftime() directives (all have a fixed width):
+#   %Y  year, 4 digits            %H  hour, 00 - 23
+#   %y  year, 2 digits            %M  minute, 00 - 59
+#   %m  month, 01 - 12            %S  second, 00 - 59
+#   %d  day, 01 - 31              %a  weekday, 'Sun' - 'Sat'
+#   %j  day of the year, 001-366  %b  month, 'Jan' - 'Dec'
+#   %w  weekday, 0 (Sun) - 6      %%  '%'
+#
+# IMPORTANT NOTES:
+#   - Formats the RTC time as it is set, there is no timezone information (see
+#     RP2040_RTC_tz.py). Append 'Z' to the format if the RTC is set to UTC.
+#   - render() returns a memoryview of the buffer, which is overwritten by the
+#     next render(). Write it out (e.g. uart.write()) before rendering again.
+#   - Literal text is written as UTF-8, so a non-ASCII character takes more
+#     than one byte of the buffer and of length().
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from array import array
+
+from RP2040_RTC import rp2RTC
+
+
+class rp2RTCFormat:
+    """
+    Raspberry Pi Pico RTC formatter - renders the time of the RP2040 RTC into
+    a preallocated buffer
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCFormat(fmt=ISO_8601, buf=None):
+        Compiles a strftime() format.
+
+    render():
+        Writes the RTC time into the buffer, returning a memoryview of it.
+
+    format():
+        Returns the RTC time as a str.
+
+    length():
+        Returns the number of bytes written by render().
+    """
+
+    ISO_8601 = '%Y-%m-%dT%H:%M:%S'
+    ISO_8601_BASIC = '%Y%m%dT%H%M%S'
+
+    # Widths of the directives, and which of them are date fields
+    __WIDTHS = {'Y': 4, 'y': 2, 'm': 2, 'd': 2, 'j': 3, 'w': 1, 'a': 3, 'b': 3,
+                'H': 2, 'M': 2, 'S': 2}
+    __DATE_FIELDS = 'Yymdjwab'
+
+    __WEEKDAY_NAMES = b'SunMonTueWedThuFriSat'
+    __MONTH_NAMES = b'JanFebMarAprMayJunJulAugSepOctNovDec'
+
+    # Days before the first of each month, in a non-leap year
+    __MONTH_STARTS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+    def __init__(self, fmt=ISO_8601, buf=None):
+        """
+        ≡≡≡ Optional Parameters ≡≡≡
+        fmt:    str, strftime() format, using the directives listed in
+                RP2040_RTC_format.py
+        buf:    bytearray or memoryview to render into, of at least length()
+                bytes. Only the first length() bytes are written. If None, a
+                bytearray is allocated.
+
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if fmt is not a str
+        ValueError: if fmt has an unsupported directive, or buf is too short
+        """
+        if not isinstance(fmt, str):
+            raise TypeError('Parameter fmt received parameter of type ' +
+                            str(type(fmt)) +
+                            ' - expected parameter of type \'str\'.')
+
+        # Compile the format into its literal text and the positions of the
+        # fields: (position, directive), in the order of the format
+        template = bytearray()
+        dateFields = []
+        hours = []
+        minutes = []
+        seconds = []
+
+        i = 0
+        while i < len(fmt):
+            char = fmt[i]
+            i += 1
+            if char != '%':
+                template.extend(char.encode())
+                continue
+            if i == len(fmt):
+                raise ValueError('Format \'' + fmt + '\' ends with \'%\'.')
+            char = fmt[i]
+            i += 1
+            if char == '%':
+                template.append(0x25)
+                continue
+            if char not in rp2RTCFormat.__WIDTHS:
+                raise ValueError('Unsupported directive \'%' + char +
+                                 '\' in format \'' + fmt + '\'.')
+
+            position = len(template)
+            if char == 'H':
+                hours.append(position)
+            elif char == 'M':
+                minutes.append(position)
+            elif char == 'S':
+                seconds.append(position)
+            else:
+                dateFields.append((position, char))
+            template.extend(b'0' * rp2RTCFormat.__WIDTHS[char])
+
+        if buf is None:
+            buf = bytearray(len(template))
+        elif len(buf) < len(template):
+            raise ValueError('Parameter buf is ' + str(len(buf)) +
+                             ' bytes - format \'' + fmt + '\' needs ' +
+                             str(len(template)) + ' bytes.')
+
+        self.fmt = fmt
+        self.__buf = buf
+        self.__view = memoryview(buf)[:len(template)]
+        self.__view[:] = template
+
+        self.__dateFields = tuple(dateFields)
+        self.__hours = tuple(hours)
+        self.__minutes = tuple(minutes)
+        self.__seconds = tuple(seconds)
+
+        # RTC time, as set by rp2RTC.localtime_into()
+        self.__time = array('H', [0] * 7)
+
+        # Rendered date (year << 9 | month << 5 | day), hour and minute, or -1
+        # if not rendered yet
+        self.__date = -1
+        self.__hour = -1
+        self.__minute = -1
+
+
+    def render(self):
+        """
+        Writes the time of the RP2040 RTC into the buffer. Nothing is
+        allocated on the heap.
+
+        ≡≡≡ Returns ≡≡≡
+        memoryview: of the first length() bytes of the buffer
+
+        bool: False if the onboard RTC is not running (the buffer is not
+              modified).
+        """
+        t = self.__time
+        if not rp2RTC.localtime_into(t):
+            return False
+
+        buf = self.__view
+
+        date = (t[0] << 9) | (t[1] << 5) | t[2]
+        if date != self.__date:
+            self.__renderDate(t)
+            self.__date = date
+
+        if t[3] != self.__hour:
+            self.__hour = t[3]
+            for i in self.__hours:
+                buf[i] = 0x30 + t[3] // 10
+                buf[i + 1] = 0x30 + t[3] % 10
+
+        if t[4] != self.__minute:
+            self.__minute = t[4]
+            for i in self.__minutes:
+                buf[i] = 0x30 + t[4] // 10
+                buf[i + 1] = 0x30 + t[4] % 10
+
+        for i in self.__seconds:
+            buf[i] = 0x30 + t[5] // 10
+            buf[i + 1] = 0x30 + t[5] % 10
+
+        return buf
+
+
+    def format(self):
+        """
+        Returns the time of the RP2040 RTC, formatted. Unlike render(), this
+        allocates a str.
+
+        ≡≡≡ Returns ≡≡≡
+        str: the formatted time
+
+        bool: False if the onboard RTC is not running.
+        """
+        view = self.render()
+        if view is False:
+            return False
+        # The literal text of the format is encoded as UTF-8 in the template
+        return str(bytes(view), 'utf-8')
+
+
+    def length(self):
+        """
+        Returns the number of bytes written by render().
+
+        ≡≡≡ Returns ≡≡≡
+        int: length of the formatted time
+        """
+        return len(self.__view)
+
+
+    def __renderDate(self, t):
+        """
+        Writes the date fields, after the date has changed.
+        """
+        buf = self.__view
+        (year, month, day) = (t[0], t[1], t[2])
+
+        for (i, char) in self.__dateFields:
+            if char == 'Y':
+                buf[i] = 0x30 + year // 1000
+                buf[i + 1] = 0x30 + year // 100 % 10
+                buf[i + 2] = 0x30 + year // 10 % 10
+                buf[i + 3] = 0x30 + year % 10
+            elif char == 'y':
+                buf[i] = 0x30 + year // 10 % 10
+                buf[i + 1] = 0x30 + year % 10
+            elif char == 'm':
+                buf[i] = 0x30 + month // 10
+                buf[i + 1] = 0x30 + month % 10
+            elif char == 'd':
+                buf[i] = 0x30 + day // 10
+                buf[i + 1] = 0x30 + day % 10
+            elif char == 'j':
+                yearDay = rp2RTCFormat.__MONTH_STARTS[month - 1] + day
+                if month > 2 and rp2RTC.isLeapYear(year):
+                    yearDay += 1
+                buf[i] = 0x30 + yearDay // 100
+                buf[i + 1] = 0x30 + yearDay // 10 % 10
+                buf[i + 2] = 0x30 + yearDay % 10
+            elif char == 'w':
+                buf[i] = 0x30 + t[6]
+            elif char == 'a':
+                names = rp2RTCFormat.__WEEKDAY_NAMES
+                for j in range(3):
+                    buf[i + j] = names[t[6] * 3 + j]
+            else:
+                names = rp2RTCFormat.__MONTH_NAMES
+                for j in range(3):
+                    buf[i + j] = names[(month - 1) * 3 + j]
@@ -0,0 +1,178 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Native Code
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# @micropython.native and @micropython.viper versions of the hot paths of
+# rp2RTC in RP2040_RTC.py. rp2RTC.useNative() installs them in place of the
+# pure Python implementations, which is done automatically when RP2040_RTC is
+# imported and this module can be compiled.
+#
+# MicroPython documentation:
+#   - https://docs.micropython.org/en/latest/reference/speed_python.html
+#     describes the native and viper code emitters, const() and ptr32().
+#
+# IMPORTANT NOTES:
+#   - This module can only be imported by a MicroPython build with the native
+#     and viper emitters enabled (as in the official RP2040 firmware). Other
+#     builds raise SyntaxError (or ImportError on CPython), and rp2RTC keeps
+#     the pure Python implementations.
+#   - localtime() and localtime_into() read the RTC registers through a viper
+#     ptr32 at RTC_BASE (0x4005C000), not through machine.mem32, so they are
+#     only used on the RP2040 (REGISTERS) with the default register backend.
+#   - The native localtime() and localtime_into() only handle the common case:
+#     a running RTC that rp2RTC is not writing. They read the CTRL register
+#     and rp2RTC's sequence counter (see setFallback()), and call the pure
+#     Python version if the RTC is not running or a write is in progress. So
+#     arm(), the sequence spin limit and readRetries() behave as in the pure
+#     Python versions.
+#   - rp2RTC does not install the native localtime() and localtime_into()
+#     while rp2RTC.consistentReads() is enabled, and the native weekDay()
+#     while rp2RTC.useWeekdayTable() is enabled.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+import micropython
+from micropython import const
+
+import sys
+
+# RP2040 RTC register word indexes from RTC_BASE (byte offset / 4)
+_RTC_CTRL = const(3)
+_RTC_RTC_1 = const(6)
+_RTC_RTC_0 = const(7)
+
+# Memory Address Offsets
+_RTC_CTRL_RTC_ACTIVE_BITS = const(0x00000002)
+
+# Sequence counter of writes to the RTC registers, and the pure Python
+# localtime() and localtime_into(), shared with rp2RTC by setFallback() (see
+# rp2RTC.__sequence)
+_sequence = bytearray(4)
+_pythonLocaltime = None
+_pythonLocaltimeInto = None
+
+# Weekday calculation, as in rp2RTC
+_WEEKDAY_STRINGS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                    'Friday', 'Saturday')
+_DOOMSDAYS = (3, 28, 14, 4, 9, 6, 11, 8, 5, 10, 7, 12)
+
+# The RTC registers can only be accessed directly on the RP2040
+REGISTERS = sys.platform == 'rp2'
+
+
+@micropython.native
+def localtime(tz=None):
+    """
+    Native version of rp2RTC.localtime(). Viper functions cannot have default
+    arguments, so the register reads are done by _localtime().
+    """
+    if tz is not None:
+        return tz.localtime()
+    return _localtime()
+
+
+@micropython.viper
+def _localtime():
+    rtc = ptr32(0x4005c000)
+    sequence = ptr32(_sequence)
+
+    # Note: RTC_0 should be read before RTC_1. The pure Python version checks
+    # whether the RTC is running (or armed), and re-reads while rp2RTC is
+    # writing the registers.
+    start = sequence[0]
+    rtc_0 = rtc[_RTC_RTC_0]
+    rtc_1 = rtc[_RTC_RTC_1]
+    if (not (rtc[_RTC_CTRL] & _RTC_CTRL_RTC_ACTIVE_BITS) or (start & 1) or
+            start != sequence[0]):
+        return _pythonLocaltime()
+
+    return ((rtc_1 >> 12) & 0xfff,
+            (rtc_1 >> 8) & 0xf,
+            rtc_1 & 0x1f,
+            (rtc_0 >> 16) & 0x1f,
+            (rtc_0 >> 8) & 0x3f,
+            rtc_0 & 0x3f,
+            (rtc_0 >> 24) & 0x7)
+
+
+@micropython.viper
+def localtime_into(buf):
+    """
+    Native version of rp2RTC.localtime_into().
+    """
+    rtc = ptr32(0x4005c000)
+    sequence = ptr32(_sequence)
+
+    # As in _localtime()
+    start = sequence[0]
+    rtc_0 = rtc[_RTC_RTC_0]
+    rtc_1 = rtc[_RTC_RTC_1]
+    if (not (rtc[_RTC_CTRL] & _RTC_CTRL_RTC_ACTIVE_BITS) or (start & 1) or
+            start != sequence[0]):
+        return _pythonLocaltimeInto(buf)
+
+    buf[0] = (rtc_1 >> 12) & 0xfff
+    buf[1] = (rtc_1 >> 8) & 0xf
+    buf[2] = rtc_1 & 0x1f
+    buf[3] = (rtc_0 >> 16) & 0x1f
+    buf[4] = (rtc_0 >> 8) & 0x3f
+    buf[5] = rtc_0 & 0x3f
+    buf[6] = (rtc_0 >> 24) & 0x7
+
+    return True
+
+
+def setFallback(sequence, localtime, localtime_into):
+    """
+    Shares rp2RTC's sequence counter (an array('I') of one element), and the
+    pure Python localtime() and localtime_into() to call when the RTC is not
+    running or is being written, with the native localtime() and
+    localtime_into().
+    """
+    global _sequence, _pythonLocaltime, _pythonLocaltimeInto
+    _sequence = sequence
+    _pythonLocaltime = localtime
+    _pythonLocaltimeInto = localtime_into
+
+
+@micropython.native
+def weekDay(year, month, day, asString=False):
+    """
+    Native version of rp2RTC.weekDay().
+    """
+    # The year's anchor day for each doomsday
+    anchorDay = 2 + year + year // 4 - year // 100 + year // 400
+
+    # In leap years the doomsdays of January and February are a day later
+    doomsday = _DOOMSDAYS[month - 1]
+    if month <= 2 and (year % 4 == 0 and year % 100 != 0 or year % 400 == 0):
+        doomsday += 1
+
+    dayOfWeek = (day - doomsday + anchorDay) % 7
+
+    if asString:
+        return _WEEKDAY_STRINGS[dayOfWeek]
+    return dayOfWeek
+
+
+@micropython.native
+def isLeapYear(year):
+    """
+    Native version of rp2RTC.isLeapYear().
+    """
+    if year % 4 == 0 and year % 100 != 0:
+        return True
+    elif year % 400 == 0:
+        return True
+    else:
+        return False
@@ -0,0 +1,351 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Parsing
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Parses times received from a host or gateway, as ISO 8601 text or as 8-byte
+# binary records, and sets the RP2040 RTC from them with rp2RTC.setRTC().
+#
+# The parsers read the digits and bytes of a bytes, bytearray or memoryview in
+# place, without slicing it or making strings, and store the fields into a
+# preallocated array. Values are checked with rp2RTC.validate_code(), the
+# checks done by setRTC().
+#
+# ISO 8601 times are accepted in the extended and basic forms, with 'T' or a
+# space between the date and the time, optional fractions of a second (which
+# are ignored) and an optional 'Z':
+#   2021-06-04T12:00:01   2021-06-04 12:00:01.250Z   20210604T120001Z
+#
+# Binary records are the RTC's own register layout, as two little-endian 32
+# bit words: SETUP_0/RTC_1 (year << 12 | month << 8 | day), then SETUP_1/RTC_0
+# (hour << 16 | minute << 8 | second). The day of the week bits of the second
+# word are ignored, any other bit outside the fields is an error. pack()
+# builds a record.
+#
+# IMPORTANT NOTES:
+#   - Times with a UTC offset other than 'Z' (e.g. '+02:00') are rejected.
+#   - The set methods share one array for the parsed fields, so they must not
+#     be called from two threads at once.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from array import array
+
+from RP2040_RTC import rp2RTC
+
+
+class rp2RTCParse:
+    """
+    Raspberry Pi Pico RTC parsing - sets the RP2040 RTC from ISO 8601 text or
+    binary records, without allocating substrings
+
+    ≡≡≡ Methods ≡≡≡
+    parseISO8601(data, out, start=0, end=None):
+        Parses an ISO 8601 time into an array of fields.
+
+    parseBinary(data, out, start=0):
+        Parses an 8-byte binary record into an array of fields.
+
+    pack(year, month, day, hour, minute, second):
+        Returns the 8-byte binary record of a time.
+
+    setISO8601(data):
+        Sets the RP2040 internal RTC from an ISO 8601 time.
+
+    setBinary(data):
+        Sets the RP2040 internal RTC from an 8-byte binary record.
+
+    batchISO8601(data):
+        Sets the RTC from the last valid time of lines of ISO 8601 times.
+
+    batchBinary(data):
+        Sets the RTC from the last valid record of a run of binary records.
+    """
+
+    # Error code of a malformed time, alongside the codes of
+    # rp2RTC.validate_code()
+    ERR_SYNTAX = 0x40
+
+    # Size of a binary record
+    BINARY_SIZE = 8
+
+    # Fields parsed by the set methods: (year, month, day, hour, minute,
+    # second)
+    __fields = array('H', [0] * 6)
+
+    @staticmethod
+    def parseISO8601(data, out, start=0, end=None):
+        """
+        Parses an ISO 8601 time, without allocating memory.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the ASCII time
+        out:    array('H'), array('I') or list with at least 6 elements, set
+                to (year, month, day, hour, minute, second)
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        start:  int, index of the first byte of the time in data
+        end:    int, index after the last byte of the time, or None for the
+                end of data
+
+        ≡≡≡ Returns ≡≡≡
+        int: rp2RTC.VALID (0) if the time is legal, ERR_SYNTAX if it is
+             malformed (out is then undefined), or an error code of
+             rp2RTC.validate_code() if a field is out of range
+        """
+        if end is None:
+            end = len(data)
+
+        # Extended (2021-06-04T12:00:01) or basic (20210604T120001) form
+        extended = end - start >= 5 and data[start + 4] == 0x2d
+        if extended:
+            if end - start < 19:
+                return rp2RTCParse.ERR_SYNTAX
+            if (data[start + 7] != 0x2d or data[start + 13] != 0x3a or
+                    data[start + 16] != 0x3a):
+                return rp2RTCParse.ERR_SYNTAX
+            positions = (0, 5, 8, 11, 14, 17)
+            i = start + 19
+        else:
+            if end - start < 15:
+                return rp2RTCParse.ERR_SYNTAX
+            positions = (0, 4, 6, 9, 11, 13)
+            i = start + 15
+
+        separator = data[start + positions[3] - 1]
+        if separator != 0x54 and separator != 0x20:
+            return rp2RTCParse.ERR_SYNTAX
+
+        # Year
+        value = 0
+        for j in range(start, start + 4):
+            digit = data[j] - 0x30
+            if not 0 <= digit <= 9:
+                return rp2RTCParse.ERR_SYNTAX
+            value = value * 10 + digit
+        out[0] = value
+
+        # Month, day, hour, minute and second
+        for field in range(1, 6):
+            j = start + positions[field]
+            high = data[j] - 0x30
+            low = data[j + 1] - 0x30
+            if not (0 <= high <= 9 and 0 <= low <= 9):
+                return rp2RTCParse.ERR_SYNTAX
+            out[field] = high * 10 + low
+
+        # Fractions of a second, then 'Z'
+        if i < end and (data[i] == 0x2e or data[i] == 0x2c):
+            i += 1
+            if i == end or not 0x30 <= data[i] <= 0x39:
+                return rp2RTCParse.ERR_SYNTAX
+            while i < end and 0x30 <= data[i] <= 0x39:
+                i += 1
+        if i < end and data[i] == 0x5a:
+            i += 1
+        if i != end:
+            return rp2RTCParse.ERR_SYNTAX
+
+        return rp2RTC.validate_code(out[0], out[1], out[2],
+                                    out[3], out[4], out[5])
+
+
+    @staticmethod
+    def parseBinary(data, out, start=0):
+        """
+        Parses an 8-byte binary record, without allocating memory.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the record
+        out:    array('H'), array('I') or list with at least 6 elements, set
+                to (year, month, day, hour, minute, second)
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        start:  int, index of the first byte of the record in data
+
+        ≡≡≡ Returns ≡≡≡
+        int: rp2RTC.VALID (0) if the time is legal, ERR_SYNTAX if data is too
+             short or has bits set outside the fields, or an error code of
+             rp2RTC.validate_code() if a field is out of range
+        """
+        if len(data) - start < 8:
+            return rp2RTCParse.ERR_SYNTAX
+
+        # Bits outside the fields, checked a byte at a time so that no word
+        # is larger than a small int. The day of the week bits of the time
+        # word are allowed.
+        if (data[start] & 0xe0 or data[start + 3] or
+                data[start + 4] & 0xc0 or data[start + 5] & 0xc0 or
+                data[start + 6] & 0xe0 or data[start + 7] & 0xf8):
+            return rp2RTCParse.ERR_SYNTAX
+
+        out[0] = (data[start + 2] << 4) | (data[start + 1] >> 4)
+        out[1] = data[start + 1] & 0x0f
+        out[2] = data[start]
+        out[3] = data[start + 6]
+        out[4] = data[start + 5]
+        out[5] = data[start + 4]
+
+        return rp2RTC.validate_code(out[0], out[1], out[2],
+                                    out[3], out[4], out[5])
+
+
+    @staticmethod
+    def pack(year, month, day, hour, minute, second):
+        """
+        Returns the 8-byte binary record of a time, as parsed by
+        parseBinary().
+
+        ≡≡≡ Required Parameters ≡≡≡
+        year:   int, representing a valid year in the range of 0 - 4095
+        month:  int, representing a valid month in the range of 1 - 12
+        day:    int, representing a valid date in the range of 1..[28,29,30,31]
+        hour:   int, representing a valid hour in the range of 0 - 23
+        minute: int, representing a valid minute in the range of 0 - 59
+        second: int, representing a valid second in the range of 0 - 59
+
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if the supplied parameter type is not an integer
+        ValueError: if the supplied parameter is outside the legal range
+
+        ≡≡≡ Returns ≡≡≡
+        bytes: the record
+        """
+        # Error Checking. Raises TypeError or ValueError
+        rp2RTC.validate(year, month, day, hour, minute, second)
+
+        return bytes((day, month | ((year & 0x0f) << 4), year >> 4, 0,
+                      second, minute, hour, 0))
+
+
+    @staticmethod
+    def setISO8601(data):
+        """
+        Sets the RP2040 internal RTC from an ISO 8601 time.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the ASCII time
+
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if the time is malformed, or a field is outside the legal
+                    range
+
+        ≡≡≡ Returns ≡≡≡
+        bool: True if successful, False if unsuccessful.
+        """
+        fields = rp2RTCParse.__fields
+        if rp2RTCParse.parseISO8601(data, fields) == rp2RTCParse.ERR_SYNTAX:
+            raise ValueError('Malformed ISO 8601 time')
+        return rp2RTC.setRTC(fields[0], fields[1], fields[2],
+                             fields[3], fields[4], fields[5])
+
+
+    @staticmethod
+    def setBinary(data):
+        """
+        Sets the RP2040 internal RTC from an 8-byte binary record.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the record
+
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if the record is malformed, or a field is outside the
+                    legal range
+
+        ≡≡≡ Returns ≡≡≡
+        bool: True if successful, False if unsuccessful.
+        """
+        fields = rp2RTCParse.__fields
+        if rp2RTCParse.parseBinary(data, fields) == rp2RTCParse.ERR_SYNTAX:
+            raise ValueError('Malformed binary time record')
+        return rp2RTC.setRTC(fields[0], fields[1], fields[2],
+                             fields[3], fields[4], fields[5])
+
+
+    @staticmethod
+    def batchISO8601(data):
+        """
+        Checks lines of ISO 8601 times (separated by '\\n' or '\\r\\n'), and
+        sets the RP2040 internal RTC from the last valid one. Invalid lines
+        are skipped.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the lines
+
+        ≡≡≡ Returns ≡≡≡
+        int: index of the line the RTC was set from, or -1 if no line is
+             valid (the RTC is not changed)
+
+        bool: False if the onboard RTC is not running.
+        """
+        fields = rp2RTCParse.__fields
+        found = -1
+        foundStart = 0
+        foundEnd = 0
+
+        line = 0
+        start = 0
+        size = len(data)
+        while start < size:
+            end = start
+            while end < size and data[end] != 0x0a:
+                end += 1
+            stop = end
+            if stop > start and data[stop - 1] == 0x0d:
+                stop -= 1
+            if rp2RTCParse.parseISO8601(data, fields, start, stop) == rp2RTC.VALID:
+                found = line
+                foundStart = start
+                foundEnd = stop
+            line += 1
+            start = end + 1
+
+        if found < 0:
+            return -1
+
+        # Parse the last valid line again, rather than saving every valid
+        # line's fields
+        rp2RTCParse.parseISO8601(data, fields, foundStart, foundEnd)
+        if not rp2RTC.setRTC(fields[0], fields[1], fields[2],
+                             fields[3], fields[4], fields[5]):
+            return False
+        return found
+
+
+    @staticmethod
+    def batchBinary(data):
+        """
+        Checks a run of 8-byte binary records, and sets the RP2040 internal
+        RTC from the last valid one. Invalid records, and bytes after the last
+        whole record, are skipped.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview holding the records
+
+        ≡≡≡ Returns ≡≡≡
+        int: index of the record the RTC was set from, or -1 if no record is
+             valid (the RTC is not changed)
+
+        bool: False if the onboard RTC is not running.
+        """
+        fields = rp2RTCParse.__fields
+
+        # Only the last valid record is set, so search backwards
+        record = len(data) // 8 - 1
+        while record >= 0:
+            if rp2RTCParse.parseBinary(data, fields, record * 8) == rp2RTC.VALID:
+                if not rp2RTC.setRTC(fields[0], fields[1], fields[2],
+                                     fields[3], fields[4], fields[5]):
+                    return False
+                return record
+            record -= 1
+        return -1
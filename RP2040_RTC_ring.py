@@ -0,0 +1,297 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Timestamp Ring Buffer
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Keeps the timestamps of the last N events in a fixed-size ring buffer, as the
+# raw RTC_1 (date) and RTC_0 (time) register words in an array('I'): 8 bytes
+# per event, instead of a localtime() tuple of 7 ints. The words are only
+# decoded into (year, month, day, hour, minute, second, dotw) when the buffer
+# is indexed or iterated.
+#
+# Each entry is the RTC_1 word followed by the RTC_0 word, so tobytes() and
+# export_into() give records in the layout of the QUERY response of
+# RP2040_RTC_sync.py, oldest first.
+#
+# IMPORTANT NOTES:
+#   - append() reads two registers and stores two words. It does not allocate
+#     on the heap and does not take the RTC access lock, so it may be called
+#     from a hard interrupt handler.
+#   - append() reads the registers as localtime() does: it re-reads them
+#     while rp2RTC is writing them, but gives up after 1000 attempts, so that
+#     an interrupt handler cannot spin on a write it interrupted, and honours
+#     rp2RTC.consistentReads(). Re-reads are counted in rp2RTC.readRetries().
+#   - append() does not check that the RTC is running. A stopped RTC gives the
+#     time at which it was stopped.
+#   - Entries appended while the buffer is being iterated may overwrite the
+#     oldest entries before they are read.
+#   - tobytes() and export_into() write the words in the byte order of the
+#     machine, which is little-endian on the RP2040. They copy the bytes of
+#     the words through a byte view of the array (uctypes.bytearray_at() on
+#     MicroPython, memoryview.cast() on CPython), as slices of an array('I')
+#     cannot be assigned to a byte buffer.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from array import array
+
+try:
+    # MicroPython's memoryview has no cast()
+    from uctypes import addressof
+    from uctypes import bytearray_at
+except ImportError:
+    addressof = None
+
+from RP2040_RTC import rp2RTC
+
+
+class rp2RTCRing:
+    """
+    Raspberry Pi Pico RTC ring buffer - keeps the last N timestamps of the
+    RP2040 RTC as raw register words
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCRing(size):
+        Creates an empty ring buffer for size timestamps.
+
+    append():
+        Stores the current time of the RTC, overwriting the oldest timestamp
+        when the buffer is full.
+
+    append_raw(rtc_1, rtc_0):
+        Stores a timestamp read from the RTC registers by other means.
+
+    raw(index):
+        Returns a timestamp as its (rtc_1, rtc_0) register words.
+
+    clear():
+        Removes all timestamps.
+
+    tobytes():
+        Returns the timestamps as bytes, oldest first.
+
+    export_into(buf):
+        Writes the timestamps into a preallocated buffer, oldest first.
+
+    decode(rtc_1, rtc_0):
+        Decodes register words into a localtime() tuple.
+
+    len(ring), ring[index], iter(ring):
+        Number of timestamps, and timestamps decoded as localtime() tuples,
+        oldest first.
+    """
+
+    # Bytes per timestamp in tobytes() and export_into()
+    RECORD_SIZE = 8
+
+    def __init__(self, size):
+        """
+        ≡≡≡ Required Parameters ≡≡≡
+        size:   int, number of timestamps kept
+
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if size is not an int
+        ValueError: if size is less than 1
+        """
+        if not isinstance(size, int):
+            raise TypeError('Parameter size received parameter of type ' +
+                            str(type(size)) +
+                            ' - expected parameter of type \'int\'.')
+        if size < 1:
+            raise ValueError('Parameter size is ' + str(size) +
+                             ' - expected 1 or more.')
+
+        self.size = size
+        self.__words = array('I', [0] * (2 * size))
+
+        # The same storage, a byte at a time, for export_into()
+        if addressof is None:
+            self.__bytes = memoryview(self.__words).cast('B')
+        else:
+            self.__bytes = memoryview(bytearray_at(
+                addressof(self.__words), size * rp2RTCRing.RECORD_SIZE))
+
+        # Index of the next entry to write, and the number of entries
+        self.__head = 0
+        self.__count = 0
+
+
+    def append(self):
+        """
+        Stores the current time of the RP2040 RTC, overwriting the oldest
+        timestamp when the buffer is full. Nothing is allocated on the heap.
+        """
+        rp2RTC.readRegisters(self.__words, 2 * self.__head)
+        self.__advance()
+
+
+    def append_raw(self, rtc_1, rtc_0):
+        """
+        Stores a timestamp read from the RTC registers by other means, e.g. by
+        an interrupt handler. Nothing is allocated on the heap.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        rtc_1:  int, value of the RTC_1 register (date)
+        rtc_0:  int, value of the RTC_0 register (time)
+        """
+        head = self.__head
+        words = self.__words
+        words[2 * head] = rtc_1
+        words[2 * head + 1] = rtc_0
+        self.__advance()
+
+
+    def raw(self, index):
+        """
+        Returns a timestamp as its register words.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        index:  int, 0 for the oldest timestamp, -1 for the newest
+
+        ≡≡≡ Raises ≡≡≡
+        IndexError: if there is no timestamp at index
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (rtc_1, rtc_0)
+        """
+        entry = self.__entry(index)
+        return (self.__words[2 * entry], self.__words[2 * entry + 1])
+
+
+    def clear(self):
+        """
+        Removes all timestamps.
+        """
+        self.__head = 0
+        self.__count = 0
+
+
+    def tobytes(self):
+        """
+        Returns the timestamps as bytes, RECORD_SIZE bytes per timestamp
+        (the RTC_1 word, then the RTC_0 word), oldest first.
+
+        ≡≡≡ Returns ≡≡≡
+        bytes: len(ring) * RECORD_SIZE bytes
+        """
+        buf = bytearray(self.__count * rp2RTCRing.RECORD_SIZE)
+        self.export_into(buf)
+        return bytes(buf)
+
+
+    def export_into(self, buf):
+        """
+        Writes the timestamps into a preallocated buffer, in the layout of
+        tobytes(), e.g. a buffer that is reused for each transmission.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        buf:    bytearray or memoryview of at least len(ring) * RECORD_SIZE
+                bytes
+
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if buf is too short
+
+        ≡≡≡ Returns ≡≡≡
+        int: number of bytes written
+        """
+        count = self.__count
+        length = count * rp2RTCRing.RECORD_SIZE
+        if len(buf) < length:
+            raise ValueError('Parameter buf is ' + str(len(buf)) +
+                             ' bytes - ' + str(count) +
+                             ' timestamps need ' + str(length) + ' bytes.')
+
+        # Oldest entries from the first entry after the newest to the end of
+        # the array, then from the start of the array. Offsets are in bytes.
+        data = self.__bytes
+        size = rp2RTCRing.RECORD_SIZE
+        head = self.__head * size
+        first = self.__head - count
+        if first < 0:
+            split = -first * size
+            buf[0:split] = data[(self.size + first) * size:]
+            buf[split:length] = data[0:head]
+        else:
+            buf[0:length] = data[first * size:head]
+        return length
+
+
+    @staticmethod
+    def decode(rtc_1, rtc_0):
+        """
+        Decodes the RTC_1 and RTC_0 register words.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        rtc_1:  int, value of the RTC_1 register (date)
+        rtc_0:  int, value of the RTC_0 register (time)
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw), as returned by
+               rp2RTC.localtime()
+        """
+        return ((rtc_1 >> 12) & 0xfff,
+                (rtc_1 >> 8) & 0xf,
+                rtc_1 & 0x1f,
+                (rtc_0 >> 16) & 0x1f,
+                (rtc_0 >> 8) & 0x3f,
+                rtc_0 & 0x3f,
+                (rtc_0 >> 24) & 0x7)
+
+
+    def __len__(self):
+        return self.__count
+
+
+    def __getitem__(self, index):
+        entry = self.__entry(index)
+        return rp2RTCRing.decode(self.__words[2 * entry],
+                                 self.__words[2 * entry + 1])
+
+
+    def __iter__(self):
+        words = self.__words
+        entry = self.__head - self.__count
+        if entry < 0:
+            entry += self.size
+        for _ in range(self.__count):
+            yield rp2RTCRing.decode(words[2 * entry], words[2 * entry + 1])
+            entry += 1
+            if entry == self.size:
+                entry = 0
+
+
+    def __advance(self):
+        """
+        Moves past the entry just written.
+        """
+        head = self.__head + 1
+        if head == self.size:
+            head = 0
+        self.__head = head
+        if self.__count < self.size:
+            self.__count += 1
+
+
+    def __entry(self, index):
+        """
+        Returns the array entry of a timestamp, 0 being the oldest and -1 the
+        newest.
+        """
+        count = self.__count
+        position = index + count if index < 0 else index
+        if not 0 <= position < count:
+            raise IndexError('Index ' + str(index) + ' out of range for ' +
+                             str(count) + ' timestamps.')
+        entry = self.__head - count + position
+        if entry < 0:
+            entry += self.size
+        return entry
@@ -0,0 +1,527 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Register Simulator
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# A host-side (CPython) model of the RP2040 RTC register block, usable as a
+# drop-in replacement for machine.mem32 so that RP2040_RTC.py can be run,
+# tested and benchmarked off the board:
+#
+#     from RP2040_RTC import rp2RTC
+#     from RP2040_RTC_sim import rp2RTCSim
+#
+#     sim = rp2RTCSim()
+#     rp2RTC.setBackend(sim, sim.sleep_us, sim.ticks_us)
+#
+# RP2040 Datasheet:
+#   - Section 4.8.6 lists the RTC registers modelled here (RTC_BASE 0x4005C000)
+#   - Section 4.8.4 notes that writes take 2 clk_rtc periods to arrive. This
+#     latency is modelled for the LOAD strobe and the RTC_ENABLE bit.
+#   - Section 2.1.2 describes the atomic register access aliases (+0x1000 XOR,
+#     +0x2000 SET, +0x3000 CLR), which are all supported.
+#
+# IMPORTANT NOTES:
+#   - The simulator keeps a virtual clock. By default it only moves when
+#     advance() or sleep_us() is called, so results are deterministic. With
+#     realtime=True it follows the host's monotonic clock instead.
+#   - Like the hardware, the counter treats every year divisible by 4 as a leap
+#     year unless CTRL.FORCE_NOTLEAPYEAR is set.
+#   - IRQ_SETUP_0/1 matching is modelled as the level of INTR at the current
+#     time. MATCH_ACTIVE follows MATCH_ENA without latency.
+#   - Reading RTC_0 latches the date in RTC_1, so RTC_0 should be read first.
+#     The latch can be disabled to test code against torn reads.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+try:
+    from time import monotonic_ns as _host_ns
+    from time import sleep as _host_sleep
+except ImportError:
+    from utime import ticks_us as _ticks_us
+    from utime import sleep_us as _host_sleep_us
+
+    def _host_ns():
+        return _ticks_us() * 1000
+
+    def _host_sleep(s):
+        _host_sleep_us(int(s * 1000000))
+
+
+class rp2RTCSim:
+    """
+    Simulated RP2040 RTC register block - indexable like machine.mem32
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCSim(clk_rtc_hz=46875, realtime=False, accessTime_ns=0,
+              latchRTC1=True):
+        Creates a running RTC set to 2021-01-01 00:00:00 (a Friday).
+
+    sim[address], sim[address] = value:
+        Reads or writes a 32-bit RTC register by absolute address.
+
+    advance(us):
+        Moves the virtual clock forward.
+
+    sleep_us(us):
+        Drop-in replacement for utime.sleep_us, advances the virtual clock.
+
+    ticks_us():
+        Drop-in replacement for utime.ticks_us, following the virtual clock.
+
+    setTime(year, month, day, hour, minute, second, dotw):
+        Sets the counter directly, bypassing the SETUP/LOAD sequence.
+
+    now():
+        Returns (year, month, day, hour, minute, second, dotw) of the counter.
+
+    elapsed_us():
+        Returns the virtual time in microseconds since the simulator started.
+    """
+
+    # RP2040 RTC memory register constants
+    RTC_BASE_MEM = 0x4005c000
+    CLK_RTC_HZ = 46875 # 12 MHz crystal oscillator / 256, as on the Pico
+
+    # Register offsets
+    CLKDIV_M1 = 0x00
+    SETUP_0 = 0x04
+    SETUP_1 = 0x08
+    CTRL = 0x0c
+    IRQ_SETUP_0 = 0x10
+    IRQ_SETUP_1 = 0x14
+    RTC_1 = 0x18
+    RTC_0 = 0x1c
+    INTR = 0x20
+    INTE = 0x24
+    INTF = 0x28
+    INTS = 0x2c
+
+    # Atomic register access aliases (RP2040 Datasheet section 2.1.2)
+    ATOMIC_XOR = 0x1000
+    ATOMIC_SET = 0x2000
+    ATOMIC_CLR = 0x3000
+
+    # CTRL register bits
+    CTRL_RTC_ENABLE_BITS = 0x00000001
+    CTRL_RTC_ACTIVE_BITS = 0x00000002
+    CTRL_LOAD_BITS = 0x00000010
+    CTRL_FORCE_NOTLEAPYEAR_BITS = 0x00000100
+
+    # IRQ_SETUP_0 register bits
+    IRQ_SETUP_0_MATCH_ACTIVE_BITS = 0x20000000
+    IRQ_SETUP_0_MATCH_ENA_BITS = 0x10000000
+    IRQ_SETUP_0_YEAR_ENA_BITS = 0x04000000
+    IRQ_SETUP_0_MONTH_ENA_BITS = 0x02000000
+    IRQ_SETUP_0_DAY_ENA_BITS = 0x01000000
+
+    # IRQ_SETUP_1 register bits
+    IRQ_SETUP_1_DOTW_ENA_BITS = 0x80000000
+    IRQ_SETUP_1_HOUR_ENA_BITS = 0x40000000
+    IRQ_SETUP_1_MIN_ENA_BITS = 0x20000000
+    IRQ_SETUP_1_SEC_ENA_BITS = 0x10000000
+
+    # Number of clk_rtc periods a write takes to reach the RTC clock domain
+    WRITE_LATENCY_CYCLES = 2
+
+
+    def __init__(self, clk_rtc_hz=CLK_RTC_HZ, realtime=False, accessTime_ns=0,
+                 latchRTC1=True):
+        """
+        ≡≡≡ Optional Parameters ≡≡≡
+        clk_rtc_hz:    int, frequency of clk_rtc. CLKDIV_M1 is initialised to
+                       clk_rtc_hz - 1 so that the counter ticks once a second.
+        realtime:      bool, if True the virtual clock follows the host's
+                       monotonic clock, and sleep_us() really sleeps.
+        accessTime_ns: int, virtual time that passes on every register access
+                       (ignored if realtime is True). Useful for modelling bus
+                       latency and provoking races between register reads.
+        latchRTC1:     bool, if True (as on the RP2040) reading RTC_0 latches
+                       the date returned by RTC_1. If False, RTC_1 returns the
+                       live date, so a second can roll over between the reads.
+        """
+        self.clk_rtc_hz = clk_rtc_hz
+        self.realtime = realtime
+        self.accessTime_ns = accessTime_ns
+        self.latchRTC1 = latchRTC1
+
+        # Register access counters, for tests and benchmarks
+        self.reads = 0
+        self.writes = 0
+
+        # Value of ticks_us() when the simulator starts
+        self.ticks_origin_us = 0
+
+        self._ns = 0
+        self._origin_ns = _host_ns()
+        self._cycles = 0
+
+        self._clkdiv_m1 = clk_rtc_hz - 1
+        self._setup_0 = 0
+        self._setup_1 = 0
+        self._ctrl = self.CTRL_RTC_ENABLE_BITS
+        self._irq_setup_0 = 0
+        self._irq_setup_1 = 0
+        self._inte = 0
+        self._intf = 0
+
+        self._active = True
+        self._activeAt = None     # (cycle, active) pending ENABLE change
+        self._loadAt = None       # (cycle, setup_0, setup_1) pending LOAD
+        self._phase = 0           # clk_rtc cycles into the current second
+        self._rtc_1_latch = 0
+
+        self.setTime(2021, 1, 1, 0, 0, 0, 5)
+
+
+    # ≡≡≡ Virtual clock ≡≡≡
+
+    def advance(self, us):
+        """
+        Moves the virtual clock forward by 'us' microseconds. Has no effect in
+        realtime mode.
+        """
+        if not self.realtime:
+            self._ns += int(us * 1000)
+        self._sync()
+
+
+    def sleep_us(self, us):
+        """
+        Drop-in replacement for utime.sleep_us.
+        """
+        if self.realtime:
+            _host_sleep(us / 1000000)
+        else:
+            self._ns += int(us * 1000)
+
+
+    def elapsed_us(self):
+        """
+        Returns the virtual time in microseconds since the simulator started.
+        """
+        return self._now_ns() // 1000
+
+
+    def ticks_us(self):
+        """
+        Drop-in replacement for utime.ticks_us, following the virtual clock.
+        Wraps around every 2**30 microseconds, starting from ticks_origin_us.
+        """
+        return (self._now_ns() // 1000 + self.ticks_origin_us) & 0x3fffffff
+
+
+    def _now_ns(self):
+        if self.realtime:
+            return _host_ns() - self._origin_ns
+        return self._ns
+
+
+    def _sync(self):
+        """
+        Runs the RTC clock domain up to the current virtual time.
+        """
+        target = self._now_ns() * self.clk_rtc_hz // 1000000000
+
+        while self._cycles < target:
+            # Find the next pending write event, if any, before the target
+            stop = target
+            if self._loadAt is not None and self._loadAt[0] < stop:
+                stop = self._loadAt[0]
+            if self._activeAt is not None and self._activeAt[0] < stop:
+                stop = self._activeAt[0]
+            if stop < self._cycles:
+                stop = self._cycles
+
+            self._count(stop - self._cycles)
+            self._cycles = stop
+
+            if self._loadAt is not None and self._loadAt[0] <= stop:
+                (_, setup_0, setup_1) = self._loadAt
+                self._loadAt = None
+                self._load(setup_0, setup_1)
+
+            if self._activeAt is not None and self._activeAt[0] <= stop:
+                self._active = self._activeAt[1]
+                self._activeAt = None
+
+
+    def _count(self, cycles):
+        """
+        Advances the seconds counter by a number of clk_rtc cycles.
+        """
+        if not self._active or cycles <= 0:
+            return
+
+        total = self._phase + cycles
+        period = self._clkdiv_m1 + 1
+        seconds = total // period
+        self._phase = total % period
+
+        if seconds:
+            self._addSeconds(seconds)
+
+
+    # ≡≡≡ Calendar counter ≡≡≡
+
+    def setTime(self, year, month, day, hour, minute, second, dotw):
+        """
+        Sets the counter directly, as if a LOAD had just completed.
+        """
+        self._sync()
+        self._year = year
+        self._month = month
+        self._day = day
+        self._hour = hour
+        self._minute = minute
+        self._second = second
+        self._dotw = dotw
+        self._phase = 0
+
+
+    def now(self):
+        """
+        Returns the current counter value without the register access cost.
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw)
+        """
+        self._sync()
+        return (self._year, self._month, self._day, self._hour, self._minute,
+                self._second, self._dotw)
+
+
+    def _load(self, setup_0, setup_1):
+        self._year = (setup_0 >> 12) & 0xfff
+        self._month = (setup_0 >> 8) & 0xf
+        self._day = setup_0 & 0x1f
+        self._dotw = (setup_1 >> 24) & 0x7
+        self._hour = (setup_1 >> 16) & 0x1f
+        self._minute = (setup_1 >> 8) & 0x3f
+        self._second = setup_1 & 0x3f
+        self._phase = 0
+
+
+    def _daysInMonth(self):
+        if self._month == 2:
+            if (self._year % 4 == 0 and
+                    not self._ctrl & self.CTRL_FORCE_NOTLEAPYEAR_BITS):
+                return 29
+            return 28
+        elif self._month in (4, 6, 9, 11):
+            return 30
+        return 31
+
+
+    def _addSeconds(self, seconds):
+        secondOfDay = (self._hour * 3600 + self._minute * 60 + self._second +
+                       seconds)
+        days = secondOfDay // 86400
+        secondOfDay %= 86400
+
+        self._hour = secondOfDay // 3600
+        self._minute = (secondOfDay // 60) % 60
+        self._second = secondOfDay % 60
+
+        if days:
+            self._addDays(days)
+
+
+    def _addDays(self, days):
+        self._dotw = (self._dotw + days) % 7
+
+        # Jump a month at a time until the target day is in the current month
+        while days:
+            remaining = self._daysInMonth() - self._day
+            if days <= remaining:
+                self._day += days
+                return
+            days -= remaining + 1
+            self._day = 1
+            self._month += 1
+            if self._month > 12:
+                self._month = 1
+                self._year = (self._year + 1) & 0xfff
+
+
+    # ≡≡≡ Register access ≡≡≡
+
+    def _decode(self, address):
+        offset = address - self.RTC_BASE_MEM
+        if offset < 0 or offset >= 0x4000 or offset & 0x3:
+            raise ValueError('Address ' + hex(address) +
+                             ' is not a register in the RTC block')
+        return (offset & 0xfff, offset & 0x3000)
+
+
+    def __getitem__(self, address):
+        (register, _) = self._decode(address)
+        self.reads += 1
+
+        if not self.realtime:
+            self._ns += self.accessTime_ns
+        self._sync()
+
+        if register == self.CLKDIV_M1:
+            return self._clkdiv_m1
+        elif register == self.SETUP_0:
+            return self._setup_0
+        elif register == self.SETUP_1:
+            return self._setup_1
+        elif register == self.CTRL:
+            value = self._ctrl & (self.CTRL_RTC_ENABLE_BITS |
+                                  self.CTRL_FORCE_NOTLEAPYEAR_BITS)
+            if self._active:
+                value |= self.CTRL_RTC_ACTIVE_BITS
+            if self._loadAt is not None:
+                value |= self.CTRL_LOAD_BITS
+            return value
+        elif register == self.IRQ_SETUP_0:
+            if self._irq_setup_0 & self.IRQ_SETUP_0_MATCH_ENA_BITS:
+                return self._irq_setup_0 | self.IRQ_SETUP_0_MATCH_ACTIVE_BITS
+            return self._irq_setup_0
+        elif register == self.IRQ_SETUP_1:
+            return self._irq_setup_1
+        elif register == self.RTC_1:
+            if self.latchRTC1:
+                return self._rtc_1_latch
+            return (self._year << 12) | (self._month << 8) | self._day
+        elif register == self.RTC_0:
+            # Reading RTC_0 latches the date so that RTC_1 is consistent
+            self._rtc_1_latch = ((self._year << 12) | (self._month << 8) |
+                                 self._day)
+            return ((self._dotw << 24) | (self._hour << 16) |
+                    (self._minute << 8) | self._second)
+        elif register == self.INTR:
+            return self._match()
+        elif register == self.INTE:
+            return self._inte
+        elif register == self.INTF:
+            return self._intf
+        elif register == self.INTS:
+            return (self._match() | self._intf) & self._inte
+        else:
+            raise ValueError('Address ' + hex(address) +
+                             ' is not a register in the RTC block')
+
+
+    def __setitem__(self, address, value):
+        (register, alias) = self._decode(address)
+        value &= 0xffffffff
+        self.writes += 1
+
+        if not self.realtime:
+            self._ns += self.accessTime_ns
+        self._sync()
+
+        if register == self.CTRL:
+            # LOAD and RTC_ACTIVE are not stored: LOAD is self-clearing and
+            # RTC_ACTIVE is read-only
+            current = self._ctrl
+        else:
+            current = self._read(register)
+
+        if alias == self.ATOMIC_XOR:
+            value = current ^ value
+        elif alias == self.ATOMIC_SET:
+            value = current | value
+        elif alias == self.ATOMIC_CLR:
+            value = current & ~value
+
+        if register == self.CLKDIV_M1:
+            self._clkdiv_m1 = value & 0xffff
+        elif register == self.SETUP_0:
+            self._setup_0 = value & 0x00ffff1f
+        elif register == self.SETUP_1:
+            self._setup_1 = value & 0x071f3f3f
+        elif register == self.CTRL:
+            self._writeCtrl(value)
+        elif register == self.IRQ_SETUP_0:
+            self._irq_setup_0 = value & 0x17ffff1f
+        elif register == self.IRQ_SETUP_1:
+            self._irq_setup_1 = value & 0xf71f3f3f
+        elif register == self.INTE:
+            self._inte = value & 0x1
+        elif register == self.INTF:
+            self._intf = value & 0x1
+        elif register in (self.RTC_1, self.RTC_0, self.INTR, self.INTS):
+            pass # Read-only
+        else:
+            raise ValueError('Address ' + hex(address) +
+                             ' is not a register in the RTC block')
+
+
+    def _match(self):
+        """
+        Returns the RTC bit of INTR: 1 while the counter matches the enabled
+        fields of IRQ_SETUP_0/1 and MATCH_ENA is set.
+        """
+        setup_0 = self._irq_setup_0
+        setup_1 = self._irq_setup_1
+
+        if not setup_0 & self.IRQ_SETUP_0_MATCH_ENA_BITS:
+            return 0
+        if (setup_0 & self.IRQ_SETUP_0_YEAR_ENA_BITS and
+                (setup_0 >> 12) & 0xfff != self._year):
+            return 0
+        if (setup_0 & self.IRQ_SETUP_0_MONTH_ENA_BITS and
+                (setup_0 >> 8) & 0xf != self._month):
+            return 0
+        if setup_0 & self.IRQ_SETUP_0_DAY_ENA_BITS and setup_0 & 0x1f != self._day:
+            return 0
+        if (setup_1 & self.IRQ_SETUP_1_DOTW_ENA_BITS and
+                (setup_1 >> 24) & 0x7 != self._dotw):
+            return 0
+        if (setup_1 & self.IRQ_SETUP_1_HOUR_ENA_BITS and
+                (setup_1 >> 16) & 0x1f != self._hour):
+            return 0
+        if (setup_1 & self.IRQ_SETUP_1_MIN_ENA_BITS and
+                (setup_1 >> 8) & 0x3f != self._minute):
+            return 0
+        if setup_1 & self.IRQ_SETUP_1_SEC_ENA_BITS and setup_1 & 0x3f != self._second:
+            return 0
+        return 1
+
+
+    def _read(self, register):
+        if register == self.CLKDIV_M1:
+            return self._clkdiv_m1
+        elif register == self.SETUP_0:
+            return self._setup_0
+        elif register == self.SETUP_1:
+            return self._setup_1
+        elif register == self.IRQ_SETUP_0:
+            return self._irq_setup_0
+        elif register == self.IRQ_SETUP_1:
+            return self._irq_setup_1
+        elif register == self.INTE:
+            return self._inte
+        elif register == self.INTF:
+            return self._intf
+        return 0
+
+
+    def _writeCtrl(self, value):
+        arrival = self._cycles + self.WRITE_LATENCY_CYCLES
+        enable = (value & self.CTRL_RTC_ENABLE_BITS) > 0
+
+        self._ctrl = value & (self.CTRL_RTC_ENABLE_BITS |
+                              self.CTRL_FORCE_NOTLEAPYEAR_BITS)
+
+        if self._activeAt is not None:
+            pending = self._activeAt[1]
+        else:
+            pending = self._active
+        if enable != pending:
+            self._activeAt = (arrival, enable)
+
+        if value & self.CTRL_LOAD_BITS:
+            self._loadAt = (arrival, self._setup_0, self._setup_1)
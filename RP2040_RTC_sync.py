@@ -0,0 +1,432 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Time Sync Protocol
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Device side of a small framed binary protocol for setting and reading the
+# RP2040 RTC over a UART or USB-CDC stream, without the REPL.
+#
+# Frames, in both directions:
+#
+#   0xA5 | type | seq | length | payload (length bytes) | crc
+#
+#   type:    request type, or the request type | 0x80 in the response
+#   seq:     chosen by the host, echoed in the response
+#   length:  0 - MAX_PAYLOAD
+#   crc:     CRC-8 (polynomial 0x07) of type, seq, length and payload
+#
+# Requests and their responses:
+#   SET   (0x01): payload is an 8-byte binary time record (see
+#                 RP2040_RTC_parse.py). The RTC is set with rp2RTC.setRTC().
+#                 Response payload: 1 status byte, STATUS_OK, STATUS_INVALID
+#                 or STATUS_NOT_RUNNING.
+#   QUERY (0x02): no payload. Response payload: the raw RTC_1 and RTC_0
+#                 registers as two little-endian 32 bit words, which is also
+#                 a binary time record (with the day of the week), or 1
+#                 status byte, STATUS_NOT_RUNNING, if the RTC is stopped.
+#   PING  (0x03): any payload, echoed in the response, for the host to measure
+#                 the round-trip delay.
+#
+# Frames with a bad CRC or length, and requests of unknown types, are dropped.
+# After a bad CRC or length, the bytes of the dropped frame are searched again
+# for 0xA5 from the byte after its SOF, so that a frame starting inside a
+# corrupted one is not lost.
+#
+# RP2040_RTC_sync_host.py holds the host side, and can run this module
+# against the simulator (RP2040_RTC_sim.py) over a pipe.
+#
+# IMPORTANT NOTES:
+#   - poll() and feed() do not allocate on the heap, except the first time a
+#     PING of each payload length is answered. The stream's readinto() and
+#     write() may allocate.
+#   - On the Pico, USB-CDC is sys.stdin/sys.stdout, which is also the REPL.
+#     Use a UART, or disable the REPL's Ctrl-C handling with
+#     micropython.kbd_intr(-1), so that 0x03 bytes are not taken as Ctrl-C.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from array import array
+
+from RP2040_RTC import rp2RTC
+from RP2040_RTC_parse import rp2RTCParse
+
+
+def _crcTable():
+    # CRC-8 with polynomial 0x07, one entry per byte value
+    table = bytearray(256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x07) & 0xff
+            else:
+                crc = (crc << 1) & 0xff
+        table[i] = crc
+    return bytes(table)
+
+
+class rp2RTCSync:
+    """
+    Raspberry Pi Pico RTC sync protocol - device side, answering SET, QUERY
+    and PING frames on a stream
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCSync(stream):
+        Creates a protocol endpoint on a stream.
+
+    poll():
+        Reads the bytes availible on the stream, and answers the complete
+        requests.
+
+    feed(data, length=None):
+        Parses bytes received by other means, and answers the complete
+        requests.
+
+    frame(type, seq, payload, out=None, length=None):
+        Encodes a frame.
+
+    crc(data, start=0, end=None):
+        Returns the CRC-8 of part of a buffer.
+    """
+
+    SOF = 0xa5
+
+    SET = 0x01
+    QUERY = 0x02
+    PING = 0x03
+    RESPONSE = 0x80
+
+    STATUS_OK = 0
+    STATUS_INVALID = 1
+    STATUS_NOT_RUNNING = 2
+
+    MAX_PAYLOAD = 32
+
+    # Bytes around the payload: SOF, type, seq, length, then crc
+    OVERHEAD = 5
+
+    CRC_TABLE = _crcTable()
+
+    # Parser states: waiting for SOF, or for the byte of the frame at the
+    # index of the state
+    __WAIT_SOF = 0
+    __TYPE = 1
+    __SEQ = 2
+    __LENGTH = 3
+    __PAYLOAD = 4
+    __CRC = 5
+
+    def __init__(self, stream):
+        """
+        ≡≡≡ Required Parameters ≡≡≡
+        stream: object with readinto(buf) and write(buf), e.g. machine.UART,
+                returning None or 0 from readinto() when no bytes are
+                availible
+        """
+        self.__stream = stream
+
+        self.__rx = bytearray(64)
+        self.__tx = bytearray(self.MAX_PAYLOAD + self.OVERHEAD)
+        txView = memoryview(self.__tx)
+
+        # Responses of fixed length are written through these views, and
+        # PING responses through a view per length, made when first needed
+        self.__txViews = [None] * (self.MAX_PAYLOAD + 1)
+        for length in (1, 8):
+            self.__txViews[length] = txView[:length + self.OVERHEAD]
+        self.__txView = txView
+
+        # Bytes of the frame being received after its SOF (type, seq, length,
+        # payload and crc), kept so that they can be searched again for a SOF
+        # if the frame is dropped
+        self.__frame = bytearray(self.MAX_PAYLOAD + self.OVERHEAD - 1)
+        self.__replay = bytearray(len(self.__frame))
+        self.__payload = memoryview(self.__frame)[3:]
+        self.__fields = array('H', [0] * 6)
+        self.__words = array('I', [0, 0])
+
+        self.__state = self.__WAIT_SOF
+        self.__type = 0
+        self.__seq = 0
+        self.__length = 0
+        self.__received = 0
+        self.__crc = 0
+        self.__count = 0
+
+        # Frames answered, and frames dropped for a bad CRC or length
+        self.frames = 0
+        self.errors = 0
+
+
+    def poll(self):
+        """
+        Reads the bytes availible on the stream, and answers the requests
+        they complete.
+
+        ≡≡≡ Returns ≡≡≡
+        int: number of requests answered
+        """
+        length = self.__stream.readinto(self.__rx)
+        if not length:
+            return 0
+        return self.feed(self.__rx, length)
+
+
+    def feed(self, data, length=None):
+        """
+        Parses bytes received by other means (e.g. a UART interrupt handler
+        filling a buffer), and answers the requests they complete.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview of received bytes
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        length: int, number of bytes of data to parse, or None for all
+
+        ≡≡≡ Returns ≡≡≡
+        int: number of requests answered
+        """
+        if length is None:
+            length = len(data)
+
+        answered = 0
+        for i in range(length):
+            result = self.__step(data[i])
+            if result < 0:
+                result = self.__resync()
+            answered += result
+
+        self.frames += answered
+        return answered
+
+
+    def __step(self, byte):
+        """
+        Parses one received byte.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        byte:   int, received byte
+
+        ≡≡≡ Returns ≡≡≡
+        int: 1 if a request was answered, -1 if the frame was dropped for a
+             bad CRC or length, or 0
+        """
+        state = self.__state
+
+        if state == self.__WAIT_SOF:
+            if byte == self.SOF:
+                self.__state = self.__TYPE
+                self.__crc = 0
+                self.__count = 0
+            return 0
+
+        self.__frame[self.__count] = byte
+        self.__count += 1
+
+        if state == self.__CRC:
+            self.__state = self.__WAIT_SOF
+            if byte != self.__crc:
+                self.errors += 1
+                return -1
+            if self.__answer():
+                return 1
+            self.errors += 1
+            return 0
+
+        self.__crc = self.CRC_TABLE[self.__crc ^ byte]
+
+        if state == self.__TYPE:
+            self.__type = byte
+            self.__state = self.__SEQ
+        elif state == self.__SEQ:
+            self.__seq = byte
+            self.__state = self.__LENGTH
+        elif state == self.__LENGTH:
+            if byte > self.MAX_PAYLOAD:
+                self.errors += 1
+                self.__state = self.__WAIT_SOF
+                return -1
+            self.__length = byte
+            self.__received = 0
+            if byte:
+                self.__state = self.__PAYLOAD
+            else:
+                self.__state = self.__CRC
+        else:
+            self.__received += 1
+            if self.__received == self.__length:
+                self.__state = self.__CRC
+        return 0
+
+
+    def __resync(self):
+        """
+        Parses again the bytes of a frame dropped for a bad CRC or length,
+        from the byte after its SOF, so that a SOF among them starts a frame.
+        A frame dropped among these bytes is searched again in turn, from the
+        byte after its own SOF.
+
+        ≡≡≡ Returns ≡≡≡
+        int: number of requests answered
+        """
+        replay = self.__replay
+        count = self.__count
+        for i in range(count):
+            replay[i] = self.__frame[i]
+
+        answered = 0
+        start = 0
+        while start < count:
+            sof = start
+            for i in range(start, count):
+                if self.__state == self.__WAIT_SOF:
+                    sof = i
+                result = self.__step(replay[i])
+                if result < 0:
+                    break
+                answered += result
+            else:
+                break
+            start = sof + 1
+        return answered
+
+
+    def __answer(self):
+        """
+        Carries out the request that has been received, and writes the
+        response.
+
+        ≡≡≡ Returns ≡≡≡
+        bool: False if the request is of an unknown type, or malformed
+        """
+        requestType = self.__type
+        length = self.__length
+        payload = self.__payload
+        tx = self.__tx
+
+        if requestType == self.SET:
+            if length != rp2RTCParse.BINARY_SIZE:
+                return False
+            fields = self.__fields
+            if rp2RTCParse.parseBinary(payload, fields) != rp2RTC.VALID:
+                tx[4] = self.STATUS_INVALID
+            elif rp2RTC.setRTC(fields[0], fields[1], fields[2],
+                               fields[3], fields[4], fields[5]):
+                tx[4] = self.STATUS_OK
+            else:
+                tx[4] = self.STATUS_NOT_RUNNING
+            length = 1
+
+        elif requestType == self.QUERY:
+            if length:
+                return False
+            if not rp2RTC.rtc_running():
+                tx[4] = self.STATUS_NOT_RUNNING
+                length = 1
+            else:
+                # Read as rp2RTC.localtime() does, into preallocated words
+                words = self.__words
+                rp2RTC.readRegisters(words)
+                rtc_1 = words[0]
+                rtc_0 = words[1]
+                tx[4] = rtc_1 & 0xff
+                tx[5] = (rtc_1 >> 8) & 0xff
+                tx[6] = (rtc_1 >> 16) & 0xff
+                tx[7] = (rtc_1 >> 24) & 0xff
+                tx[8] = rtc_0 & 0xff
+                tx[9] = (rtc_0 >> 8) & 0xff
+                tx[10] = (rtc_0 >> 16) & 0xff
+                tx[11] = (rtc_0 >> 24) & 0xff
+                length = 8
+
+        elif requestType == self.PING:
+            for i in range(length):
+                tx[4 + i] = payload[i]
+
+        else:
+            return False
+
+        view = self.__txViews[length]
+        if view is None:
+            view = self.__txView[:length + self.OVERHEAD]
+            self.__txViews[length] = view
+
+        self.frame(requestType | self.RESPONSE, self.__seq, None, tx, length)
+        self.__stream.write(view)
+        return True
+
+
+    @staticmethod
+    def frame(frameType, seq, payload, out=None, length=None):
+        """
+        Encodes a frame.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        frameType: int, type of the frame
+        seq:       int, sequence number, 0 - 255
+        payload:   bytes, bytearray or memoryview, or None if the payload is
+                   already in out, after the 4 byte header
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        out:       bytearray to encode into, of at least the length of the
+                   frame. If None, a bytearray is allocated.
+        length:    int, length of the payload already in out
+
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if the payload is longer than MAX_PAYLOAD
+
+        ≡≡≡ Returns ≡≡≡
+        bytearray: out, holding the frame in its first
+                   length + OVERHEAD bytes
+        """
+        if payload is not None:
+            length = len(payload)
+        if length > rp2RTCSync.MAX_PAYLOAD:
+            raise ValueError('Payload of ' + str(length) +
+                             ' bytes - the largest is ' +
+                             str(rp2RTCSync.MAX_PAYLOAD) + ' bytes')
+
+        if out is None:
+            out = bytearray(length + rp2RTCSync.OVERHEAD)
+        out[0] = rp2RTCSync.SOF
+        out[1] = frameType
+        out[2] = seq
+        out[3] = length
+        if payload is not None:
+            for i in range(length):
+                out[4 + i] = payload[i]
+        out[4 + length] = rp2RTCSync.crc(out, 1, 4 + length)
+        return out
+
+
+    @staticmethod
+    def crc(data, start=0, end=None):
+        """
+        Returns the CRC-8 (polynomial 0x07) of part of a buffer.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        data:   bytes, bytearray or memoryview
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        start:  int, index of the first byte
+        end:    int, index after the last byte, or None for the end of data
+
+        ≡≡≡ Returns ≡≡≡
+        int: the CRC, 0 - 255
+        """
+        if end is None:
+            end = len(data)
+        table = rp2RTCSync.CRC_TABLE
+        crc = 0
+        for i in range(start, end):
+            crc = table[crc ^ data[i]]
+        return crc
@@ -0,0 +1,216 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Time Sync Protocol Host
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# A host-side (CPython) reference peer for the framed protocol of
+# RP2040_RTC_sync.py, sending SET, QUERY and PING requests and checking the
+# responses:
+#
+#     import serial
+#     from RP2040_RTC_sync_host import rp2RTCSyncHost
+#
+#     host = rp2RTCSyncHost(serial.Serial('/dev/ttyACM0', timeout=1))
+#     host.setTime(2021, 6, 4, 12, 0, 0)
+#     print(host.query(), host.ping())
+#
+# The stream can be anything with read(n) and write(data), e.g. a pyserial
+# port or the pipes of a subprocess running rp2RTCSync against the simulator
+# (see benchmark_RP2040_RTC_sync.py).
+#
+# IMPORTANT NOTES:
+#   - Requests are sent one at a time, and each waits for its response.
+#   - A read returning fewer bytes than requested (a serial port timeout, or
+#     the end of a pipe) raises OSError.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+try:
+    from time import perf_counter_ns
+except ImportError:
+    from utime import ticks_us
+
+    def perf_counter_ns():
+        return ticks_us() * 1000
+
+from RP2040_RTC_parse import rp2RTCParse
+from RP2040_RTC_sync import rp2RTCSync
+
+
+class rp2RTCSyncHost:
+    """
+    Raspberry Pi Pico RTC sync protocol - host side, sending requests to an
+    rp2RTCSync endpoint
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCSyncHost(stream):
+        Creates a peer on a stream.
+
+    setTime(year, month, day, hour, minute, second):
+        Sets the device's RTC.
+
+    query():
+        Returns the time of the device's RTC.
+
+    ping(payload=b''):
+        Returns the round-trip delay to the device.
+
+    request(type, payload=b''):
+        Sends a request and returns the payload of its response.
+    """
+
+    def __init__(self, stream):
+        """
+        ≡≡≡ Required Parameters ≡≡≡
+        stream: object with read(n) and write(data)
+        """
+        self.__stream = stream
+        self.__seq = 0
+
+        # Bytes of a dropped frame, read again before the stream
+        self.__pending = b''
+
+
+    def setTime(self, year, month, day, hour, minute, second):
+        """
+        Sets the device's RTC.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        year, month, day, hour, minute, second: int, as for rp2RTC.setRTC()
+
+        ≡≡≡ Raises ≡≡≡
+        ValueError: if the time is not legal (see rp2RTCParse.pack())
+
+        ≡≡≡ Returns ≡≡≡
+        int: the status of the response, rp2RTCSync.STATUS_OK,
+             STATUS_INVALID or STATUS_NOT_RUNNING
+        """
+        record = rp2RTCParse.pack(year, month, day, hour, minute, second)
+        return self.request(rp2RTCSync.SET, record)[0]
+
+
+    def query(self):
+        """
+        Returns the time of the device's RTC, from the raw RTC_1 and RTC_0
+        registers.
+
+        ≡≡≡ Raises ≡≡≡
+        OSError: if the device's RTC is not running
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw), as
+               rp2RTC.localtime()
+        """
+        payload = self.request(rp2RTCSync.QUERY)
+        if len(payload) != 8:
+            raise OSError('QUERY answered with status ' +
+                          str(payload[0] if payload else None) +
+                          ' - the device\'s RTC is not running.')
+        rtc_1 = int.from_bytes(payload[0:4], 'little')
+        rtc_0 = int.from_bytes(payload[4:8], 'little')
+        return ((rtc_1 >> 12) & 0xfff,
+                (rtc_1 >> 8) & 0xf,
+                rtc_1 & 0x1f,
+                (rtc_0 >> 16) & 0x1f,
+                (rtc_0 >> 8) & 0x3f,
+                rtc_0 & 0x3f,
+                (rtc_0 >> 24) & 0x7)
+
+
+    def ping(self, payload=b''):
+        """
+        Measures the round-trip delay to the device.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        payload: bytes, echoed by the device, up to rp2RTCSync.MAX_PAYLOAD
+                 bytes
+
+        ≡≡≡ Raises ≡≡≡
+        OSError: if the echo differs from the payload
+
+        ≡≡≡ Returns ≡≡≡
+        int: round-trip delay, in microseconds
+        """
+        start = perf_counter_ns()
+        echo = self.request(rp2RTCSync.PING, payload)
+        delay = (perf_counter_ns() - start) // 1000
+        if echo != bytes(payload):
+            raise OSError('PING echoed ' + repr(echo) + ' - expected ' +
+                          repr(bytes(payload)))
+        return delay
+
+
+    def request(self, requestType, payload=b''):
+        """
+        Sends a request and waits for its response. Frames with a bad CRC,
+        or another sequence number or type, are skipped.
+
+        ≡≡≡ Required Parameters ≡≡≡
+        requestType: int, rp2RTCSync.SET, QUERY or PING
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        payload:     bytes
+
+        ≡≡≡ Raises ≡≡≡
+        OSError: if the stream ends or times out before the response
+
+        ≡≡≡ Returns ≡≡≡
+        bytes: payload of the response
+        """
+        seq = self.__seq
+        self.__seq = (seq + 1) & 0xff
+
+        self.__stream.write(rp2RTCSync.frame(requestType, seq, payload))
+        if hasattr(self.__stream, 'flush'):
+            self.__stream.flush()
+
+        while True:
+            (responseType, responseSeq, response) = self.__readFrame()
+            if responseType == requestType | rp2RTCSync.RESPONSE and \
+               responseSeq == seq:
+                return response
+
+
+    def __read(self, length):
+        pending = self.__pending
+        if pending:
+            data = pending[:length]
+            self.__pending = pending[length:]
+            if len(data) < length:
+                data += self.__read(length - len(data))
+            return data
+        data = self.__stream.read(length)
+        if data is None or len(data) < length:
+            raise OSError('Stream ended or timed out while waiting for a ' +
+                          'response.')
+        return data
+
+
+    def __readFrame(self):
+        """
+        Reads the next frame with a valid CRC. After a bad CRC or length, the
+        bytes after the SOF are searched again, as rp2RTCSync does.
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (type, seq, payload)
+        """
+        while True:
+            if self.__read(1)[0] != rp2RTCSync.SOF:
+                continue
+            header = self.__read(3)
+            if header[2] > rp2RTCSync.MAX_PAYLOAD:
+                self.__pending = bytes(header) + self.__pending
+                continue
+            rest = self.__read(header[2] + 1)
+            if rp2RTCSync.crc(header + rest[:-1]) == rest[-1]:
+                return (header[0], header[1], bytes(rest[:-1]))
+            self.__pending = bytes(header + rest) + self.__pending
@@ -0,0 +1,530 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Library - Timezones
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Local time and daylight saving time (DST) for an RP2040 RTC kept in UTC.
+#
+# A timezone is given as a POSIX TZ string, which is compiled into a table of
+# the UTC times at which the offset changes, over a range of years. The offset
+# of the current period is cached, so the table is only searched again once
+# the RTC passes the next transition. Local times are then the RTC's UTC time
+# plus the cached offset.
+#
+# POSIX TZ strings:
+#   - https://pubs.opengroup.org/onlinepubs/9699919799/basedefs/V1_chap08.html
+#     (TZ variable) describes the format, e.g. 'CET-1CEST,M3.5.0,M10.5.0/3'
+#     for Central Europe, 'EST5EDT,M3.2.0,M11.1.0' for US Eastern time or
+#     'AEST-10AEDT,M10.1.0,M4.1.0/3' for Sydney.
+#   - The last field of each line of /usr/share/zoneinfo files (and the
+#     'posix' zone files of the IANA tz database) gives the TZ string of most
+#     timezones.
+#
+# IMPORTANT NOTES:
+#   - The RTC must be set to UTC (see rp2RTC.setRTC()).
+#   - TZ strings describe one rule, applied to every year. Historic changes of
+#     a timezone's rules are not supported.
+#   - If the DST rules are omitted ('EST5EDT'), the US rules ',M3.2.0,M11.1.0'
+#     are used, as by glibc. Transition times from -167 to 167 hours are
+#     supported (an extension of POSIX used by RFC 8536).
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from array import array
+
+from RP2040_RTC import rp2RTC
+
+
+_daysFromCivil = rp2RTC.daysFromCivil
+_civilFromDays = rp2RTC.civilFromDays
+
+
+class rp2RTCTimezone:
+    """
+    Raspberry Pi Pico RTC timezone - converts the UTC time of the RP2040 RTC
+    to local time, following a POSIX TZ string
+
+    ≡≡≡ Methods ≡≡≡
+    rp2RTCTimezone(tz, firstYear=None, lastYear=None):
+        Compiles a POSIX TZ string into a table of transitions.
+
+    localtime():
+        Returns the local date and time of the RP2040 internal RTC.
+
+    time():
+        Returns the local time of the RP2040 internal RTC as seconds since
+        1970-01-01 00:00:00 local time.
+
+    utcoffset(t=None):
+        Returns the offset from UTC in seconds, at a UTC time or now.
+
+    isDST(t=None):
+        Returns True if daylight saving time is in effect.
+
+    tzname(t=None):
+        Returns the abbreviation of the timezone, e.g. 'CEST'.
+
+    transitions():
+        Returns the table of transitions.
+    """
+
+    # Years in the table when the range is not given: the year of the first
+    # lookup, the year before it and the following years
+    __YEARS = 10
+
+    # Period without an end, for timezones without DST
+    __FOREVER = 1 << 62
+
+    def __init__(self, tz, firstYear=None, lastYear=None):
+        """
+        ≡≡≡ Required Parameters ≡≡≡
+        tz:        str, POSIX TZ string, e.g. 'CET-1CEST,M3.5.0,M10.5.0/3'
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        firstYear: int, first year of the table of transitions
+        lastYear:  int, last year of the table of transitions. If the range
+                   is not given, or a time outside it is looked up, the table
+                   is built for the years around that time.
+
+        ≡≡≡ Raises ≡≡≡
+        TypeError:  if tz is not a str
+        ValueError: if tz is not a valid POSIX TZ string
+        """
+        if not isinstance(tz, str):
+            raise TypeError('Parameter tz received parameter of type ' +
+                            str(type(tz)) +
+                            ' - expected parameter of type \'str\'.')
+        self.tz = tz
+        self.__parse(tz)
+
+        # Table of transitions: UTC seconds since 1970 at which the offset
+        # changes, and whether DST starts (1) or ends (0) there
+        self.__times = array('q')
+        self.__starts = bytearray()
+        self.__firstYear = None
+        self.__lastYear = None
+
+        # Current period: (start, end, UTC offset, DST), UTC seconds
+        self.__period = (0, -1, self.__stdOffset, False)
+
+        # Current local day: (local seconds at 00:00, year, month, day, dotw)
+        self.__day = (0, -1, 0, 0, 0)
+
+        if firstYear is not None or lastYear is not None:
+            if firstYear is None:
+                firstYear = lastYear
+            if lastYear is None:
+                lastYear = firstYear
+            self.__build(firstYear, lastYear)
+
+
+    def localtime(self):
+        """
+        Returns the local time of the RP2040 internal RTC. While the period
+        and the day are unchanged, this costs rp2RTC.time(), a range check,
+        an add, a day check and building the tuple.
+
+        ≡≡≡ Returns ≡≡≡
+        tuple: (year, month, day, hour, minute, second, dotw), as returned by
+               rp2RTC.localtime(), in local time
+
+        bool: False if the onboard RTC is not running.
+        """
+        t = rp2RTC.time()
+        if t is False:
+            return False
+
+        period = self.__period
+        if not period[0] <= t < period[1]:
+            period = self.__lookup(t)
+
+        t += period[2]
+
+        day = self.__day
+        seconds = t - day[0]
+        if not 0 <= seconds < 86400:
+            day = self.__newDay(t)
+            seconds = t - day[0]
+
+        return (day[1], day[2], day[3],
+                seconds // 3600,
+                seconds // 60 % 60,
+                seconds % 60,
+                day[4])
+
+
+    def time(self):
+        """
+        Returns the local time of the RP2040 internal RTC as seconds since
+        1970-01-01 00:00:00 local time.
+
+        ≡≡≡ Returns ≡≡≡
+        int: local seconds since 1970
+
+        bool: False if the onboard RTC is not running.
+        """
+        t = rp2RTC.time()
+        if t is False:
+            return False
+
+        period = self.__period
+        if not period[0] <= t < period[1]:
+            period = self.__lookup(t)
+        return t + period[2]
+
+
+    def utcoffset(self, t=None):
+        """
+        Returns the offset of local time from UTC.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        t:      int, UTC seconds since 1970. If None, the time of the RTC.
+
+        ≡≡≡ Returns ≡≡≡
+        int: seconds to add to UTC to get local time, e.g. 3600 for CET
+
+        bool: False if t is None and the onboard RTC is not running.
+        """
+        period = self.__periodAt(t)
+        if period is False:
+            return False
+        return period[2]
+
+
+    def isDST(self, t=None):
+        """
+        Returns whether daylight saving time is in effect.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        t:      int, UTC seconds since 1970. If None, the time of the RTC.
+
+        ≡≡≡ Returns ≡≡≡
+        bool: True if DST is in effect. False if not, or if t is None and the
+              onboard RTC is not running.
+        """
+        period = self.__periodAt(t)
+        if period is False:
+            return False
+        return period[3]
+
+
+    def tzname(self, t=None):
+        """
+        Returns the abbreviation of the timezone, as given in the TZ string.
+
+        ≡≡≡ Optional Parameters ≡≡≡
+        t:      int, UTC seconds since 1970. If None, the time of the RTC.
+
+        ≡≡≡ Returns ≡≡≡
+        str: the DST abbreviation while DST is in effect, otherwise the
+             standard abbreviation
+        """
+        if self.isDST(t):
+            return self.__dstName
+        return self.__stdName
+
+
+    def transitions(self):
+        """
+        Returns the table of transitions, built for the current range of
+        years.
+
+        ≡≡≡ Returns ≡≡≡
+        list: of (UTC seconds since 1970, UTC offset after the transition,
+              DST after the transition) tuples, in time order
+        """
+        result = []
+        for i in range(len(self.__times)):
+            if self.__starts[i]:
+                result.append((self.__times[i], self.__dstOffset, True))
+            else:
+                result.append((self.__times[i], self.__stdOffset, False))
+        return result
+
+
+    def __periodAt(self, t):
+        """
+        Returns the period of a UTC time (or of the RTC's time, if t is None).
+        The cached period is only used for the RTC's time.
+        """
+        if t is None:
+            t = rp2RTC.time()
+            if t is False:
+                return False
+            period = self.__period
+            if period[0] <= t < period[1]:
+                return period
+            return self.__lookup(t)
+
+        period = self.__period
+        if period[0] <= t < period[1]:
+            return period
+        current = period
+        period = self.__lookup(t)
+        self.__period = current
+        return period
+
+
+    def __lookup(self, t):
+        """
+        Finds the period of a UTC time in the table of transitions, building
+        the table for the years around t if needed, and caches it.
+        """
+        if self.__dstName is None:
+            period = (-self.__FOREVER, self.__FOREVER, self.__stdOffset, False)
+            self.__period = period
+            return period
+
+        times = self.__times
+        if not len(times) or not times[0] <= t < times[len(times) - 1]:
+            year = _civilFromDays(t // 86400)[0]
+            first = year - 1
+            if (self.__firstYear is not None and
+                    self.__firstYear <= year < self.__lastYear):
+                # Before the first transition or after the last of the range
+                first = self.__firstYear
+                last = self.__lastYear
+            else:
+                last = first + self.__YEARS - 1
+            if year - 1 < first:
+                first = year - 1
+            if year + 1 > last:
+                last = year + 1
+            self.__build(first, last)
+            times = self.__times
+
+        # Binary search for the last transition at or before t
+        low = 0
+        high = len(times)
+        while low < high:
+            middle = (low + high) // 2
+            if times[middle] <= t:
+                low = middle + 1
+            else:
+                high = middle
+
+        # times[0] <= t < times[-1], so 1 <= low < len(times)
+        if self.__starts[low - 1]:
+            period = (times[low - 1], times[low], self.__dstOffset, True)
+        else:
+            period = (times[low - 1], times[low], self.__stdOffset, False)
+        self.__period = period
+        return period
+
+
+    def __newDay(self, t):
+        """
+        Finds and caches the local date of local seconds since 1970.
+        """
+        days = t // 86400
+        (year, month, day) = _civilFromDays(days)
+
+        # 1970-01-01 was a Thursday
+        result = (days * 86400, year, month, day, (days + 4) % 7)
+        self.__day = result
+        return result
+
+
+    def __build(self, firstYear, lastYear):
+        """
+        Builds the table of transitions for a range of years.
+        """
+        times = array('q')
+        starts = bytearray()
+
+        if self.__dstName is not None:
+            transitions = []
+            for year in range(firstYear, lastYear + 1):
+                # DST starts at a standard local time, and ends at a DST local
+                # time
+                transitions.append(
+                    (self.__ruleTime(year, self.__startRule) - self.__stdOffset, 1))
+                transitions.append(
+                    (self.__ruleTime(year, self.__endRule) - self.__dstOffset, 0))
+            transitions.sort()
+            for (t, start) in transitions:
+                times.append(t)
+                starts.append(start)
+
+        self.__times = times
+        self.__starts = starts
+        self.__firstYear = firstYear
+        self.__lastYear = lastYear
+        self.__period = (0, -1, self.__stdOffset, False)
+
+
+    @staticmethod
+    def __ruleTime(year, rule):
+        """
+        Returns the local seconds since 1970 of a transition rule in a year.
+        """
+        (kind, a, b, c, seconds) = rule
+
+        if kind == 'J':
+            # Day a of the year (1 - 365), without February 29th
+            days = _daysFromCivil(year, 1, 1) + a - 1
+            if a >= 60 and rp2RTC.isLeapYear(year):
+                days += 1
+        elif kind == 'N':
+            # Day a of the year (0 - 365), counting February 29th
+            days = _daysFromCivil(year, 1, 1) + a
+        else:
+            # Weekday c of week b (1 - 5, 5 is the last) of month a
+            first = _daysFromCivil(year, a, 1)
+            if a == 12:
+                monthDays = 31
+            else:
+                monthDays = _daysFromCivil(year, a + 1, 1) - first
+            day = (c - (first + 4)) % 7 + (b - 1) * 7
+            while day >= monthDays:
+                day -= 7
+            days = first + day
+
+        return days * 86400 + seconds
+
+
+    def __parse(self, tz):
+        """
+        Parses a POSIX TZ string into the names, offsets and rules.
+        """
+        self.__pos = 0
+        self.__tz = tz
+
+        self.__stdName = self.__parseName()
+        self.__stdOffset = -self.__parseTime(24)
+        self.__dstName = None
+        self.__dstOffset = self.__stdOffset
+        self.__startRule = None
+        self.__endRule = None
+
+        if self.__pos < len(tz):
+            self.__dstName = self.__parseName()
+            self.__dstOffset = self.__stdOffset + 3600
+            if self.__pos < len(tz) and tz[self.__pos] != ',':
+                self.__dstOffset = -self.__parseTime(24)
+
+            if self.__pos < len(tz):
+                self.__expect(',')
+                self.__startRule = self.__parseRule()
+                self.__expect(',')
+                self.__endRule = self.__parseRule()
+            else:
+                # US rules, as used by glibc
+                self.__startRule = ('M', 3, 2, 0, 7200)
+                self.__endRule = ('M', 11, 1, 0, 7200)
+
+        if self.__pos != len(tz):
+            self.__error()
+
+        del self.__pos
+        del self.__tz
+
+
+    def __error(self):
+        raise ValueError('Invalid POSIX TZ string \'' + self.__tz +
+                         '\' at position ' + str(self.__pos))
+
+
+    def __expect(self, char):
+        if self.__tz[self.__pos:self.__pos + 1] != char:
+            self.__error()
+        self.__pos += 1
+
+
+    def __parseName(self):
+        tz = self.__tz
+        start = self.__pos
+        if tz[start:start + 1] == '<':
+            end = tz.find('>', start)
+            if end < 0:
+                self.__error()
+            self.__pos = end + 1
+            name = tz[start + 1:end]
+        else:
+            end = start
+            while end < len(tz) and tz[end].isalpha():
+                end += 1
+            self.__pos = end
+            name = tz[start:end]
+        if len(name) < 3:
+            self.__pos = start
+            self.__error()
+        return name
+
+
+    def __parseNumber(self, maximum):
+        tz = self.__tz
+        start = self.__pos
+        end = start
+        while end < len(tz) and tz[end].isdigit():
+            end += 1
+        if end == start:
+            self.__error()
+        value = int(tz[start:end])
+        if value > maximum:
+            self.__error()
+        self.__pos = end
+        return value
+
+
+    def __parseTime(self, maxHours):
+        """
+        Parses [+|-]hh[:mm[:ss]] into seconds.
+        """
+        tz = self.__tz
+        sign = 1
+        if tz[self.__pos:self.__pos + 1] in ('+', '-'):
+            if tz[self.__pos] == '-':
+                sign = -1
+            self.__pos += 1
+
+        seconds = self.__parseNumber(maxHours) * 3600
+        if tz[self.__pos:self.__pos + 1] == ':':
+            self.__pos += 1
+            seconds += self.__parseNumber(59) * 60
+            if tz[self.__pos:self.__pos + 1] == ':':
+                self.__pos += 1
+                seconds += self.__parseNumber(59)
+        return sign * seconds
+
+
+    def __parseRule(self):
+        """
+        Parses Jn, n or Mm.w.d, with an optional /time, into a rule tuple:
+        (kind, a, b, c, local seconds from 00:00).
+        """
+        tz = self.__tz
+        char = tz[self.__pos:self.__pos + 1]
+        if char == 'J':
+            self.__pos += 1
+            day = self.__parseNumber(365)
+            if day < 1:
+                self.__error()
+            rule = ['J', day, 0, 0]
+        elif char == 'M':
+            self.__pos += 1
+            month = self.__parseNumber(12)
+            self.__expect('.')
+            week = self.__parseNumber(5)
+            self.__expect('.')
+            weekday = self.__parseNumber(6)
+            if month < 1 or week < 1:
+                self.__error()
+            rule = ['M', month, week, weekday]
+        else:
+            rule = ['N', self.__parseNumber(365), 0, 0]
+
+        seconds = 7200
+        if tz[self.__pos:self.__pos + 1] == '/':
+            self.__pos += 1
+            seconds = self.__parseTime(167)
+        return (rule[0], rule[1], rule[2], rule[3], seconds)
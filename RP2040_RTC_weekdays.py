@@ -0,0 +1,167 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    RP2040 RTC Weekday Table
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Precomputed anchor days and leap years for rp2RTC.useWeekdayTable(), for the
+# years 0 - 4095 supported by the RP2040 RTC. Two years are packed per byte; see
+# rp2RTC.buildWeekdayTable() for the layout.
+#
+# Freeze this module into the MicroPython firmware (e.g. with a manifest.py
+# 'module("RP2040_RTC_weekdays.py")' entry) so that the 2048 byte table is read
+# from flash and uses no RAM. If it is copied to the Pico's filesystem instead,
+# the table is loaded into RAM when rp2RTC.useWeekdayTable() is called.
+#
+# This file is generated. To regenerate it, run on a development host:
+#   python RP2040_RTC_weekdays.py
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+WEEKDAY_TABLE = (
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x10\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x65\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x43\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x10\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x65\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x43\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06'
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x10\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x65\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x43\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x10\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x65\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x43\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06'
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x10\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x65\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x43\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x10\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x65\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x43\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06'
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x10\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x65\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x43\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x10\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x65\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x43\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06'
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x10\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x65\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x43\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+    b'\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x10\x32\x6d\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x65\x10\x4b\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x43\x65'
+    b'\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43'
+    b'\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21'
+    b'\x5c\x06\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06'
+    b'\x3a\x54\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54'
+    b'\x18\x32\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32'
+    b'\x6d\x10\x4b\x65\x29\x43\x0e\x21\x5c\x06\x3a\x54\x18\x32\x6d\x10'
+)
+
+
+if __name__ == '__main__':
+    from RP2040_RTC import rp2RTC
+
+    table = bytes(rp2RTC.buildWeekdayTable())
+    with open(__file__) as f:
+        source = f.read()
+    start = source.index('WEEKDAY_TABLE = (\n') + len('WEEKDAY_TABLE = (\n')
+    end = source.index('\n)\n', start)
+    rows = []
+    for i in range(0, len(table), 16):
+        rows.append("    b'" +
+                    ''.join('\\x%02x' % b for b in table[i:i + 16]) +
+                    "'")
+    with open(__file__, 'w') as f:
+        f.write(source[:start] + '\n'.join(rows) + source[end:])
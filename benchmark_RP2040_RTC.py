@@ -0,0 +1,329 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    benchmark_RP2040_RTC.py
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Benchmarks for RP2040_RTC.py
+#
+# Reports, for each benchmarked method: calls per second, microseconds per call,
+# run-to-run standard deviation and heap bytes allocated per call. Results can
+# be written as JSON and compared with the results of an earlier revision.
+#
+# Usage on a Raspberry Pi Pico (results are written to the Pico's filesystem):
+#   import benchmark_RP2040_RTC
+#   benchmark_RP2040_RTC.run(output='bench.json')
+#
+# Usage on a development host, against the RP2040_RTC_sim.py simulator:
+#   python benchmark_RP2040_RTC.py [calls] [output.json] [baseline.json]
+#
+# IMPORTANT NOTES:
+#   - On MicroPython, allocation is measured with gc.mem_alloc() while the
+#     garbage collector is disabled, so it is the total heap allocated per call.
+#   - On CPython, allocation is measured with tracemalloc as the peak memory
+#     held during a call. CPython caches small integers, so these numbers are
+#     only comparable between runs on CPython.
+#   - On the host, timings include the cost of the simulated register accesses,
+#     which is far higher than a real mem32 access.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+import gc
+import sys
+
+from array import array
+
+from RP2040_RTC import rp2RTC
+from RP2040_RTC_format import rp2RTCFormat
+from RP2040_RTC_parse import rp2RTCParse
+from RP2040_RTC_ring import rp2RTCRing
+
+try:
+    import json
+except ImportError:
+    import ujson as json
+
+try:
+    from utime import ticks_us
+    from utime import ticks_diff
+    _MICROPYTHON = True
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(end, start):
+        return end - start
+
+    import tracemalloc
+    _MICROPYTHON = False
+
+
+def _validDateTime():
+    # MicroPython does not mangle private names, CPython does
+    try:
+        return getattr(rp2RTC, '_rp2RTC__validDateTime')
+    except AttributeError:
+        return getattr(rp2RTC, '__validDateTime')
+
+
+def _python(enable):
+    # Runs a case with the pure Python implementations
+    rp2RTC.useNative(not enable)
+
+
+def _pythonWeekdayTable(enable):
+    # The table is only used by the pure Python weekDay()
+    rp2RTC.useNative(not enable)
+    rp2RTC.useWeekdayTable(enable)
+
+
+def _weekDayLeap(year, month, day):
+    # The per-date calculation that rp2RTC.calendar() replaces
+    return (rp2RTC.weekDay(year, month, day), rp2RTC.isLeapYear(year))
+
+
+def _formatLocaltime():
+    # The formatting that rp2RTCFormat.render() replaces
+    return '%04d-%02d-%02dT%02d:%02d:%02d' % rp2RTC.localtime()[:6]
+
+
+def _splitISO8601(text):
+    # The parsing that rp2RTCParse.parseISO8601() replaces
+    (date, time) = text.decode().split('T')
+    return [int(x) for x in date.split('-') + time.split(':')]
+
+
+def _instrumented(enable):
+    # Runs a case with instrumentation enabled
+    rp2RTC.instrument(enable)
+
+
+def cases():
+    """
+    Returns the list of benchmark cases.
+
+    ≡≡≡ Returns ≡≡≡
+    list: of (name, function, args) or (name, function, args, mode) tuples.
+          mode(True) is called before the case is run, mode(False) after it.
+          If function is a str, it is the name of the rp2RTC method to run,
+          looked up after mode(True) has been called.
+    """
+    return [
+        ('localtime', rp2RTC.localtime, ()),
+        ('localtime (python)', 'localtime', (), _python),
+        ('localtime (instrumented)', 'localtime', (), _instrumented),
+        ('localtime_into', rp2RTC.localtime_into, (array('H', [0] * 7),)),
+        ('localtime_into (python)', 'localtime_into', (array('H', [0] * 7),),
+         _python),
+        ('time', rp2RTC.time, ()),
+        ('raw_now', rp2RTC.raw_now, ()),
+        ('gmtime', rp2RTC.gmtime, (1622808001,)),
+        ('mktime', rp2RTC.mktime, ((2021, 6, 4, 12, 0, 1),)),
+        ('raw_diff (same day)', rp2RTC.raw_diff,
+         (rp2RTC.raw_pack(2021, 6, 4, 12, 0, 1),
+          rp2RTC.raw_pack(2021, 6, 4, 8, 30, 0))),
+        ('raw_diff (other day)', rp2RTC.raw_diff,
+         (rp2RTC.raw_pack(2021, 6, 4, 12, 0, 1),
+          rp2RTC.raw_pack(2020, 2, 29, 8, 30, 0))),
+        ('setRTC', rp2RTC.setRTC, (2021, 6, 4, 12, 0, 0)),
+        ('weekDay', rp2RTC.weekDay, (2021, 6, 4)),
+        ('weekDay (python)', 'weekDay', (2021, 6, 4), _python),
+        ('weekDay (table)', 'weekDay', (2021, 6, 4), _pythonWeekdayTable),
+        ('isLeapYear', rp2RTC.isLeapYear, (2020,)),
+        ('isLeapYear (python)', 'isLeapYear', (2020,), _python),
+        ('calendar next()', next, (rp2RTC.calendar((0, 1, 1)),)),
+        ('weekDay + isLeapYear', _weekDayLeap, (2021, 6, 4)),
+        ('__validDateTime', _validDateTime(), (2020, 2, 29, 23, 59, 59)),
+        ('validate_code', rp2RTC.validate_code, (2020, 2, 29, 23, 59, 59)),
+        ('rtc_running', rp2RTC.rtc_running, ()),
+        ('rp2RTCFormat.render', rp2RTCFormat().render, ()),
+        ('localtime % format', _formatLocaltime, ()),
+        ('parseISO8601', rp2RTCParse.parseISO8601,
+         (b'2021-06-04T12:00:01', array('H', [0] * 6))),
+        ('parseBinary', rp2RTCParse.parseBinary,
+         (rp2RTCParse.pack(2021, 6, 4, 12, 0, 1), array('H', [0] * 6))),
+        ('ISO 8601 split/int', _splitISO8601, (b'2021-06-04T12:00:01',)),
+        ('rp2RTCRing.append', rp2RTCRing(64).append, ()),
+    ]
+
+
+def _timeRun(func, args, calls):
+    """
+    Returns the microseconds taken by 'calls' calls of func(*args).
+    """
+    rng = range(calls)
+    gc.collect()
+    start = ticks_us()
+    for _ in rng:
+        func(*args)
+    return ticks_diff(ticks_us(), start)
+
+
+def _allocPerCall(func, args, calls):
+    """
+    Returns the heap bytes allocated per call of func(*args).
+    """
+    rng = range(calls)
+    gc.collect()
+
+    if _MICROPYTHON:
+        gc.disable()
+        try:
+            # Measure the loop on its own so its cost can be removed
+            start = gc.mem_alloc()
+            for _ in rng:
+                pass
+            empty = gc.mem_alloc() - start
+
+            start = gc.mem_alloc()
+            for _ in rng:
+                func(*args)
+            used = gc.mem_alloc() - start - empty
+        finally:
+            gc.enable()
+        return used / calls
+
+    tracemalloc.start()
+    try:
+        used = 0
+        for _ in rng:
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            func(*args)
+            used += tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    return used / calls
+
+
+def bench(func, args=(), calls=1000, runs=5):
+    """
+    Benchmarks a single function.
+
+    ≡≡≡ Required Parameters ≡≡≡
+    func:   function to benchmark
+
+    ≡≡≡ Optional Parameters ≡≡≡
+    args:   tuple, arguments passed to func on every call
+    calls:  int, number of calls per run
+    runs:   int, number of timed runs
+
+    ≡≡≡ Returns ≡≡≡
+    dict: with the keys
+        ops_per_sec:    float, calls per second, from the mean run time
+        us_per_call:    float, mean microseconds per call
+        stdev_us:       float, standard deviation of us_per_call between runs
+        rel_stdev_pct:  float, stdev_us as a percentage of us_per_call
+        bytes_per_call: float, heap bytes allocated per call
+    """
+    # Warm up, so that caches and lazily built state are not measured
+    _timeRun(func, args, min(calls, 100))
+
+    samples = [_timeRun(func, args, calls) / calls for _ in range(runs)]
+    mean = sum(samples) / runs
+    if runs > 1:
+        variance = sum((s - mean) ** 2 for s in samples) / (runs - 1)
+    else:
+        variance = 0.0
+    stdev = variance ** 0.5
+
+    return {
+        'ops_per_sec': 1000000 / mean if mean > 0 else 0.0,
+        'us_per_call': mean,
+        'stdev_us': stdev,
+        'rel_stdev_pct': 100 * stdev / mean if mean > 0 else 0.0,
+        'bytes_per_call': _allocPerCall(func, args, min(calls, 1000)),
+    }
+
+
+def run(calls=1000, runs=5, output=None, baseline=None):
+    """
+    Runs every benchmark case and prints a report.
+
+    ≡≡≡ Optional Parameters ≡≡≡
+    calls:    int, number of calls per run
+    runs:     int, number of timed runs per case
+    output:   str, path of a JSON file to write the results to
+    baseline: str, path of an earlier JSON results file to compare against
+
+    ≡≡≡ Returns ≡≡≡
+    dict: the results, as written to 'output'
+    """
+    results = {
+        'platform': sys.platform,
+        'implementation': sys.implementation.name,
+        'calls': calls,
+        'runs': runs,
+        'results': {},
+    }
+
+    print('%-24s %12s %10s %10s %10s' %
+          ('method', 'ops/sec', 'us/call', 'stdev %', 'bytes/call'))
+    for case in cases():
+        (name, func, args) = case[0:3]
+        mode = case[3] if len(case) > 3 else None
+        if mode is not None:
+            mode(True)
+        if isinstance(func, str):
+            func = getattr(rp2RTC, func)
+        try:
+            r = bench(func, args, calls, runs)
+        finally:
+            if mode is not None:
+                mode(False)
+        results['results'][name] = r
+        print('%-24s %12.1f %10.3f %10.2f %10.1f' %
+              (name, r['ops_per_sec'], r['us_per_call'], r['rel_stdev_pct'],
+               r['bytes_per_call']))
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f)
+
+    if baseline is not None:
+        with open(baseline) as f:
+            compare(json.load(f), results)
+
+    return results
+
+
+def compare(old, new):
+    """
+    Prints the change in us/call and bytes/call between two sets of results.
+
+    ≡≡≡ Required Parameters ≡≡≡
+    old:    dict, results of the baseline revision, as returned by run()
+    new:    dict, results of the revision being tested, as returned by run()
+    """
+    print('%-24s %12s %12s %12s' %
+          ('method', 'us/call', 'change %', 'bytes/call'))
+    for name in new['results']:
+        if name not in old['results']:
+            continue
+        o = old['results'][name]
+        n = new['results'][name]
+        if o['us_per_call'] > 0:
+            change = 100 * (n['us_per_call'] - o['us_per_call']) / o['us_per_call']
+        else:
+            change = 0.0
+        print('%-24s %12.3f %+12.1f %+12.1f' %
+              (name, n['us_per_call'], change,
+               n['bytes_per_call'] - o['bytes_per_call']))
+
+
+def _main(argv):
+    if not _MICROPYTHON:
+        from RP2040_RTC_sim import rp2RTCSim
+        sim = rp2RTCSim()
+        rp2RTC.setBackend(sim, sim.sleep_us)
+
+    calls = int(argv[1]) if len(argv) > 1 else 1000
+    output = argv[2] if len(argv) > 2 else None
+    baseline = argv[3] if len(argv) > 3 else None
+    run(calls, output=output, baseline=baseline)
+
+
+if __name__ == '__main__':
+    _main(sys.argv)
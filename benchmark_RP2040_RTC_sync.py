@@ -0,0 +1,133 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    benchmark_RP2040_RTC_sync.py
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Benchmark for the time sync protocol of RP2040_RTC_sync.py
+#
+# Starts a copy of itself as the device: a subprocess running rp2RTCSync
+# against the RP2040_RTC_sim.py simulator, with its stdin and stdout as the
+# serial line. rp2RTCSyncHost (RP2040_RTC_sync_host.py) then sends PING, QUERY
+# and SET requests over the pipes, one at a time, and reports for each:
+# messages per second and the round-trip latency (mean, median and 99th
+# percentile).
+#
+# Usage on a development host:
+#   python benchmark_RP2040_RTC_sync.py [messages]
+#
+# IMPORTANT NOTES:
+#   - The latency is that of the pipes and of the device process on the host,
+#     not of a UART. At 115200 baud, a SET frame and its response alone take
+#     about 1.7 ms on the line.
+#   - The simulator runs in real time, so each SET includes the settle delay
+#     of rp2RTC.setRTC().
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+import subprocess
+import sys
+
+from time import perf_counter_ns
+
+from RP2040_RTC import rp2RTC
+from RP2040_RTC_sim import rp2RTCSim
+from RP2040_RTC_sync import rp2RTCSync
+from RP2040_RTC_sync_host import rp2RTCSyncHost
+
+
+def device():
+    """
+    Runs the device side on stdin and stdout until stdin is closed.
+    """
+    sim = rp2RTCSim(realtime=True)
+    rp2RTC.setBackend(sim, sim.sleep_us, sim.ticks_us)
+    rp2RTC.setRTC(2021, 6, 4, 12, 0, 0)
+
+    # Unbuffered, so that each response is written out at once
+    rx = open(sys.stdin.fileno(), 'rb', buffering=0, closefd=False)
+    sync = rp2RTCSync(open(sys.stdout.fileno(), 'wb', buffering=0,
+                           closefd=False))
+    buf = bytearray(64)
+    while True:
+        length = rx.readinto(buf)
+        if not length:
+            break
+        sync.feed(buf, length)
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+
+
+def run(messages=2000):
+    """
+    Benchmarks PING, QUERY and SET against a device subprocess, and prints a
+    report.
+
+    ≡≡≡ Optional Parameters ≡≡≡
+    messages: int, requests of each type
+    """
+    process = subprocess.Popen([sys.executable, __file__, 'device'],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               bufsize=0)
+
+    class _Pipes:
+        # The host writes to the device's stdin and reads its stdout
+        def write(self, data):
+            process.stdin.write(data)
+
+        def read(self, length):
+            data = b''
+            while len(data) < length:
+                chunk = process.stdout.read(length - len(data))
+                if not chunk:
+                    break
+                data += chunk
+            return data
+
+    host = rp2RTCSyncHost(_Pipes())
+
+    # Wait for the device to start
+    host.ping()
+    cases = (
+        ('ping', lambda: host.ping()),
+        ('ping 32 bytes', lambda: host.ping(bytes(range(32)))),
+        ('query', lambda: host.query()),
+        ('set', lambda: host.setTime(2022, 1, 1, 0, 0, 0)),
+    )
+
+    print('%-16s %12s %10s %10s %10s' %
+          ('request', 'msgs/sec', 'mean us', 'p50 us', 'p99 us'))
+    try:
+        for (name, case) in cases:
+            latencies = []
+            start = perf_counter_ns()
+            for _ in range(messages):
+                t = perf_counter_ns()
+                case()
+                latencies.append((perf_counter_ns() - t) / 1000)
+            elapsed = (perf_counter_ns() - start) / 1e9
+
+            latencies.sort()
+            print('%-16s %12.1f %10.1f %10.1f %10.1f' %
+                  (name, messages / elapsed, sum(latencies) / messages,
+                   _percentile(latencies, 50), _percentile(latencies, 99)))
+
+        if host.query()[0:3] != (2022, 1, 1):
+            print('Device time was not set.')
+    finally:
+        process.stdin.close()
+        process.wait()
+        process.stdout.close()
+
+
+def _main(argv):
+    if len(argv) > 1 and argv[1] == 'device':
+        device()
+    else:
+        run(int(argv[1]) if len(argv) > 1 else 2000)
+
+
+if __name__ == '__main__':
+    _main(sys.argv)
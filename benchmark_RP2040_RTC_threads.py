@@ -0,0 +1,154 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    benchmark_RP2040_RTC_threads.py
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Stress benchmark for reading RP2040_RTC.py while another thread sets the RTC
+#
+# A writer thread (on the Pico, running on the second core) calls setRTC() in
+# a loop, alternating between two times on different dates. The main thread
+# reads localtime() as fast as it can and checks that every date belongs with
+# its time. Reports, for each resync rate: reads per second, re-reads done by
+# the seqlock (see rp2RTC.readRetries()) and inconsistent reads.
+#
+# Usage on a Raspberry Pi Pico:
+#   import benchmark_RP2040_RTC_threads
+#   benchmark_RP2040_RTC_threads.run()
+#
+# Usage on a development host, against the RP2040_RTC_sim.py simulator:
+#   python benchmark_RP2040_RTC_threads.py [seconds]
+#
+# IMPORTANT NOTES:
+#   - Sets the RTC. Set it to the correct time afterwards.
+#   - On CPython, the threads share the interpreter lock, so the reader
+#     throughput drops with the writer's share of the interpreter rather than
+#     with lock contention.
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+import sys
+import _thread
+
+from RP2040_RTC import rp2RTC
+
+try:
+    from utime import ticks_ms
+    from utime import ticks_diff
+    from utime import sleep_ms
+except ImportError:
+    from time import monotonic
+    from time import sleep
+
+    def ticks_ms():
+        return int(monotonic() * 1000)
+
+    def ticks_diff(end, start):
+        return end - start
+
+    def sleep_ms(ms):
+        sleep(ms / 1000)
+
+
+# The two times the writer alternates between, and the date each reading is
+# checked against
+_TIMES = ((2021, 6, 4, 12, 0, 0), (2030, 1, 1, 23, 0, 0))
+
+
+def _writer(state, period_ms):
+    """
+    Sets the RTC every period_ms milliseconds (0 for as fast as possible)
+    until state['stop'] is set.
+    """
+    i = 0
+    while not state['stop']:
+        rp2RTC.setRTC(*_TIMES[i & 1])
+        state['resyncs'] += 1
+        i += 1
+        if period_ms:
+            sleep_ms(period_ms)
+    state['stopped'] = True
+
+
+def _consistent(t):
+    # The writer's times are less than an hour from the start, so the hour
+    # identifies the date it was set with
+    for s in _TIMES:
+        if t[0:3] == s[0:3]:
+            return t[3] == s[3]
+    return False
+
+
+def stress(seconds=2, period_ms=0):
+    """
+    Reads localtime() for a number of seconds while a writer thread sets the
+    RTC.
+
+    ≡≡≡ Optional Parameters ≡≡≡
+    seconds:   int, duration of the run
+    period_ms: int, milliseconds between resyncs, 0 for as fast as possible,
+               or None for no writer
+
+    ≡≡≡ Returns ≡≡≡
+    dict: reads_per_sec, resyncs_per_sec, retries and inconsistent (reads
+          whose date and time belong to different settings)
+    """
+    rp2RTC.setRTC(*_TIMES[0])
+    rp2RTC.readRetries(True)
+
+    state = {'stop': False, 'stopped': True, 'resyncs': 0}
+    if period_ms is not None:
+        state['stopped'] = False
+        _thread.start_new_thread(_writer, (state, period_ms))
+
+    reads = 0
+    inconsistent = 0
+    start = ticks_ms()
+    while ticks_diff(ticks_ms(), start) < seconds * 1000:
+        for _ in range(100):
+            if not _consistent(rp2RTC.localtime()):
+                inconsistent += 1
+        reads += 100
+    elapsed = ticks_diff(ticks_ms(), start) / 1000
+
+    state['stop'] = True
+    while not state['stopped']:
+        sleep_ms(1)
+
+    return {
+        'reads_per_sec': reads / elapsed,
+        'resyncs_per_sec': state['resyncs'] / elapsed,
+        'retries': rp2RTC.readRetries(True),
+        'inconsistent': inconsistent,
+    }
+
+
+def run(seconds=2):
+    """
+    Runs stress() without a writer, and with resyncs every 10 ms, every 1 ms
+    and as fast as possible, and prints a report.
+
+    ≡≡≡ Optional Parameters ≡≡≡
+    seconds: int, duration of each run
+    """
+    print('%-12s %12s %12s %10s %12s' %
+          ('writer', 'reads/sec', 'resyncs/sec', 'retries', 'inconsistent'))
+    for (name, period_ms) in (('none', None), ('10 ms', 10), ('1 ms', 1),
+                              ('continuous', 0)):
+        r = stress(seconds, period_ms)
+        print('%-12s %12.1f %12.1f %10d %12d' %
+              (name, r['reads_per_sec'], r['resyncs_per_sec'], r['retries'],
+               r['inconsistent']))
+
+
+def _main(argv):
+    if sys.implementation.name != 'micropython':
+        from RP2040_RTC_sim import rp2RTCSim
+        sim = rp2RTCSim()
+        rp2RTC.setBackend(sim, sim.sleep_us)
+
+    run(int(argv[1]) if len(argv) > 1 else 2)
+
+
+if __name__ == '__main__':
+    _main(sys.argv)
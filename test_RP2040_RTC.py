@@ -60,6 +60,73 @@ class rp2RTC_Assertions_Group1(unittest.TestCase):
             self.assertEqual(rp2RTC.weekDay(validYear, validMonth, validDay), validDOTW)
     
     
+    def test_calendar(self):
+        dates = rp2RTC.calendar((2020, 1, 1), (2021, 12, 31))
+        for t in range(1577836800, 1640995200, 86400):
+            (validYear, validMonth, validDay, _, _, _, DOTW, _) = utime.localtime(t)
+            validDOTW = (DOTW+1)%7 
+            self.assertEqual(next(dates), (validYear, validMonth, validDay, validDOTW))
+    
+    
+    def test_weekDay_table(self):
+        rp2RTC.useWeekdayTable()
+        try:
+            for t in range(1577836800, 1640995200, 82739):
+                (validYear, validMonth, validDay, _, _, _, DOTW, _) = utime.localtime(t)
+                validDOTW = (DOTW+1)%7 
+                self.assertEqual(rp2RTC.weekDay(validYear, validMonth, validDay), validDOTW)
+        finally:
+            rp2RTC.useWeekdayTable(False)
+    
+    
+    def test_buildWeekdayTable(self):
+        table = rp2RTC.buildWeekdayTable()
+        self.assertEqual(len(table), 2048)
+        
+        for year in range(0, 4096):
+            entry = (table[year >> 1] >> ((year & 1) << 2)) & 0xf
+            self.assertEqual(entry & 0x7, rp2RTC.weekDay(year, 3, 7))
+            self.assertEqual(entry >> 3, int(rp2RTC.isLeapYear(year)))
+        
+        try:
+            from RP2040_RTC_weekdays import WEEKDAY_TABLE
+        except ImportError:
+            return
+        self.assertEqual(bytes(table), WEEKDAY_TABLE)
+    
+    
+    def test_weekDay_many(self):
+        from array import array
+        
+        years = array('H')
+        months = array('H')
+        days = array('H')
+        for t in range(1577836800, 1640995200, 82739):
+            (validYear, validMonth, validDay, _, _, _, _, _) = utime.localtime(t)
+            years.append(validYear)
+            months.append(validMonth)
+            days.append(validDay)
+        
+        result = rp2RTC.weekDay_many(years, months, days)
+        self.assertEqual(len(result), len(years))
+        for i in range(len(years)):
+            self.assertEqual(result[i], rp2RTC.weekDay(years[i], months[i], days[i]))
+    
+    
+    def test_validate_many(self):
+        from array import array
+        
+        years = array('h', [2020, 2021, 2020, -1, 4096, 2020, 2020, 2020, 2020, 2020])
+        months = array('h', [2, 2, 4, 1, 1, 13, 1, 1, 1, 1])
+        days = array('h', [29, 29, 31, 1, 1, 1, 0, 1, 1, 1])
+        hours = array('h', [23, 0, 0, 0, 0, 0, 0, 24, 0, 0])
+        minutes = array('h', [59, 0, 0, 0, 0, 0, 0, 0, 60, 0])
+        seconds = array('h', [59, 0, 0, 0, 0, 0, 0, 0, 0, -1])
+        
+        result = rp2RTC.validate_many(years, months, days, hours, minutes, seconds)
+        self.assertEqual(list(result), [1, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+    
+    
     def test_localtime(self):
         (y, m, d, hr, mi, sc, dw, _) = utime.localtime()
         dw = (dw+1)%7 
@@ -73,6 +140,26 @@ class rp2RTC_Assertions_Group1(unittest.TestCase):
         self.assertEqual(second, sc)
         self.assertEqual(dotw, dw)
     
+    
+    def test_localtime_into(self):
+        from array import array
+        import micropython
+        
+        buf = array('H', [0] * 7)
+        expected = rp2RTC.localtime()
+        
+        # localtime_into() must not allocate on the heap
+        micropython.heap_lock()
+        try:
+            result = rp2RTC.localtime_into(buf)
+        finally:
+            micropython.heap_unlock()
+        
+        self.assertTrue(result)
+        self.assertEqual(tuple(buf[0:3]), expected[0:3])
+        self.assertAlmostEqual(buf[5], expected[5], delta= 1)
+        self.assertEqual(buf[6], expected[6])
+    
 
 
 class rp2RTC_Assertions_Group2(unittest.TestCase):
@@ -241,6 +328,47 @@ class rp2RTC_Assertions_Group2(unittest.TestCase):
     
 
 
+    def test_validate_code(self):
+        import micropython
+        
+        # The success path must not allocate on the heap
+        micropython.heap_lock()
+        try:
+            code = rp2RTC.validate_code(2020, 2, 29, 23, 59, 59)
+        finally:
+            micropython.heap_unlock()
+        self.assertEqual(code, rp2RTC.VALID)
+        
+        self.assertEqual(rp2RTC.validate_code(2021, 2, 29, 0, 0, 0),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+        self.assertEqual(rp2RTC.validate_code(4096, 13, 0, 0, 0, 0),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_YEAR)
+        self.assertEqual(rp2RTC.validate_code(2020, 1, 1, 0, 60, 0),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_MINUTE)
+        self.assertEqual(rp2RTC.validate_code(-1, 1, 1, 0, 0, '0'),
+                         rp2RTC.ERR_TYPE | rp2RTC.FIELD_SECOND)
+        
+        for i in self.invalidHour:
+            self.assertEqual(rp2RTC.validate_code(self.validYear,
+                                                  self.validMonth,
+                                                  self.validDay,
+                                                  i,
+                                                  self.validMinute,
+                                                  self.validSecond),
+                             rp2RTC.ERR_VALUE | rp2RTC.FIELD_HOUR)
+
+
+    def test_validationMessage(self):
+        self.assertIsNone(rp2RTC.validationMessage(rp2RTC.VALID, 2020, 2, 29, 0, 0, 0))
+        self.assertEqual(rp2RTC.validationMessage(rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY,
+                                                  2021, 2, 29, 0, 0, 0),
+                         'Parameter \'day\' received value of 29 - must supply an integer from 1 to 28 inclusive for month 2')
+        self.assertEqual(rp2RTC.validationMessage(rp2RTC.ERR_VALUE | rp2RTC.FIELD_HOUR,
+                                                  2021, 2, 28, 24, 0, 0),
+                         'Parameter \'hour\' received value of 24 - must supply an integer from 0 to 23 inclusive')
+    
+
+
 class rp2RTC_Assertions_Group3(unittest.TestCase):
     def test_setRTC(self):
         y = 2020
@@ -275,6 +403,154 @@ class rp2RTC_Assertions_Group3(unittest.TestCase):
         self.assertAlmostEqual(second, secondO, delta= 1)
         self.assertAlmostEqual(dotw, dotwO, delta= 0)
 
+    
+    
+    def test_setRTC_nowait(self):
+        (yearO, monthO, dayO, hourO, minuteO, secondO, dotwO) = rp2RTC.localtime()
+        
+        pending = rp2RTC.setRTC_nowait(2020, 2, 29, 23, 59, 59)
+        self.assertTrue(pending.wait())
+        (year, month, day, hour, minute, second, dotw) = rp2RTC.localtime()
+        
+        self.assertEqual(year, 2020)
+        self.assertEqual(month, 2)
+        self.assertEqual(day, 29)
+        self.assertEqual(dotw, 6)
+        self.assertTrue(rp2RTC.rtc_running())
+        
+        self.assertTrue(rp2RTC.setRTC_nowait(yearO, monthO, dayO, hourO, minuteO, secondO).wait())
+        (year, month, day, hour, minute, second, dotw) = rp2RTC.localtime()
+        
+        self.assertAlmostEqual(year, yearO, delta= 0)
+        self.assertAlmostEqual(month, monthO, delta= 0)
+        self.assertAlmostEqual(day, dayO, delta= 0)
+        self.assertAlmostEqual(second, secondO, delta= 1)
+    
+    
+    def test_setRTC_nowait_unattended(self):
+        (yearO, monthO, dayO, hourO, minuteO, secondO, dotwO) = rp2RTC.localtime()
+        
+        # done() is never called: the timer restarts the RTC
+        rp2RTC.setRTC_nowait(2020, 2, 29, 23, 59, 59)
+        utime.sleep_ms(20)
+        self.assertTrue(rp2RTC.rtc_running())
+        self.assertEqual(rp2RTC.localtime()[0:3], (2020, 2, 29))
+        
+        rp2RTC.setRTC(yearO, monthO, dayO, hourO, minuteO, secondO)
+
+
+    def test_time_us(self):
+        error = rp2RTC.syncEdge()
+        self.assertTrue(0 <= error < 1000)
+        
+        # time_us() is monotonic (within its error bound) and agrees with time()
+        previous = rp2RTC.time_us()
+        for _ in range(2000):
+            utime.sleep_us(997)
+            (seconds, us, err) = rp2RTC.time_us()
+            self.assertTrue(0 <= us <= 999999)
+            self.assertTrue(err < 1000)
+            self.assertTrue((seconds - previous[0]) * 1000000 + us - previous[1] >= -err)
+            self.assertAlmostEqual(seconds, rp2RTC.time(), delta= 1)
+            previous = (seconds, us, err)
+    
+    
+    def test_ring_export_into(self):
+        from RP2040_RTC_ring import rp2RTCRing
+        
+        # Wrapped around, into a bytearray and into a memoryview
+        ring = rp2RTCRing(2)
+        for second in range(3):
+            ring.append_raw(0x7e5604, second)
+        expected = b'\x04\x56\x7e\x00\x01\x00\x00\x00\x04\x56\x7e\x00\x02\x00\x00\x00'
+        self.assertEqual(ring.tobytes(), expected)
+        buf = bytearray(20)
+        self.assertEqual(ring.export_into(memoryview(buf)[4:]), 16)
+        self.assertEqual(bytes(buf[4:20]), expected)
+
+
+
+try:
+    import RP2040_RTC_native
+except (ImportError, SyntaxError):
+    RP2040_RTC_native = None
+
+
+class rp2RTC_Assertions_Native(unittest.TestCase):
+    def tearDown(self):
+        rp2RTC.useNative()
+    
+    
+    @unittest.skipUnless(RP2040_RTC_native, 'native code emitters not availible')
+    def test_native_weekDay(self):
+        rp2RTC.useNative(False)
+        for year in range(0, 4096, 3):
+            for month in range(1, 13):
+                for day in (1, 28):
+                    self.assertEqual(RP2040_RTC_native.weekDay(year, month, day),
+                                     rp2RTC.weekDay(year, month, day))
+        self.assertEqual(RP2040_RTC_native.weekDay(2021, 6, 4, True), 'Friday')
+    
+    
+    @unittest.skipUnless(RP2040_RTC_native, 'native code emitters not availible')
+    def test_native_isLeapYear(self):
+        rp2RTC.useNative(False)
+        for year in range(0, 4096):
+            self.assertEqual(RP2040_RTC_native.isLeapYear(year),
+                             rp2RTC.isLeapYear(year))
+    
+    
+    @unittest.skipUnless(RP2040_RTC_native, 'native code emitters not availible')
+    def test_native_localtime(self):
+        rp2RTC.useNative(False)
+        expected = rp2RTC.localtime()
+        result = RP2040_RTC_native.localtime()
+        
+        self.assertEqual(result[0:3], expected[0:3])
+        self.assertAlmostEqual(result[5], expected[5], delta= 1)
+        self.assertEqual(result[6], expected[6])
+    
+    
+    @unittest.skipUnless(RP2040_RTC_native, 'native code emitters not availible')
+    def test_native_localtime_into(self):
+        from array import array
+        import micropython
+        
+        buf = array('H', [0] * 7)
+        expected = RP2040_RTC_native.localtime()
+        
+        micropython.heap_lock()
+        try:
+            result = RP2040_RTC_native.localtime_into(buf)
+        finally:
+            micropython.heap_unlock()
+        
+        self.assertTrue(result)
+        self.assertEqual(tuple(buf[0:3]), expected[0:3])
+        self.assertAlmostEqual(buf[5], expected[5], delta= 1)
+    
+    
+    @unittest.skipUnless(RP2040_RTC_native, 'native code emitters not availible')
+    def test_native_write_in_progress(self):
+        # The pure Python version is called, which re-reads and counts
+        sequence = getattr(rp2RTC, '_rp2RTC__sequence',
+                           getattr(rp2RTC, '__sequence', None))
+        rp2RTC.readRetries(True)
+        sequence[0] += 1
+        try:
+            result = RP2040_RTC_native.localtime()
+        finally:
+            sequence[0] += 1
+        
+        self.assertEqual(len(result), 7)
+        self.assertEqual(rp2RTC.readRetries(), 1000)
+    
+    
+    def test_useNative(self):
+        self.assertEqual(rp2RTC.useNative(), RP2040_RTC_native is not None)
+        self.assertFalse(rp2RTC.useNative(False))
+        self.assertFalse(rp2RTC.isLeapYear(1900))
+        self.assertEqual(rp2RTC.weekDay(2021, 6, 4), 5)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,1913 @@
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+#    test_RP2040_RTC_sim.py
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+#
+# Tests for RP2040_RTC_sim.py, and for RP2040_RTC.py, RP2040_RTC_alarm.py,
+# RP2040_RTC_drift.py, RP2040_RTC_tz.py, RP2040_RTC_format.py,
+# RP2040_RTC_parse.py, RP2040_RTC_sync.py and RP2040_RTC_ring.py running
+# against it. These
+# tests run on a development host (CPython) as well as on MicroPython.
+#
+# Requires:
+#   - micropython-lib/python-stdlib/unittest/unittest.py from
+#     https://github.com/micropython/micropython-lib/tree/master/python-stdlib/unittest
+#   - RP2040-Pico-RTC/RP2040_RTC.py and RP2040-Pico-RTC/RP2040_RTC_sim.py from
+#     https://github.com/infonick/RP2040-Pico-RTC
+#
+# ≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡≡
+
+from RP2040_RTC import rp2RTC
+from RP2040_RTC_sim import rp2RTCSim
+from RP2040_RTC_alarm import rp2RTCAlarm
+from RP2040_RTC_drift import rp2RTCDrift
+from RP2040_RTC_tz import rp2RTCTimezone
+from RP2040_RTC_format import rp2RTCFormat
+from RP2040_RTC_parse import rp2RTCParse
+from RP2040_RTC_sync import rp2RTCSync
+from RP2040_RTC_sync_host import rp2RTCSyncHost
+from RP2040_RTC_ring import rp2RTCRing
+import unittest
+import _thread
+
+try:
+    from utime import sleep_ms
+except ImportError:
+    from time import sleep
+
+    def sleep_ms(ms):
+        sleep(ms / 1000)
+
+
+BASE = rp2RTCSim.RTC_BASE_MEM
+
+
+class rp2RTCSim_Registers(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+
+    def test_counter_ticks(self):
+        self.sim.setTime(2021, 12, 31, 23, 59, 58, 5)
+        self.sim.advance(999999)
+        self.assertEqual(self.sim.now(), (2021, 12, 31, 23, 59, 58, 5))
+        self.sim.advance(1)
+        self.assertEqual(self.sim.now(), (2021, 12, 31, 23, 59, 59, 5))
+        self.sim.advance(1000000)
+        self.assertEqual(self.sim.now(), (2022, 1, 1, 0, 0, 0, 6))
+
+    def test_leap_day(self):
+        self.sim.setTime(2024, 2, 28, 23, 59, 59, 3)
+        self.sim.advance(1000000)
+        self.assertEqual(self.sim.now(), (2024, 2, 29, 0, 0, 0, 4))
+        self.sim.advance(86400 * 1000000)
+        self.assertEqual(self.sim.now(), (2024, 3, 1, 0, 0, 0, 5))
+
+    def test_force_not_leap_year(self):
+        self.sim[BASE + rp2RTCSim.ATOMIC_SET + 0x0c] = 0x100
+        self.sim.setTime(2100, 2, 28, 23, 59, 59, 0)
+        self.sim.advance(1000000)
+        self.assertEqual(self.sim.now()[:3], (2100, 3, 1))
+
+    def test_long_advance(self):
+        self.sim.setTime(2021, 1, 1, 0, 0, 0, 5)
+        self.sim.advance(366 * 86400 * 1000000)
+        self.assertEqual(self.sim.now(), (2022, 1, 2, 0, 0, 0, 0))
+
+    def test_rtc_registers(self):
+        self.sim.setTime(2020, 2, 29, 13, 14, 15, 6)
+        rtc_0 = self.sim[BASE + 0x1c]
+        rtc_1 = self.sim[BASE + 0x18]
+        self.assertEqual(rtc_0, (6 << 24) | (13 << 16) | (14 << 8) | 15)
+        self.assertEqual(rtc_1, (2020 << 12) | (2 << 8) | 29)
+
+    def test_load_latency(self):
+        self.sim[BASE + 0x04] = (2030 << 12) | (6 << 8) | 15
+        self.sim[BASE + 0x08] = (6 << 24) | (12 << 16) | (0 << 8) | 0
+        self.sim[BASE + rp2RTCSim.ATOMIC_SET + 0x0c] = 0x10
+
+        # LOAD is pending and the old value is visible for 2 clk_rtc periods
+        self.assertTrue(self.sim[BASE + 0x0c] & 0x10)
+        self.assertEqual(self.sim.now()[0], 2021)
+
+        self.sim.advance(2 * 1000000 // rp2RTCSim.CLK_RTC_HZ + 1)
+        self.assertFalse(self.sim[BASE + 0x0c] & 0x10)
+        self.assertEqual(self.sim.now(), (2030, 6, 15, 12, 0, 0, 6))
+
+    def test_enable(self):
+        self.assertTrue(self.sim[BASE + 0x0c] & 0x2)
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(self.sim[BASE + 0x0c] & 0x2)
+
+        # A stopped RTC does not count
+        before = self.sim.now()
+        self.sim.advance(5000000)
+        self.assertEqual(self.sim.now(), before)
+
+    def test_clock_divider(self):
+        # Halve the divider: the counter runs at 2 Hz
+        self.sim[BASE] = rp2RTCSim.CLK_RTC_HZ // 2 - 1
+        self.sim.setTime(2021, 1, 1, 0, 0, 0, 5)
+        self.sim.advance(10000000)
+        self.assertEqual(self.sim.now()[5], 20)
+
+    def test_alarm_match(self):
+        self.sim.setTime(2021, 1, 1, 0, 0, 58, 5)
+        self.sim[BASE + 0x24] = 0x1
+        self.sim[BASE + 0x10] = (2021 << 12) | (1 << 8) | 1 | 0x07000000
+        self.sim[BASE + 0x14] = 59 | 0x70000000
+        self.assertFalse(self.sim[BASE + 0x10] & 0x20000000)
+        self.sim[BASE + rp2RTCSim.ATOMIC_SET + 0x10] = 0x10000000
+        self.assertTrue(self.sim[BASE + 0x10] & 0x20000000)
+
+        # INTR is set for the whole matching second only
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+        self.sim.advance(1000000)
+        self.assertEqual(self.sim[BASE + 0x20], 1)
+        self.assertEqual(self.sim[BASE + 0x2c], 1)
+        self.sim.advance(1000000)
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+
+        # Fields without their ENA bit are ignored
+        self.sim[BASE + 0x14] = 0x10000000
+        self.assertEqual(self.sim[BASE + 0x20], 1)
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x10] = 0x10000000
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+
+    def test_bad_address(self):
+        with self.assertRaises(ValueError):
+            self.sim[BASE + 0x30]
+        with self.assertRaises(ValueError):
+            self.sim[BASE + 0x4000]
+
+
+
+class rp2RTCSim_Backend(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+
+    def tearDown(self):
+        rp2RTC.disarm()
+        rp2RTC.setBackend(self.previous)
+
+    def test_rtc_running(self):
+        self.assertTrue(rp2RTC.rtc_running())
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTC.rtc_running())
+        self.assertFalse(rp2RTC.localtime())
+        self.assertFalse(rp2RTC.setRTC(2020, 2, 29, 0, 0, 0))
+
+    def test_setRTC(self):
+        self.assertTrue(rp2RTC.setRTC(2020, 2, 29, 23, 59, 59))
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(), (2020, 3, 1, 0, 0, 0, 0))
+
+    def test_useNative(self):
+        # Native register access is never used with another backend
+        rp2RTC.useNative()
+        self.assertTrue(rp2RTC.setRTC(2020, 2, 29, 23, 59, 59))
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+        self.assertFalse(rp2RTC.useNative(False))
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+        rp2RTC.useNative()
+
+    def test_useNative_settings(self):
+        # Stand-in for RP2040_RTC_native, treating the simulator as the
+        # default backend
+        import RP2040_RTC
+
+        class fake:
+            REGISTERS = True
+
+            def weekDay(year, month, day, asString=False):
+                return -1
+
+            def isLeapYear(year):
+                return None
+
+            def localtime(tz=None):
+                return None
+
+            def localtime_into(buf):
+                return None
+
+            def setFallback(sequence, localtime, localtime_into):
+                fake.fallback = (localtime, localtime_into)
+
+        saved = (RP2040_RTC._native, RP2040_RTC._DEFAULT_MEM32)
+        RP2040_RTC._native = fake
+        RP2040_RTC._DEFAULT_MEM32 = self.sim
+        try:
+            self.assertTrue(rp2RTC.useNative())
+            self.assertIs(rp2RTC.weekDay, fake.weekDay)
+            self.assertIs(rp2RTC.localtime, fake.localtime)
+            self.assertIs(rp2RTC.localtime_into, fake.localtime_into)
+            self.assertEqual(fake.fallback, (RP2040_RTC._PYTHON_METHODS['localtime'],
+                                             RP2040_RTC._PYTHON_METHODS['localtime_into']))
+
+            # The native weekDay() does not read the table
+            rp2RTC.useWeekdayTable()
+            self.assertEqual(rp2RTC.weekDay(2021, 6, 4), 5)
+            self.assertIs(rp2RTC.isLeapYear, fake.isLeapYear)
+            rp2RTC.useWeekdayTable(False)
+            self.assertIs(rp2RTC.weekDay, fake.weekDay)
+
+            # The native localtime() and localtime_into() do not re-read
+            rp2RTC.consistentReads()
+            self.assertEqual(rp2RTC.localtime(), (2021, 1, 1, 0, 0, 0, 5))
+            self.assertIsNot(rp2RTC.localtime_into, fake.localtime_into)
+            rp2RTC.consistentReads(False)
+            self.assertIs(rp2RTC.localtime, fake.localtime)
+        finally:
+            (RP2040_RTC._native, RP2040_RTC._DEFAULT_MEM32) = saved
+            rp2RTC.useWeekdayTable(False)
+            rp2RTC.consistentReads(False)
+            rp2RTC.useNative()
+        self.assertEqual(rp2RTC.weekDay(2021, 6, 4), 5)
+
+    def test_localtime_into(self):
+        from array import array
+
+        buf = array('H', [0] * 7)
+        self.sim.setTime(4095, 12, 31, 23, 59, 59, 6)
+        self.assertTrue(rp2RTC.localtime_into(buf))
+        self.assertEqual(tuple(buf), rp2RTC.localtime())
+
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTC.localtime_into(buf))
+
+    def test_time(self):
+        self.sim.setTime(2020, 2, 29, 23, 59, 59, 6)
+        self.assertEqual(rp2RTC.time(), 1583020799)
+        self.assertEqual(rp2RTC.time(rp2RTC.EPOCH_MICROPYTHON), 636335999)
+
+        # Crossing midnight refreshes the cached day
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.time(), 1583020800)
+
+        self.sim.setTime(4095, 12, 31, 23, 59, 59, 6)
+        self.assertEqual(rp2RTC.time(), 67090118399)
+        self.sim.setTime(1, 1, 1, 0, 0, 0, 1)
+        self.assertEqual(rp2RTC.time(), -62135596800)
+
+    def test_time_matches_localtime(self):
+        self.sim.setTime(1999, 12, 31, 0, 0, 0, 5)
+        for _ in range(1000):
+            (year, month, day, hour, minute, second, _) = rp2RTC.localtime()
+            t = rp2RTC.time(rp2RTC.EPOCH_MICROPYTHON)
+            self.assertEqual(t % 86400, hour * 3600 + minute * 60 + second)
+            self.sim.advance(3637 * 1000000)
+
+
+    def test_armed(self):
+        self.assertTrue(rp2RTC.arm())
+
+        # Armed reads skip the CTRL register
+        reads = self.sim.reads
+        rp2RTC.localtime()
+        self.assertEqual(self.sim.reads - reads, 2)
+        reads = self.sim.reads
+        rp2RTC.localtime_into([0] * 7)
+        rp2RTC.time()
+        self.assertEqual(self.sim.reads - reads, 4)
+
+        # A stopped RTC is not noticed until re-armed
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertIsNot(rp2RTC.localtime(), False)
+        self.assertFalse(rp2RTC.arm())
+        self.assertFalse(rp2RTC.localtime())
+
+    def test_setRTC_disarms(self):
+        self.assertTrue(rp2RTC.arm())
+        self.assertTrue(rp2RTC.setRTC(2020, 2, 29, 0, 0, 0))
+        reads = self.sim.reads
+        rp2RTC.localtime()
+        self.assertEqual(self.sim.reads - reads, 3)
+
+        rp2RTC.arm()
+        rp2RTC.disarm()
+        reads = self.sim.reads
+        rp2RTC.localtime()
+        self.assertEqual(self.sim.reads - reads, 3)
+
+
+    def test_setRTC_nowait(self):
+        # Polling needs the virtual clock to move on every register access
+        self.sim.accessTime_ns = 1000
+
+        pending = rp2RTC.setRTC_nowait(2020, 2, 29, 23, 59, 59)
+        self.assertFalse(pending.done())
+        self.assertEqual(self.sim.now()[0], 2021)
+
+        polls = 1
+        while not pending.done():
+            polls += 1
+        self.assertTrue(polls > 2)
+        self.assertTrue(pending.done())
+        self.assertTrue(pending.wait())
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+
+        # The RTC is running again
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(), (2020, 3, 1, 0, 0, 0, 0))
+
+    def test_setRTC_nowait_timer(self):
+        # The update completes from the timer, without done() being called
+        import RP2040_RTC
+
+        self.sim.accessTime_ns = 1000
+        timers = []
+
+        class Timer:
+            ONE_SHOT = 0
+
+            def __init__(self):
+                self.callback = None
+
+            def init(self, mode, period, callback):
+                self.callback = callback
+                timers.append(self)
+
+        saved = RP2040_RTC._Timer
+        RP2040_RTC._Timer = Timer
+        try:
+            pending = rp2RTC.setRTC_nowait(2020, 2, 29, 23, 59, 59)
+        finally:
+            RP2040_RTC._Timer = saved
+        self.assertFalse(self.sim[BASE + 0x0c] & 0x1)
+
+        ticks = 0
+        while timers:
+            timer = timers.pop(0)
+            timer.callback(timer)
+            ticks += 1
+        self.assertTrue(ticks > 2)
+        self.assertTrue(rp2RTC.rtc_running())
+        self.assertTrue(pending.done())
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+
+    def test_setRTC_nowait_timer_lock_held(self):
+        # The timer does not wait for the RTC access lock, as it may run while
+        # the interrupted code holds it, and retries on the next tick
+        import RP2040_RTC
+
+        self.sim.accessTime_ns = 1000
+        timers = []
+
+        class Timer:
+            ONE_SHOT = 0
+
+            def init(self, mode, period, callback):
+                self.callback = callback
+                timers.append(self)
+
+        lock = getattr(rp2RTC, '_rp2RTC__RTCAccessLock',
+                       getattr(rp2RTC, '__RTCAccessLock', None))
+        saved = RP2040_RTC._Timer
+        RP2040_RTC._Timer = Timer
+        try:
+            pending = rp2RTC.setRTC_nowait(2020, 2, 29, 23, 59, 59)
+        finally:
+            RP2040_RTC._Timer = saved
+
+        lock.acquire()
+        try:
+            for _ in range(50):
+                timer = timers.pop(0)
+                timer.callback(timer)
+            # Stopped, and waiting only for the lock to write the new time
+            self.assertEqual(len(timers), 1)
+            self.assertFalse(rp2RTC.rtc_running())
+            self.assertFalse(self.sim[BASE + 0x0c] & 0x1)
+        finally:
+            lock.release()
+
+        while timers:
+            timer = timers.pop(0)
+            timer.callback(timer)
+        self.assertTrue(pending.done())
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+
+    def test_setRTC_nowait_invalid(self):
+        with self.assertRaises(ValueError):
+            rp2RTC.setRTC_nowait(2021, 2, 29, 0, 0, 0)
+        self.assertTrue(rp2RTC.rtc_running())
+
+    def test_setRTC_async(self):
+        try:
+            import uasyncio as asyncio
+        except ImportError:
+            import asyncio
+
+        self.sim.accessTime_ns = 1000
+        ticks = [0]
+
+        async def other():
+            while True:
+                ticks[0] += 1
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.create_task(other())
+            result = await rp2RTC.setRTC_async(2030, 6, 15, 12, 0, 0)
+            task.cancel()
+            return result
+
+        self.assertTrue(asyncio.run(main()))
+        self.assertEqual(rp2RTC.localtime(), (2030, 6, 15, 12, 0, 0, 6))
+        # Other tasks ran while the time was being set
+        self.assertTrue(ticks[0] > 0)
+
+
+
+class rp2RTCSim_TimeUs(unittest.TestCase):
+    def setUp(self):
+        # Every register access takes 1 us, so polling moves the clock
+        self.sim = rp2RTCSim(accessTime_ns=1000)
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us,
+                                          self.sim.ticks_us)
+        self.start = rp2RTC.time()
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def check(self, result):
+        # The counter started on a second edge, at virtual time 0
+        elapsed = self.sim.elapsed_us()
+        (seconds, us, error) = result
+        self.assertEqual(seconds, self.start + elapsed // 1000000)
+        self.assertTrue(abs(us - elapsed % 1000000) <= error + 10)
+        return error
+
+    def test_syncEdge(self):
+        self.sim.advance(300000)
+        error = rp2RTC.syncEdge()
+        self.assertTrue(0 <= error <= 5)
+
+        # The middle of a second is served from ticks_us() alone
+        self.sim.advance(250000)
+        reads = self.sim.reads
+        self.assertEqual(self.check(rp2RTC.time_us()), error)
+        self.assertEqual(self.sim.reads, reads)
+
+        for _ in range(5):
+            self.sim.advance(400000)
+            self.assertEqual(self.check(rp2RTC.time_us()), error)
+
+    def test_no_edge(self):
+        self.sim.advance(300000)
+        self.assertEqual(rp2RTC.time_us()[1:], (0, 1000000))
+
+    def test_passive_edge(self):
+        # Calls 1 ms apart find the edge without syncEdge()
+        for _ in range(1000):
+            self.sim.advance(1000)
+            rp2RTC.time_us()
+        self.assertTrue(self.check(rp2RTC.time_us()) <= 510)
+
+    def test_ticks_wraparound(self):
+        self.sim.ticks_origin_us = 0x40000000 - 1500000
+        rp2RTC.syncEdge()
+        for _ in range(10):
+            self.sim.advance(333333)
+            self.assertTrue(self.check(rp2RTC.time_us()) <= 5)
+
+    def test_long_gap(self):
+        # Longer than half the ticks_us() period
+        rp2RTC.syncEdge()
+        self.sim.advance(1000250000)
+        self.assertTrue(self.check(rp2RTC.time_us()) <= 5)
+
+    def test_setRTC_drops_edge(self):
+        rp2RTC.syncEdge()
+        self.sim.advance(200000)
+        self.assertTrue(rp2RTC.setRTC(2022, 1, 1, 0, 0, 0))
+        self.assertEqual(rp2RTC.time_us()[2], 1000000)
+
+    def test_not_running(self):
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTC.syncEdge())
+        self.assertFalse(rp2RTC.time_us())
+
+    def reference(self):
+        # Reference clock: the virtual clock, from 2021-06-04 12:00:00.123456
+        return 1622808000123456 + self.sim.elapsed_us()
+
+    def test_syncRTC(self):
+        for _ in range(3):
+            r = self.reference()
+            (error, bound) = rp2RTC.syncRTC(r // 1000000, r % 1000000,
+                                            self.sim.ticks_us())
+            self.assertTrue(0 < bound <= 5)
+            self.sim.advance(1500000)
+
+        # Within a clk_rtc period, once the delay has been measured
+        self.assertTrue(abs(error) <= 22 + bound)
+
+        # The RTC's seconds change with the reference's
+        for offset in (-50, 50, 999000):
+            r = self.reference()
+            self.sim.advance(1000000 - r % 1000000 + offset)
+            self.assertEqual(rp2RTC.time(), self.reference() // 1000000)
+
+        # time_us() follows the new edge without syncEdge()
+        r = self.reference()
+        (seconds, us, error) = rp2RTC.time_us()
+        self.assertEqual(seconds, r // 1000000)
+        self.assertTrue(abs(us - r % 1000000) <= 50)
+
+    def test_syncRTC_invalid(self):
+        with self.assertRaises(TypeError):
+            rp2RTC.syncRTC(1.5)
+        with self.assertRaises(ValueError):
+            rp2RTC.syncRTC(0, 1000000)
+        with self.assertRaises(ValueError):
+            rp2RTC.syncRTC(-62167219200 - 86400)
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTC.syncRTC(0))
+
+
+
+class rp2RTCSim_Raw(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        self.sim.setTime(2021, 6, 4, 23, 59, 58, 5)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_raw_now(self):
+        raw = rp2RTC.raw_now()
+        self.assertEqual(raw, rp2RTC.raw_pack(2021, 6, 4, 23, 59, 58))
+        self.sim.advance(2000000)
+        later = rp2RTC.raw_now()
+        self.assertTrue(later > raw)
+        self.assertEqual(rp2RTC.raw_diff(later, raw), 2)
+        self.assertEqual(rp2RTC.raw_diff(raw, later), -2)
+
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTC.raw_now())
+
+    def test_raw_field(self):
+        raw = rp2RTC.raw_pack(4095, 12, 31, 23, 59, 58)
+        fields = [rp2RTC.raw_field(raw, field) for field in
+                  (rp2RTC.FIELD_YEAR, rp2RTC.FIELD_MONTH, rp2RTC.FIELD_DAY,
+                   rp2RTC.FIELD_HOUR, rp2RTC.FIELD_MINUTE,
+                   rp2RTC.FIELD_SECOND)]
+        self.assertEqual(fields, [4095, 12, 31, 23, 59, 58])
+        self.assertRaises(ValueError, rp2RTC.raw_pack, 2021, 2, 29, 0, 0, 0)
+
+    def test_order_and_diff(self):
+        # Times spread over the RTC's range, compared with time()
+        times = []
+        for i in range(200):
+            rp2RTC.setRTC(1 + i * 20, 1 + i % 12, 1 + i % 28, i % 24,
+                          (i * 7) % 60, (i * 13) % 60)
+            times.append((rp2RTC.raw_now(), rp2RTC.time()))
+        for (raw1, t1) in times[::7]:
+            for (raw2, t2) in times:
+                self.assertEqual(rp2RTC.raw_diff(raw1, raw2), t1 - t2)
+                self.assertEqual(raw1 < raw2, t1 < t2)
+
+    def test_raw_add(self):
+        raw = rp2RTC.raw_pack(2021, 6, 4, 23, 59, 58)
+        self.assertEqual(rp2RTC.raw_add(raw, 1),
+                         rp2RTC.raw_pack(2021, 6, 4, 23, 59, 59))
+        self.assertEqual(rp2RTC.raw_add(raw, 2),
+                         rp2RTC.raw_pack(2021, 6, 5, 0, 0, 0))
+        self.assertEqual(rp2RTC.raw_add(raw, -86399),
+                         rp2RTC.raw_pack(2021, 6, 3, 23, 59, 59))
+        self.assertEqual(rp2RTC.raw_add(raw, 86400 * 365 * 3 + 86400 + 2),
+                         rp2RTC.raw_pack(2024, 6, 5, 0, 0, 0))
+        for seconds in (-10 ** 10, -123456789, -1, 0, 987654321, 10 ** 10):
+            self.assertEqual(rp2RTC.raw_diff(rp2RTC.raw_add(raw, seconds),
+                                             raw), seconds)
+
+        self.assertRaises(ValueError, rp2RTC.raw_add,
+                          rp2RTC.raw_pack(4095, 12, 31, 23, 59, 59), 1)
+        self.assertRaises(ValueError, rp2RTC.raw_add,
+                          rp2RTC.raw_pack(0, 1, 1, 0, 0, 0), -1)
+
+
+
+class rp2RTCDrift_Sim(unittest.TestCase):
+    def setUp(self):
+        self.previous = None
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def install(self, clk_rtc_hz):
+        # A crystal off by (clk_rtc_hz / 46875 - 1), with the nominal divider
+        self.sim = rp2RTCSim(clk_rtc_hz=clk_rtc_hz, accessTime_ns=1000)
+        self.sim[BASE] = 46875 - 1
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us,
+                                          self.sim.ticks_us)
+        start = rp2RTC.time() * 1000000
+        self.drift = rp2RTCDrift(lambda: start + self.sim.elapsed_us())
+        self.reference = start
+
+    def rtcError_us(self):
+        (seconds, us, _) = rp2RTC.time_us()
+        return seconds * 1000000 + us - (self.reference + self.sim.elapsed_us())
+
+    def test_ppm(self):
+        self.install(46880)
+        self.assertIs(self.drift.sample(), None)
+        self.sim.advance(1000 * 1000000)
+        self.assertAlmostEqual(self.drift.sample(), 106.667, delta=0.01)
+        self.assertTrue(self.drift.ppmError() < 0.01)
+
+        # 10 ms of drift takes about 94 seconds, or far longer if corrected
+        self.assertAlmostEqual(self.drift.resyncInterval(10000, False), 93.75,
+                               delta=0.1)
+        self.assertTrue(self.drift.resyncInterval(10000) > 1000000)
+
+    def test_trim(self):
+        self.install(46880)
+        self.drift.sample()
+        self.sim.advance(1000 * 1000000)
+        self.drift.sample()
+
+        self.assertAlmostEqual(self.drift.trim(), 0, delta=0.01)
+        self.assertEqual(rp2RTC.clockDivider(), 46880)
+        self.assertTrue(rp2RTC.rtc_running())
+
+        # Set from the reference, the RTC now keeps time
+        self.assertTrue(rp2RTC.setRTC(2021, 1, 1, 0, 0, 0))
+        self.reference = rp2RTC.time() * 1000000 - self.sim.elapsed_us()
+        rp2RTC.syncEdge()
+        before = self.rtcError_us()
+        self.sim.advance(1000 * 1000000)
+        self.assertTrue(abs(self.rtcError_us() - before) < 100)
+
+    def test_trim_not_running(self):
+        self.install(46880)
+        self.drift.sample()
+        self.sim.advance(1000 * 1000000)
+        ppm = self.drift.sample()
+
+        # Nothing changes while the RTC is stopped
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertIs(self.drift.trim(), False)
+        self.assertEqual(rp2RTC.clockDivider(), 46875)
+        self.assertEqual(self.drift.ppm(), ppm)
+
+    def test_correction(self):
+        self.install(46870)
+        self.drift.reset()
+        self.drift.sample()
+        self.sim.advance(500 * 1000000)
+        self.assertAlmostEqual(self.drift.sample(), -106.667, delta=0.01)
+        self.sim.advance(500 * 1000000)
+
+        # The RTC is about 107 ms slow, which correction_us() cancels
+        rp2RTC.syncEdge()
+        error = self.rtcError_us()
+        self.assertTrue(error < -100000)
+        self.assertTrue(abs(error + self.drift.correction_us()) < 100)
+
+    def test_setClockDivider_invalid(self):
+        self.install(46875)
+        with self.assertRaises(ValueError):
+            rp2RTC.setClockDivider(0)
+        with self.assertRaises(ValueError):
+            rp2RTC.setClockDivider(65537)
+        with self.assertRaises(TypeError):
+            rp2RTC.setClockDivider(46875.0)
+        self.assertEqual(rp2RTC.clockDivider(), 46875)
+
+
+
+class rp2RTCAlarm_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        rp2RTCAlarm.clear()
+        self.fired = []
+
+    def tearDown(self):
+        rp2RTCAlarm.clear()
+        rp2RTC.setBackend(self.previous)
+
+    def callback(self, arg):
+        self.fired.append((arg, self.sim.now()[3:6]))
+
+    def step(self, seconds):
+        # Advance one second at a time, servicing the alarms as a timer would
+        for _ in range(seconds):
+            self.sim.advance(1000000)
+            rp2RTCAlarm.poll()
+
+    def test_order(self):
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 3, self.callback, 'c')
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 1, self.callback, 'a')
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 2, self.callback, 'b')
+        self.assertEqual(rp2RTCAlarm.pending(), 3)
+
+        # The match is programmed for the earliest alarm
+        self.assertEqual(self.sim[BASE + 0x14] & 0x3f, 1)
+        self.step(5)
+        self.assertEqual(self.fired, [('a', (0, 0, 1)), ('b', (0, 0, 2)),
+                                      ('c', (0, 0, 3))])
+        self.assertEqual(rp2RTCAlarm.pending(), 0)
+
+        # Disabled once no alarms are left
+        self.assertFalse(self.sim[BASE + 0x10] & 0x10000000)
+
+    def test_same_second(self):
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 2, self.callback, 'a')
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 2, self.callback, 'b')
+        self.step(2)
+        self.assertEqual([f[0] for f in self.fired], ['a', 'b'])
+
+    def test_no_poll_between_matches(self):
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 10, self.callback, 'a')
+        self.step(9)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+        self.step(1)
+        self.assertEqual(self.fired, [('a', (0, 0, 10))])
+
+    def test_past_due(self):
+        rp2RTCAlarm.at(2020, 12, 31, 23, 59, 59, self.callback, 'a')
+        self.assertEqual(self.fired, [('a', (0, 0, 0))])
+        self.assertEqual(rp2RTCAlarm.pending(), 0)
+
+    def test_missed_match(self):
+        # A match that was never seen is dispatched late by poll() or irq()
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 2, self.callback, 'a')
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 3, self.callback, 'b')
+        self.sim.advance(5000000)
+        self.assertTrue(rp2RTCAlarm.poll())
+        self.assertEqual(self.fired, [('a', (0, 0, 5)), ('b', (0, 0, 5))])
+        self.assertFalse(rp2RTCAlarm.poll())
+
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 7, self.callback, 'c')
+        self.sim.advance(3000000)
+        rp2RTCAlarm.irq()
+        self.assertEqual(self.fired[2], ('c', (0, 0, 8)))
+
+    def test_setRTC_past_alarm(self):
+        # setRTC() moves the clock past the alarm, so the match never fires
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 10, self.callback, 'a')
+        self.assertTrue(rp2RTC.setRTC(2021, 1, 1, 0, 1, 0))
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+        self.assertTrue(rp2RTCAlarm.poll())
+        self.assertEqual(self.fired, [('a', (0, 1, 0))])
+
+        # Not while the RTC is stopped
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 10, self.callback, 'b')
+        self.assertEqual(len(self.fired), 2)
+        rp2RTCAlarm.at(2021, 1, 1, 0, 1, 1, self.callback, 'c')
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        rp2RTCAlarm.irq()
+        self.assertEqual(len(self.fired), 2)
+
+    def test_cancel(self):
+        a = rp2RTCAlarm.at(2021, 1, 1, 0, 0, 1, self.callback, 'a')
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 2, self.callback, 'b')
+        self.assertTrue(rp2RTCAlarm.cancel(a))
+        self.assertFalse(rp2RTCAlarm.cancel(a))
+        self.assertEqual(rp2RTCAlarm.pending(), 1)
+
+        # The match is programmed for the next alarm
+        self.assertEqual(self.sim[BASE + 0x14] & 0x3f, 2)
+        self.step(1)
+        self.assertEqual(self.sim[BASE + 0x20], 0)
+        self.step(2)
+        self.assertEqual([f[0] for f in self.fired], ['b'])
+
+        # Cancelling the last alarm disables the match
+        c = rp2RTCAlarm.at(2021, 1, 1, 0, 0, 5, self.callback, 'c')
+        self.assertTrue(rp2RTCAlarm.cancel(c))
+        self.assertFalse(self.sim[BASE + 0x10] & 0x10000000)
+
+    def test_rearm_from_callback(self):
+        def again(arg):
+            self.callback(arg)
+            if arg < 3:
+                rp2RTCAlarm.at(2021, 1, 1, 0, 0, arg + 1, again, arg + 1)
+
+        rp2RTCAlarm.at(2021, 1, 1, 0, 0, 1, again, 1)
+        self.step(4)
+        self.assertEqual(self.fired, [(1, (0, 0, 1)), (2, (0, 0, 2)),
+                                      (3, (0, 0, 3))])
+
+    def test_day_rollover(self):
+        self.sim.setTime(2020, 2, 28, 23, 59, 59, 5)
+        rp2RTCAlarm.at(2020, 3, 1, 0, 0, 0, self.callback, 'b')
+        rp2RTCAlarm.at(2020, 2, 29, 0, 0, 0, self.callback, 'a')
+        self.step(1)
+        self.assertEqual([f[0] for f in self.fired], ['a'])
+        self.sim.advance(86399 * 1000000)
+        self.step(1)
+        self.assertEqual([f[0] for f in self.fired], ['a', 'b'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            rp2RTCAlarm.at(2021, 2, 29, 0, 0, 0, self.callback)
+        with self.assertRaises(TypeError):
+            rp2RTCAlarm.at(2021, 1, 1, 0, 0, 1.5, self.callback)
+        self.assertEqual(rp2RTCAlarm.pending(), 0)
+
+
+
+class rp2RTCTimezone_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_dst_start(self):
+        berlin = rp2RTCTimezone('CET-1CEST,M3.5.0,M10.5.0/3')
+        self.assertTrue(rp2RTC.setRTC(2021, 3, 28, 0, 59, 59))
+        self.assertEqual(rp2RTC.localtime(berlin), (2021, 3, 28, 1, 59, 59, 0))
+        self.assertEqual(berlin.tzname(), 'CET')
+
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(berlin), (2021, 3, 28, 3, 0, 0, 0))
+        self.assertEqual(berlin.utcoffset(), 7200)
+        self.assertTrue(berlin.isDST())
+        self.assertEqual(berlin.tzname(), 'CEST')
+
+    def test_dst_end(self):
+        berlin = rp2RTCTimezone('CET-1CEST,M3.5.0,M10.5.0/3')
+        self.assertTrue(rp2RTC.setRTC(2021, 10, 31, 0, 59, 59))
+        self.assertEqual(rp2RTC.localtime(berlin), (2021, 10, 31, 2, 59, 59, 0))
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(berlin), (2021, 10, 31, 2, 0, 0, 0))
+        self.assertFalse(berlin.isDST())
+
+    def test_southern_hemisphere(self):
+        sydney = rp2RTCTimezone('AEST-10AEDT,M10.1.0,M4.1.0/3')
+        self.assertTrue(rp2RTC.setRTC(2021, 12, 31, 13, 0, 0))
+        self.assertEqual(rp2RTC.localtime(sydney), (2022, 1, 1, 0, 0, 0, 6))
+        self.assertEqual(sydney.utcoffset(), 39600)
+
+        # 2022-04-03 03:00 AEDT
+        self.assertTrue(rp2RTC.setRTC(2022, 4, 2, 15, 59, 59))
+        self.assertEqual(rp2RTC.localtime(sydney), (2022, 4, 3, 2, 59, 59, 0))
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(sydney), (2022, 4, 3, 2, 0, 0, 0))
+        self.assertEqual(sydney.utcoffset(), 36000)
+
+    def test_default_rules(self):
+        newYork = rp2RTCTimezone('EST5EDT')
+        self.assertTrue(rp2RTC.setRTC(2021, 3, 14, 6, 59, 59))
+        self.assertEqual(rp2RTC.localtime(newYork), (2021, 3, 14, 1, 59, 59, 0))
+        self.sim.advance(1000000)
+        self.assertEqual(rp2RTC.localtime(newYork), (2021, 3, 14, 3, 0, 0, 0))
+
+    def test_no_dst(self):
+        india = rp2RTCTimezone('IST-5:30')
+        saoPaulo = rp2RTCTimezone('<-03>3')
+        self.assertTrue(rp2RTC.setRTC(2021, 12, 31, 20, 0, 0))
+        self.assertEqual(rp2RTC.localtime(india), (2022, 1, 1, 1, 30, 0, 6))
+        self.assertEqual(rp2RTC.localtime(saoPaulo), (2021, 12, 31, 17, 0, 0, 5))
+        self.assertEqual(saoPaulo.tzname(), '-03')
+        self.assertFalse(india.isDST())
+        self.assertEqual(india.transitions(), [])
+
+    def test_julian_rules(self):
+        # Day 60 is March 1st with J, and February 29th or March 1st without
+        julian = rp2RTCTimezone('AAA0BBB,J60/0,J300/0')
+        zero = rp2RTCTimezone('AAA0BBB,59/0,300/0')
+        self.assertEqual(julian.utcoffset(1583020800 - 1), 0)   # 2020-03-01
+        self.assertEqual(julian.utcoffset(1583020800), 3600)
+        self.assertEqual(zero.utcoffset(1582934400 - 1), 0)     # 2020-02-29
+        self.assertEqual(zero.utcoffset(1582934400), 3600)
+
+    def test_table_rebuild(self):
+        berlin = rp2RTCTimezone('CET-1CEST,M3.5.0,M10.5.0/3', 2021, 2022)
+        self.assertEqual(len(berlin.transitions()), 4)
+        self.assertTrue(rp2RTC.setRTC(2090, 7, 1, 0, 0, 0))
+        self.assertEqual(rp2RTC.localtime(berlin), (2090, 7, 1, 2, 0, 0, 6))
+        self.assertEqual(rp2RTC.localtime(berlin)[:3], (2090, 7, 1))
+
+    def test_utcoffset_at(self):
+        # Looking up another time does not replace the cached period
+        berlin = rp2RTCTimezone('CET-1CEST,M3.5.0,M10.5.0/3')
+        self.assertTrue(rp2RTC.setRTC(2021, 7, 1, 0, 0, 0))
+        self.assertEqual(berlin.utcoffset(), 7200)
+        self.assertEqual(berlin.utcoffset(1609459200), 3600)    # 2021-01-01
+        self.assertEqual(berlin.time(), rp2RTC.time() + 7200)
+
+        # No more register reads than rp2RTC.time()
+        reads = self.sim.reads
+        rp2RTC.time()
+        direct = self.sim.reads - reads
+        reads = self.sim.reads
+        berlin.localtime()
+        self.assertEqual(self.sim.reads - reads, direct)
+
+    def test_invalid(self):
+        for tz in ('', 'C', 'CET', 'CET-1CEST,M3.5.0', 'CET-1CEST,M13.5.0,M10.5.0',
+                   'CET-1CEST,M3.6.0,M10.5.0', '<CET-1', 'CET-25', 'CET-1x'):
+            with self.assertRaises(ValueError):
+                rp2RTCTimezone(tz)
+        with self.assertRaises(TypeError):
+            rp2RTCTimezone(1)
+
+
+
+class rp2RTCFormat_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_iso_8601(self):
+        iso = rp2RTCFormat()
+        self.assertEqual(iso.length(), 19)
+        self.assertTrue(rp2RTC.setRTC(2020, 2, 29, 23, 59, 58))
+        self.assertEqual(bytes(iso.render()), b'2020-02-29T23:59:58')
+        self.sim.advance(1000000)
+        self.assertEqual(iso.format(), '2020-02-29T23:59:59')
+        self.sim.advance(1000000)
+        self.assertEqual(iso.format(), '2020-03-01T00:00:00')
+
+        # A new time with the same date and minute
+        self.assertTrue(rp2RTC.setRTC(2020, 3, 1, 0, 0, 30))
+        self.assertEqual(iso.format(), '2020-03-01T00:00:30')
+        self.assertTrue(rp2RTC.setRTC(7, 1, 2, 3, 4, 5))
+        self.assertEqual(iso.format(), '0007-01-02T03:04:05')
+
+    def test_non_ascii(self):
+        fmt = rp2RTCFormat('%H:%M \u00b7 %d\u00b0')
+        self.assertEqual(fmt.length(), 13)
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 30, 0))
+        self.assertEqual(bytes(fmt.render()), '12:30 \u00b7 04\u00b0'.encode())
+        self.assertEqual(fmt.format(), '12:30 \u00b7 04\u00b0')
+
+    def test_strftime(self):
+        fmt = rp2RTCFormat('%a %d %b %y %H:%M:%S (%j, %w) 100%% %Y%m%dT%H%M%SZ')
+        self.assertTrue(rp2RTC.setRTC(2020, 12, 31, 9, 5, 7))
+        self.assertEqual(fmt.format(), 'Thu 31 Dec 20 09:05:07 (366, 4) 100% '
+                                       '20201231T090507Z')
+        self.assertTrue(rp2RTC.setRTC(2021, 3, 1, 0, 0, 0))
+        self.assertEqual(fmt.format(), 'Mon 01 Mar 21 00:00:00 (060, 1) 100% '
+                                       '20210301T000000Z')
+
+    def test_buffer(self):
+        # Renders into part of a log line, leaving the rest untouched
+        line = bytearray(b'[                   ] message')
+        iso = rp2RTCFormat(rp2RTCFormat.ISO_8601, memoryview(line)[1:20])
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+        iso.render()
+        self.assertEqual(bytes(line), b'[2021-06-04T12:00:01] message')
+
+        with self.assertRaises(ValueError):
+            rp2RTCFormat(rp2RTCFormat.ISO_8601, bytearray(18))
+
+    def test_not_running(self):
+        iso = rp2RTCFormat()
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(iso.render())
+        self.assertFalse(iso.format())
+
+    def test_invalid(self):
+        for fmt in ('%c', '%Y-%', '%A'):
+            with self.assertRaises(ValueError):
+                rp2RTCFormat(fmt)
+        with self.assertRaises(TypeError):
+            rp2RTCFormat(b'%Y')
+
+
+
+class rp2RTCParse_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        self.out = [0] * 6
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_iso_8601(self):
+        for text in (b'2021-06-04T12:00:01', b'2021-06-04 12:00:01.250Z',
+                     b'20210604T120001Z', b'20210604T120001,5'):
+            self.assertEqual(rp2RTCParse.parseISO8601(memoryview(text), self.out),
+                             rp2RTC.VALID)
+            self.assertEqual(self.out, [2021, 6, 4, 12, 0, 1])
+
+        # Part of a buffer
+        line = b'SET 2020-02-29T23:59:59\r\n'
+        self.assertEqual(rp2RTCParse.parseISO8601(line, self.out, 4, 23),
+                         rp2RTC.VALID)
+        self.assertEqual(self.out, [2020, 2, 29, 23, 59, 59])
+
+    def test_iso_8601_invalid(self):
+        for text in (b'', b'2021-06-04', b'2021-06-04X12:00:01',
+                     b'2021-06-04T12:00:1', b'2021-06-04T12:00:01+02:00',
+                     b'2021-06-04T12:00:01.', b'2021-06-04T12-00-01',
+                     b'2021-0a-04T12:00:01', b'20210604 1200015'):
+            self.assertEqual(rp2RTCParse.parseISO8601(text, self.out),
+                             rp2RTCParse.ERR_SYNTAX)
+        self.assertEqual(rp2RTCParse.parseISO8601(b'2021-02-29T00:00:00',
+                                                  self.out),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+        self.assertEqual(rp2RTCParse.parseISO8601(b'2021-06-04T24:00:00',
+                                                  self.out),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_HOUR)
+
+    def test_binary(self):
+        record = rp2RTCParse.pack(2021, 6, 4, 12, 0, 1)
+        self.assertEqual(len(record), rp2RTCParse.BINARY_SIZE)
+        self.assertEqual(record, bytes((0x04, 0x56, 0x7e, 0, 1, 0, 12, 0)))
+        self.assertEqual(rp2RTCParse.parseBinary(memoryview(record), self.out),
+                         rp2RTC.VALID)
+        self.assertEqual(self.out, [2021, 6, 4, 12, 0, 1])
+
+        # The day of the week is ignored, other unused bits are not
+        self.assertEqual(rp2RTCParse.parseBinary(record[:7] + b'\x05',
+                                                 self.out), rp2RTC.VALID)
+        self.assertEqual(rp2RTCParse.parseBinary(record[:7] + b'\x08',
+                                                 self.out),
+                         rp2RTCParse.ERR_SYNTAX)
+        self.assertEqual(rp2RTCParse.parseBinary(record[:7], self.out),
+                         rp2RTCParse.ERR_SYNTAX)
+        self.assertEqual(rp2RTCParse.parseBinary(
+            bytes((0x1f, 0x56, 0x7e, 0, 1, 0, 12, 0)), self.out),
+            rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+
+        with self.assertRaises(ValueError):
+            rp2RTCParse.pack(2021, 13, 4, 12, 0, 1)
+
+    def test_set(self):
+        self.assertTrue(rp2RTCParse.setISO8601(b'2020-02-29T23:59:59Z'))
+        self.assertEqual(rp2RTC.localtime(), (2020, 2, 29, 23, 59, 59, 6))
+        self.assertTrue(rp2RTCParse.setBinary(
+            rp2RTCParse.pack(2021, 6, 4, 12, 0, 1)))
+        self.assertEqual(rp2RTC.localtime(), (2021, 6, 4, 12, 0, 1, 5))
+
+        with self.assertRaises(ValueError):
+            rp2RTCParse.setISO8601(b'2020-02-29')
+        with self.assertRaises(ValueError):
+            rp2RTCParse.setISO8601(b'2021-02-29T23:59:59')
+        with self.assertRaises(ValueError):
+            rp2RTCParse.setBinary(b'\xff' * 8)
+        self.assertEqual(rp2RTC.localtime(), (2021, 6, 4, 12, 0, 1, 5))
+
+    def test_batch(self):
+        lines = (b'2020-01-01T00:00:00\r\n2021-02-29T00:00:00\n'
+                 b'2021-06-04T12:00:01\ngarbage\n\n')
+        self.assertEqual(rp2RTCParse.batchISO8601(lines), 2)
+        self.assertEqual(rp2RTC.localtime(), (2021, 6, 4, 12, 0, 1, 5))
+        self.assertEqual(rp2RTCParse.batchISO8601(b'garbage\n'), -1)
+        self.assertEqual(rp2RTC.localtime(), (2021, 6, 4, 12, 0, 1, 5))
+
+        records = (rp2RTCParse.pack(2020, 1, 1, 0, 0, 0) +
+                   rp2RTCParse.pack(2022, 1, 1, 0, 0, 0) +
+                   b'\xff' * 8 + b'\x00\x00')
+        self.assertEqual(rp2RTCParse.batchBinary(records), 1)
+        self.assertEqual(rp2RTC.localtime(), (2022, 1, 1, 0, 0, 0, 6))
+        self.assertEqual(rp2RTCParse.batchBinary(b'\xff' * 16), -1)
+
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertFalse(rp2RTCParse.batchBinary(records))
+
+
+
+class rp2RTCSim_Instrument(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim(accessTime_ns=1000)
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us,
+                                          self.sim.ticks_us)
+
+    def tearDown(self):
+        rp2RTC.instrument(False)
+        rp2RTC.setBackend(self.previous)
+
+    def test_disabled(self):
+        localtime = rp2RTC.localtime
+        rp2RTC.localtime()
+        self.assertEqual(rp2RTC.stats(), {})
+        rp2RTC.instrument()
+        self.assertIsNot(rp2RTC.localtime, localtime)
+        rp2RTC.instrument(False)
+        self.assertIs(rp2RTC.localtime, localtime)
+        self.assertEqual(rp2RTC.stats(), {})
+
+    def test_calls(self):
+        rp2RTC.instrument()
+        for _ in range(3):
+            rp2RTC.localtime()
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+
+        stats = rp2RTC.stats()
+        self.assertEqual(sorted(stats), ['localtime', 'setRTC'])
+        localtime = stats['localtime']
+        self.assertEqual(localtime['calls'], 3)
+        self.assertEqual(sum(localtime['histogram']), 3)
+        self.assertTrue(0 < localtime['max_us'] <= localtime['total_us'])
+        self.assertEqual(localtime['settle_us'], 0)
+
+        # 3 clk_rtc periods of about 21 us
+        setRTC = stats['setRTC']
+        self.assertEqual(setRTC['calls'], 1)
+        self.assertTrue(60 <= setRTC['settle_us'] <= setRTC['total_us'])
+        self.assertEqual(setRTC['lock_waits'], 0)
+
+        self.assertEqual(rp2RTC.stats(True)['localtime']['calls'], 3)
+        self.assertEqual(rp2RTC.stats(), {})
+
+    def test_localtime_into_unwrapped(self):
+        localtime_into = rp2RTC.localtime_into
+        rp2RTC.instrument()
+        self.assertIs(rp2RTC.localtime_into, localtime_into)
+        self.assertTrue(rp2RTC.localtime_into([0] * 7))
+        self.assertEqual(rp2RTC.stats(), {})
+
+    def test_syncRTC_settle(self):
+        rp2RTC.instrument()
+        rp2RTC.syncRTC(1622808000, 0, self.sim.ticks_us())
+
+        # Stopping and restarting the RTC takes a few clk_rtc periods
+        syncRTC = rp2RTC.stats()['syncRTC']
+        self.assertEqual(syncRTC['calls'], 1)
+        self.assertTrue(40 <= syncRTC['settle_us'] <= syncRTC['total_us'])
+
+    def test_useNative(self):
+        # Methods replaced by useNative() are wrapped again
+        rp2RTC.instrument()
+        rp2RTC.useNative(False)
+        rp2RTC.localtime()
+        rp2RTC.useNative()
+        rp2RTC.localtime()
+        self.assertEqual(rp2RTC.stats()['localtime']['calls'], 2)
+
+    def test_lock_wait(self):
+        rp2RTC.instrument()
+        lock = getattr(rp2RTC, '_rp2RTC__RTCAccessLock',
+                       getattr(rp2RTC, '__RTCAccessLock', None))
+        done = []
+
+        def writer():
+            done.append(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+
+        lock.acquire()
+        _thread.start_new_thread(writer, ())
+        sleep_ms(50)
+        lock.release()
+        while not done:
+            sleep_ms(1)
+
+        self.assertEqual(done, [True])
+        self.assertEqual(rp2RTC.stats()['setRTC']['lock_waits'], 1)
+
+
+
+class rp2RTCSim_Seqlock(unittest.TestCase):
+    def setUp(self):
+        # Every register access takes 1 us, so polling moves the clock
+        self.sim = rp2RTCSim(accessTime_ns=1000)
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        self.sequence = getattr(rp2RTC, '_rp2RTC__sequence',
+                                getattr(rp2RTC, '__sequence', None))
+        rp2RTC.readRetries(True)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_sequence(self):
+        start = self.sequence[0]
+        self.assertEqual(start & 1, 0)
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+        self.assertEqual(self.sequence[0], start + 2)
+        self.assertTrue(rp2RTC.setRTC_nowait(2021, 6, 4, 12, 0, 2).wait())
+        self.assertEqual(self.sequence[0], start + 6)
+        self.assertTrue(rp2RTC.setClockDivider(rp2RTC.clockDivider()))
+        self.assertEqual(self.sequence[0], start + 8)
+        self.assertEqual(rp2RTC.readRetries(), 0)
+
+    def test_write_in_progress(self):
+        # A reader gives up waiting for a write that never finishes
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+        from array import array
+
+        buf = array('H', [0] * 7)
+        self.sequence[0] += 1
+        try:
+            self.assertEqual(rp2RTC.localtime(), (2021, 6, 4, 12, 0, 1, 5))
+            self.assertTrue(rp2RTC.localtime_into(buf))
+            self.assertEqual(rp2RTC.time(), 1622808001)
+            self.assertEqual(rp2RTC.raw_now(),
+                             rp2RTC.raw_pack(2021, 6, 4, 12, 0, 1))
+        finally:
+            self.sequence[0] += 1
+        self.assertEqual(tuple(buf), (2021, 6, 4, 12, 0, 1, 5))
+        self.assertEqual(rp2RTC.readRetries(), 4000)
+
+    def test_readRegisters(self):
+        from array import array
+
+        self.assertTrue(rp2RTC.setRTC(2021, 6, 4, 12, 0, 1))
+        self.assertEqual(rp2RTC.readRegisters(), (0x7e5604, 0x050c0001))
+        words = array('I', [0] * 4)
+        self.assertEqual(rp2RTC.readRegisters(words, 2), None)
+        self.assertEqual(list(words), [0, 0, 0x7e5604, 0x050c0001])
+
+        self.sequence[0] += 1
+        try:
+            self.assertEqual(rp2RTC.readRegisters(), (0x7e5604, 0x050c0001))
+        finally:
+            self.sequence[0] += 1
+        self.assertEqual(rp2RTC.readRetries(), 1000)
+
+    def test_concurrent_writer(self):
+        times = ((2021, 6, 4, 12, 0, 0), (2030, 1, 1, 23, 0, 0))
+        state = [False, 0]
+
+        def writer():
+            while not state[0]:
+                rp2RTC.setRTC(*times[state[1] & 1])
+                state[1] += 1
+            state[0] = False
+
+        self.assertTrue(rp2RTC.setRTC(*times[0]))
+        _thread.start_new_thread(writer, ())
+        try:
+            while state[1] < 200:
+                t = rp2RTC.localtime()
+                self.assertTrue(t[0:4] == times[0][0:4] or
+                                t[0:4] == times[1][0:4])
+        finally:
+            state[0] = True
+            while state[0]:
+                sleep_ms(1)
+
+
+
+class _Loopback:
+    # Stream between an rp2RTCSync and an rp2RTCSyncHost: bytes written by
+    # the host are fed to the device, and its responses are read back
+    def __init__(self):
+        self.device = rp2RTCSync(self)
+        self.responses = bytearray()
+
+    def write(self, data):
+        # The device writes memoryviews of its buffer, the host bytearrays
+        if isinstance(data, memoryview):
+            self.responses.extend(data)
+        else:
+            self.device.feed(data)
+        return len(data)
+
+    def read(self, length):
+        data = bytes(self.responses[:length])
+        self.responses[:length] = b''
+        return data
+
+
+class rp2RTCSync_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        self.sim.setTime(2021, 6, 4, 12, 0, 0, 5)
+        self.stream = _Loopback()
+        self.device = self.stream.device
+        self.host = rp2RTCSyncHost(self.stream)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_crc(self):
+        # CRC-8/SMBUS check value
+        self.assertEqual(rp2RTCSync.crc(b'123456789'), 0xf4)
+        frame = rp2RTCSync.frame(rp2RTCSync.PING, 7, b'ab')
+        self.assertEqual(len(frame), 2 + rp2RTCSync.OVERHEAD)
+        self.assertEqual(frame[0:4], bytearray((0xa5, 0x03, 7, 2)))
+        self.assertEqual(rp2RTCSync.crc(frame, 1), 0)
+        self.assertRaises(ValueError, rp2RTCSync.frame, rp2RTCSync.PING, 0,
+                          bytes(rp2RTCSync.MAX_PAYLOAD + 1))
+
+    def test_ping(self):
+        self.assertTrue(self.host.ping(b'\xa5\x00hello') >= 0)
+        self.assertTrue(self.host.ping() >= 0)
+        self.assertTrue(self.host.ping(bytes(range(32))) >= 0)
+        self.assertEqual(self.device.frames, 3)
+
+    def test_query(self):
+        self.assertEqual(self.host.query(), (2021, 6, 4, 12, 0, 0, 5))
+        self.sim.advance(61000000)
+        self.assertEqual(self.host.query(), (2021, 6, 4, 12, 1, 1, 5))
+
+    def test_set(self):
+        self.assertEqual(self.host.setTime(2030, 1, 1, 23, 0, 0),
+                         rp2RTCSync.STATUS_OK)
+        self.assertEqual(rp2RTC.localtime(), (2030, 1, 1, 23, 0, 0, 2))
+        self.assertEqual(self.host.query(), (2030, 1, 1, 23, 0, 0, 2))
+
+    def test_set_invalid(self):
+        record = bytearray(rp2RTCParse.pack(2021, 6, 4, 12, 0, 0))
+        record[0] = 31
+        self.assertEqual(self.host.request(rp2RTCSync.SET, record),
+                         bytes((rp2RTCSync.STATUS_INVALID,)))
+        self.assertEqual(rp2RTC.localtime()[0:3], (2021, 6, 4))
+
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertEqual(self.host.setTime(2030, 1, 1, 23, 0, 0),
+                         rp2RTCSync.STATUS_NOT_RUNNING)
+
+    def test_byte_at_a_time(self):
+        frame = rp2RTCSync.frame(rp2RTCSync.QUERY, 9, b'')
+        for i in range(len(frame)):
+            self.assertEqual(self.device.feed(frame[i:i + 1]),
+                             1 if i == len(frame) - 1 else 0)
+        self.assertEqual(self.stream.responses[1:4], bytearray((0x82, 9, 8)))
+
+    def test_resync(self):
+        bad = rp2RTCSync.frame(rp2RTCSync.PING, 1, b'xy')
+        bad[-1] ^= 0xff
+        long = bytes((0xa5, rp2RTCSync.PING, 2, rp2RTCSync.MAX_PAYLOAD + 1))
+        unknown = rp2RTCSync.frame(0x7f, 3, b'')
+        malformed = rp2RTCSync.frame(rp2RTCSync.QUERY, 4, b'z')
+        good = rp2RTCSync.frame(rp2RTCSync.PING, 5, b'ok')
+
+        data = b'\x00\x01' + bad + long + unknown + malformed + good
+        self.assertEqual(self.device.feed(data), 1)
+        self.assertEqual(self.device.errors, 4)
+        self.assertEqual(bytes(self.stream.responses), bytes(
+            rp2RTCSync.frame(rp2RTCSync.PING | rp2RTCSync.RESPONSE, 5,
+                             b'ok')))
+
+    def test_resync_inside_dropped_frame(self):
+        # A frame whose length byte was lost runs on into the next frame: the
+        # next frame must be found again among the dropped bytes
+        good = rp2RTCSync.frame(rp2RTCSync.PING, 6, b'ok')
+        truncated = bytes((0xa5, rp2RTCSync.PING, 1, 3))
+        self.assertEqual(self.device.feed(truncated + good), 1)
+        self.assertEqual(self.device.errors, 1)
+        self.assertEqual(bytes(self.stream.responses), bytes(
+            rp2RTCSync.frame(rp2RTCSync.PING | rp2RTCSync.RESPONSE, 6,
+                             b'ok')))
+
+        # The same, a byte at a time, with a SOF inside a second dropped frame
+        self.stream.responses[:] = b''
+        data = truncated + bytes((0xa5, rp2RTCSync.PING, 2, 4)) + good
+        answered = 0
+        for i in range(len(data)):
+            answered += self.device.feed(data[i:i + 1])
+        self.assertEqual(answered, 1)
+        self.assertEqual(self.device.errors, 3)
+        self.assertEqual(bytes(self.stream.responses), bytes(
+            rp2RTCSync.frame(rp2RTCSync.PING | rp2RTCSync.RESPONSE, 6,
+                             b'ok')))
+
+    def test_host_resync(self):
+        # The host searches a dropped response again for a SOF
+        good = rp2RTCSync.frame(rp2RTCSync.PING | rp2RTCSync.RESPONSE, 0,
+                                b'ok')
+
+        class Stream:
+            def __init__(self):
+                self.data = bytes((0xa5, 0x83, 0, 3)) + good
+
+            def write(self, data):
+                return len(data)
+
+            def read(self, length):
+                data = self.data[:length]
+                self.data = self.data[length:]
+                return data
+
+        self.assertEqual(rp2RTCSyncHost(Stream()).request(rp2RTCSync.PING,
+                                                          b'ok'), b'ok')
+
+    def test_query_not_running(self):
+        self.sim[BASE + rp2RTCSim.ATOMIC_CLR + 0x0c] = 0x1
+        self.sim.advance(100)
+        self.assertEqual(self.host.request(rp2RTCSync.QUERY),
+                         bytes((rp2RTCSync.STATUS_NOT_RUNNING,)))
+        self.assertRaises(OSError, self.host.query)
+
+    def test_query_write_in_progress(self):
+        # A query while setRTC() is writing the registers waits for the write
+        sequence = getattr(rp2RTC, '_rp2RTC__sequence',
+                           getattr(rp2RTC, '__sequence', None))
+        retries = rp2RTC.readRetries()
+        sequence[0] += 1
+        try:
+            self.assertEqual(self.host.query(), (2021, 6, 4, 12, 0, 0, 5))
+        finally:
+            sequence[0] += 1
+        self.assertTrue(rp2RTC.readRetries() > retries)
+
+    def test_poll(self):
+        class Stream:
+            def __init__(self, data):
+                self.data = data
+                self.written = bytearray()
+
+            def readinto(self, buf):
+                length = min(len(buf), len(self.data))
+                buf[0:length] = self.data[0:length]
+                self.data = self.data[length:]
+                return length
+
+            def write(self, data):
+                self.written.extend(data)
+
+        stream = Stream(rp2RTCSync.frame(rp2RTCSync.QUERY, 1, b'') * 2)
+        device = rp2RTCSync(stream)
+        self.assertEqual(device.poll(), 2)
+        self.assertEqual(device.poll(), 0)
+        self.assertEqual(len(stream.written), 2 * (8 + rp2RTCSync.OVERHEAD))
+
+
+
+class rp2RTCRing_Sim(unittest.TestCase):
+    def setUp(self):
+        self.sim = rp2RTCSim()
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        self.sim.setTime(2021, 6, 4, 23, 59, 58, 5)
+
+    def tearDown(self):
+        rp2RTC.setBackend(self.previous)
+
+    def test_append(self):
+        ring = rp2RTCRing(4)
+        self.assertEqual(len(ring), 0)
+        self.assertEqual(list(ring), [])
+        ring.append()
+        self.sim.advance(1000000)
+        ring.append()
+        self.sim.advance(1000000)
+        ring.append()
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(list(ring), [(2021, 6, 4, 23, 59, 58, 5),
+                                      (2021, 6, 4, 23, 59, 59, 5),
+                                      (2021, 6, 5, 0, 0, 0, 6)])
+        self.assertEqual(ring[-1], rp2RTC.localtime())
+        self.assertEqual(ring.raw(0), (0x7e5604, 0x05173b3a))
+        self.assertRaises(IndexError, ring.__getitem__, 3)
+        self.assertRaises(IndexError, ring.__getitem__, -4)
+
+    def test_wraparound(self):
+        ring = rp2RTCRing(3)
+        for second in range(7):
+            ring.append_raw(0x7e5604, second)
+        self.assertEqual(len(ring), 3)
+        self.assertEqual([t[5] for t in ring], [4, 5, 6])
+        self.assertEqual(ring[0][0:3], (2021, 6, 4))
+        self.assertEqual(ring.raw(-1), (0x7e5604, 6))
+        ring.clear()
+        self.assertEqual(list(ring), [])
+
+    def test_tobytes(self):
+        ring = rp2RTCRing(3)
+        self.assertEqual(ring.tobytes(), b'')
+        for second in range(5):
+            ring.append_raw(0x7e5604, second)
+        data = ring.tobytes()
+        self.assertEqual(len(data), 3 * rp2RTCRing.RECORD_SIZE)
+        records = [(int.from_bytes(data[i:i + 4], 'little'),
+                    int.from_bytes(data[i + 4:i + 8], 'little'))
+                   for i in range(0, len(data), 8)]
+        self.assertEqual(records, [ring.raw(i) for i in range(3)])
+
+        buf = bytearray(32)
+        self.assertEqual(ring.export_into(buf), 24)
+        self.assertEqual(bytes(buf[0:24]), data)
+        self.assertRaises(ValueError, ring.export_into, bytearray(16))
+
+        # Not wrapped around
+        ring.clear()
+        ring.append_raw(1, 2)
+        self.assertEqual(ring.tobytes(), b'\x01\0\0\0\x02\0\0\0')
+
+    def test_export_into_memoryview(self):
+        ring = rp2RTCRing(3)
+        ring.append_raw(1, 2)
+        ring.append_raw(3, 4)
+        buf = bytearray(b'\xff' * 40)
+        self.assertEqual(ring.export_into(memoryview(buf)[8:]), 16)
+        self.assertEqual(bytes(buf[8:24]), ring.tobytes())
+        self.assertEqual(bytes(buf[0:8]) + bytes(buf[24:]), b'\xff' * 24)
+
+        # Wrapped around, so copied in two parts
+        for second in range(5, 9):
+            ring.append_raw(0x7e5604, second)
+        self.assertEqual(ring.export_into(memoryview(buf)[8:]), 24)
+        self.assertEqual(
+            bytes(buf[8:32]),
+            b''.join((0x7e5604).to_bytes(4, 'little') +
+                     second.to_bytes(4, 'little') for second in (6, 7, 8)))
+        self.assertEqual(bytes(buf[32:]), b'\xff' * 8)
+
+    def test_invalid(self):
+        self.assertRaises(TypeError, rp2RTCRing, 1.5)
+        self.assertRaises(ValueError, rp2RTCRing, 0)
+
+    def test_write_in_progress(self):
+        # append() gives up waiting for a write that never finishes
+        sequence = getattr(rp2RTC, '_rp2RTC__sequence',
+                           getattr(rp2RTC, '__sequence', None))
+        ring = rp2RTCRing(2)
+        rp2RTC.readRetries(True)
+        sequence[0] += 1
+        try:
+            ring.append()
+        finally:
+            sequence[0] += 1
+        self.assertEqual(ring[0], (2021, 6, 4, 23, 59, 58, 5))
+        # Re-reads are counted, as for localtime()
+        self.assertEqual(rp2RTC.readRetries(), 1000)
+
+
+
+class rp2RTCSim_TornReads(unittest.TestCase):
+    def setUp(self):
+        # Every register access takes 30us, longer than a clk_rtc period, and
+        # RTC_1 is not latched, so the date can change between RTC_0 and RTC_1
+        self.sim = rp2RTCSim(accessTime_ns=30000, latchRTC1=False)
+        self.previous = rp2RTC.setBackend(self.sim, self.sim.sleep_us)
+        rp2RTC.readRetries(reset=True)
+
+    def tearDown(self):
+        rp2RTC.consistentReads(False)
+        rp2RTC.setBackend(self.previous)
+
+    def atMidnight(self):
+        # Reads of CTRL and RTC_0 happen before midnight, RTC_1 after it
+        self.sim.setTime(2020, 12, 31, 23, 59, 59, 4)
+        self.sim.advance(1000000 - 75)
+
+    def test_torn_read(self):
+        self.atMidnight()
+        self.assertEqual(rp2RTC.localtime(), (2021, 1, 1, 23, 59, 59, 4))
+        self.assertEqual(rp2RTC.readRetries(), 0)
+
+    def test_consistent_localtime(self):
+        rp2RTC.consistentReads()
+        self.atMidnight()
+        self.assertEqual(rp2RTC.localtime(), (2021, 1, 1, 0, 0, 0, 5))
+        self.assertEqual(rp2RTC.readRetries(reset=True), 1)
+        self.assertEqual(rp2RTC.readRetries(), 0)
+
+    def test_consistent_localtime_into(self):
+        buf = [0] * 7
+        rp2RTC.consistentReads()
+        self.atMidnight()
+        self.assertTrue(rp2RTC.localtime_into(buf))
+        self.assertEqual(buf, [2021, 1, 1, 0, 0, 0, 5])
+
+    def test_consistent_time(self):
+        rp2RTC.consistentReads()
+        self.atMidnight()
+        self.assertEqual(rp2RTC.time(), 1609459200)
+
+
+
+
+class rp2RTC_Validation(unittest.TestCase):
+    VALID = (2020, 2, 29, 23, 59, 59)
+
+    def replaced(self, field, value):
+        values = list(self.VALID)
+        values[field] = value
+        return values
+
+    def test_valid(self):
+        self.assertEqual(rp2RTC.validate_code(*self.VALID), rp2RTC.VALID)
+        self.assertEqual(rp2RTC.validate_code(0, 1, 1, 0, 0, 0), rp2RTC.VALID)
+        self.assertEqual(rp2RTC.validate_code(4095, 12, 31, 0, 0, 0), rp2RTC.VALID)
+        self.assertIsNone(rp2RTC.validationMessage(rp2RTC.VALID, *self.VALID))
+
+    def test_type_errors(self):
+        names = ('year', 'month', 'day', 'hour', 'minute', 'second')
+        for field in range(6):
+            values = self.replaced(field, 1.0)
+            code = rp2RTC.validate_code(*values)
+            self.assertEqual(code, rp2RTC.ERR_TYPE | field)
+            self.assertEqual(rp2RTC.validationMessage(code, *values),
+                             'Parameter ' + names[field] +
+                             ' received parameter of type ' +
+                             str(type(1.0)) +
+                             ' - expected parameter of type \'int\'.')
+
+        # The first field in error is reported
+        self.assertEqual(rp2RTC.validate_code(2020, '2', 0, 1.5, 0, 0),
+                         rp2RTC.ERR_TYPE | rp2RTC.FIELD_MONTH)
+
+    def test_value_errors(self):
+        names = ('year', 'month', 'day', 'hour', 'minute', 'second')
+        limits = ((0, 4095), (1, 12), (1, 29), (0, 23), (0, 59), (0, 59))
+        for field in range(6):
+            (low, high) = limits[field]
+            for value in (low - 1, high + 1):
+                values = self.replaced(field, value)
+                code = rp2RTC.validate_code(*values)
+                self.assertEqual(code, rp2RTC.ERR_VALUE | field)
+
+                message = ('Parameter \'' + names[field] +
+                           '\' received value of ' + str(value) +
+                           ' - must supply an integer from ' + str(low) +
+                           ' to ' + str(high) + ' inclusive')
+                if field == rp2RTC.FIELD_DAY:
+                    message += ' for month 2'
+                self.assertEqual(rp2RTC.validationMessage(code, *values),
+                                 message)
+
+    def test_day_errors(self):
+        self.assertEqual(rp2RTC.validate_code(2021, 2, 29, 0, 0, 0),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+        self.assertEqual(rp2RTC.validate_code(1900, 2, 29, 0, 0, 0),
+                         rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+        self.assertEqual(rp2RTC.validate_code(2000, 2, 29, 0, 0, 0),
+                         rp2RTC.VALID)
+        code = rp2RTC.validate_code(2021, 4, 31, 0, 0, 0)
+        self.assertEqual(code, rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY)
+        self.assertEqual(rp2RTC.validationMessage(code, 2021, 4, 31, 0, 0, 0),
+                         'Parameter \'day\' received value of 31 - must ' +
+                         'supply an integer from 1 to 30 inclusive for month 4')
+        self.assertEqual(rp2RTC.validationMessage(
+                             rp2RTC.ERR_VALUE | rp2RTC.FIELD_DAY,
+                             2021, 2, 29, 0, 0, 0),
+                         'Parameter \'day\' received value of 29 - must ' +
+                         'supply an integer from 1 to 28 inclusive for month 2')
+
+    def test_raised_messages(self):
+        # __validDateTime(), validate(), rp2RTCAlarm.at() and
+        # rp2RTCParse.pack() raise the exception and message of
+        # validationMessage()
+        validDateTime = getattr(rp2RTC, '_rp2RTC__validDateTime',
+                                getattr(rp2RTC, '__validDateTime', None))
+
+        def at(*values):
+            rp2RTCAlarm.at(*(values + (print,)))
+
+        for validator in (validDateTime, rp2RTC.validate, at,
+                          rp2RTCParse.pack):
+            for values in ((2021, 2, 29, 0, 0, 0), (2020, 1, 1, 0, 60, 0),
+                           (2020, 1, 1, 0, 0, None)):
+                code = rp2RTC.validate_code(*values)
+                message = rp2RTC.validationMessage(code, *values)
+                error = TypeError if code & rp2RTC.ERR_TYPE else ValueError
+                try:
+                    validator(*values)
+                except error as e:
+                    self.assertEqual(str(e), message)
+                else:
+                    self.fail('no exception for ' + repr(values))
+        self.assertTrue(rp2RTC.validate(2020, 2, 29, 23, 59, 59))
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import datetime
+except ImportError:
+    datetime = None
+
+
+class rp2RTC_Civil(unittest.TestCase):
+    def test_year_zero(self):
+        # Year 0 is a leap year, and 400 years (146097 days) before year 400
+        self.assertEqual(rp2RTC.daysFromCivil(0, 1, 1), -719528)
+        self.assertEqual(rp2RTC.daysFromCivil(0, 3, 1) -
+                         rp2RTC.daysFromCivil(0, 2, 28), 2)
+        for month in range(1, 13):
+            self.assertEqual(rp2RTC.daysFromCivil(400, month, 15) -
+                             rp2RTC.daysFromCivil(0, month, 15), 146097)
+        self.assertEqual(rp2RTC.civilFromDays(-719528), (0, 1, 1))
+        self.assertEqual(rp2RTC.gmtime(-62167219200), (0, 1, 1, 0, 0, 0, 6))
+
+    def test_gmtime(self):
+        self.assertEqual(rp2RTC.gmtime(0), (1970, 1, 1, 0, 0, 0, 4))
+        self.assertEqual(rp2RTC.gmtime(1622808001), (2021, 6, 4, 12, 0, 1, 5))
+        self.assertEqual(rp2RTC.gmtime(-1), (1969, 12, 31, 23, 59, 59, 3))
+        self.assertEqual(rp2RTC.gmtime(0, rp2RTC.EPOCH_MICROPYTHON),
+                         (2000, 1, 1, 0, 0, 0, 6))
+        self.assertEqual(rp2RTC.gmtime(rp2RTC.mktime((4095, 12, 31, 23, 59, 59))),
+                         (4095, 12, 31, 23, 59, 59, 6))
+        self.assertRaises(ValueError, rp2RTC.gmtime, -62167219201)
+        self.assertRaises(ValueError, rp2RTC.gmtime, 67090118400)
+        self.assertRaises(TypeError, rp2RTC.gmtime, 1.5)
+
+    def test_mktime(self):
+        self.assertEqual(rp2RTC.mktime((2021, 6, 4, 12, 0, 1)), 1622808001)
+        self.assertEqual(rp2RTC.mktime((2021, 6, 4, 12, 0, 1, 5)), 1622808001)
+        self.assertEqual(rp2RTC.mktime((2021, 6, 4, 12, 0, 1),
+                                       rp2RTC.EPOCH_MICROPYTHON), 676123201)
+        self.assertEqual(rp2RTC.mktime((4095, 12, 31, 23, 59, 59)),
+                         67090118399)
+        self.assertRaises(ValueError, rp2RTC.mktime, (2021, 2, 29, 0, 0, 0))
+        self.assertRaises(TypeError, rp2RTC.mktime, (2021, 2, 1.5, 0, 0, 0))
+
+    def test_add_diff_seconds(self):
+        t = (2020, 2, 28, 23, 59, 59)
+        self.assertEqual(rp2RTC.add_seconds(t, 1), (2020, 2, 29, 0, 0, 0, 6))
+        self.assertEqual(rp2RTC.add_seconds(t, 86401),
+                         (2020, 3, 1, 0, 0, 0, 0))
+        self.assertEqual(rp2RTC.add_seconds(t, -86400 * 366),
+                         (2019, 2, 27, 23, 59, 59, 3))
+        self.assertEqual(rp2RTC.diff_seconds((2020, 3, 1, 0, 0, 0), t), 86401)
+        self.assertEqual(rp2RTC.diff_seconds(t, (2020, 3, 1, 0, 0, 0)), -86401)
+        self.assertRaises(ValueError, rp2RTC.add_seconds,
+                          (4095, 12, 31, 23, 59, 59), 1)
+
+    @unittest.skipUnless(datetime is not None, 'datetime is not availible')
+    def test_days_datetime(self):
+        # Every day of the years 1 - 4095 (datetime starts at year 1)
+        unixDay = datetime.date(1970, 1, 1).toordinal()
+        for year in range(1, 4096):
+            first = datetime.date(year, 1, 1).toordinal()
+            days = range(first - unixDay,
+                         datetime.date(year, 12, 31).toordinal() + 1 - unixDay)
+            dates = [datetime.date.fromordinal(day + unixDay).timetuple()[0:3]
+                     for day in days]
+            self.assertEqual([rp2RTC.daysFromCivil(*t) for t in dates],
+                             list(days))
+            self.assertEqual([rp2RTC.civilFromDays(day) for day in days],
+                             dates)
+
+    @unittest.skipUnless(datetime is not None, 'datetime is not availible')
+    def test_gmtime_datetime(self):
+        epoch = datetime.datetime(1970, 1, 1)
+        second = datetime.timedelta(seconds=1)
+        start = rp2RTC.mktime((1, 1, 1, 0, 0, 0))
+        end = rp2RTC.mktime((4095, 12, 31, 23, 59, 59)) - 12345678
+        for t in range(start, end + 1, 827390 * 7 + 1):
+            d = epoch + t * second
+            expected = (d.year, d.month, d.day, d.hour, d.minute, d.second,
+                        (d.weekday() + 1) % 7)
+            self.assertEqual(rp2RTC.gmtime(t), expected)
+            self.assertEqual(rp2RTC.mktime(expected), t)
+            self.assertEqual(rp2RTC.add_seconds(expected, 12345678),
+                             rp2RTC.gmtime(t + 12345678))
+            self.assertEqual(rp2RTC.diff_seconds(expected, (1, 1, 1, 0, 0, 0)),
+                             t - start)
+
+    def test_calendar_full_range(self):
+        # Every day the RTC can hold, against gmtime()
+        count = 0
+        check = rp2RTC.mktime((0, 1, 1, 0, 0, 0))
+        for date in rp2RTC.calendar((0, 1, 1)):
+            if count % 997 == 0:
+                t = rp2RTC.gmtime(check + count * 86400)
+                self.assertEqual(date, t[0:3] + t[6:7])
+            count += 1
+        self.assertEqual(count, rp2RTC.daysFromCivil(4095, 12, 31) -
+                         rp2RTC.daysFromCivil(0, 1, 1) + 1)
+        self.assertEqual(date, (4095, 12, 31, 6))
+
+    def test_calendar_steps(self):
+        start = rp2RTC.daysFromCivil(1999, 12, 25)
+        for step in (1, 6, 7, 31, 366, 1000):
+            dates = list(rp2RTC.calendar((1999, 12, 25), (2030, 3, 1), step))
+            expected = []
+            for days in range(start, rp2RTC.daysFromCivil(2030, 3, 1) + 1,
+                              step):
+                t = rp2RTC.gmtime(days * 86400)
+                expected.append(t[0:3] + t[6:7])
+            self.assertEqual(dates, expected)
+
+    def test_calendar_months(self):
+        self.assertEqual(list(rp2RTC.calendar((2020, 1, 31), (2020, 6, 30),
+                                              months=True)),
+                         [(2020, 1, 31, 5), (2020, 2, 29, 6),
+                          (2020, 3, 31, 2), (2020, 4, 30, 4),
+                          (2020, 5, 31, 0), (2020, 6, 30, 2)])
+        for (day, step) in ((1, 1), (29, 5), (31, 12), (30, 25)):
+            dates = list(rp2RTC.calendar((1, 1, day), step=step, months=True))
+            self.assertEqual(len(dates), (4095 * 12 - 1) // step + 1)
+            for (year, month, date, dotw) in dates[::37]:
+                self.assertEqual(date, min(day, rp2RTC.daysFromCivil(
+                    year + month // 12, month % 12 + 1, 1) -
+                    rp2RTC.daysFromCivil(year, month, 1)))
+                self.assertEqual(dotw, rp2RTC.weekDay(year, month, date))
+
+    def test_calendar_invalid(self):
+        self.assertEqual(list(rp2RTC.calendar((2021, 6, 4), (2021, 6, 3))),
+                         [])
+        self.assertEqual(list(rp2RTC.calendar((2021, 6, 4), (2021, 6, 4))),
+                         [(2021, 6, 4, 5)])
+        self.assertRaises(ValueError, rp2RTC.calendar, (2021, 2, 29))
+        self.assertRaises(ValueError, rp2RTC.calendar, (2021, 1, 1),
+                          (4096, 1, 1))
+        self.assertRaises(ValueError, rp2RTC.calendar, (2021, 1, 1), step=0)
+        self.assertRaises(TypeError, rp2RTC.calendar, (2021, 1, 1), step=1.5)
+
+
+
+class rp2RTC_Bulk(unittest.TestCase):
+    def dates(self):
+        years = []
+        months = []
+        days = []
+        for year in range(0, 4096, 7):
+            for month in range(1, 13):
+                for day in (1, 13, 28, 29, 30, 31):
+                    years.append(year)
+                    months.append(month)
+                    days.append(day)
+        return (years, months, days)
+
+    def test_weekDay_many(self):
+        (years, months, days) = self.dates()
+        expected = [rp2RTC.weekDay(y, m, d) for (y, m, d) in zip(years, months, days)]
+        self.assertEqual(list(rp2RTC.weekDay_many(years, months, days)), expected)
+
+        rp2RTC.useWeekdayTable()
+        try:
+            self.assertEqual(list(rp2RTC.weekDay_many(years, months, days)), expected)
+        finally:
+            rp2RTC.useWeekdayTable(False)
+
+    @unittest.skipUnless(numpy is not None, 'NumPy is not availible')
+    def test_weekDay_many_numpy(self):
+        (years, months, days) = self.dates()
+        expected = [rp2RTC.weekDay(y, m, d) for (y, m, d) in zip(years, months, days)]
+        result = rp2RTC.weekDay_many(numpy.array(years), numpy.array(months), numpy.array(days))
+        self.assertEqual(result.tolist(), expected)
+
+    @unittest.skipUnless(numpy is not None, 'NumPy is not availible')
+    def test_weekDay_many_numpy_dtypes(self):
+        ones = numpy.ones(3, dtype=numpy.uint8)
+        years = numpy.array([2024, 2024, 2024], dtype=numpy.int16)
+        self.assertEqual(rp2RTC.weekDay_many(years, ones, ones).tolist(),
+                         [1] * 3)
+
+        # Other dtypes are rejected rather than truncated (2024.9 to 2024)
+        for values in (numpy.array([2024.9] * 3), numpy.ones(3, dtype=bool),
+                       numpy.array([2024] * 3, dtype=object)):
+            self.assertRaises(TypeError, rp2RTC.weekDay_many, values, ones,
+                              ones)
+            self.assertRaises(TypeError, rp2RTC.weekDay_many, years, values,
+                              ones)
+        self.assertRaises(TypeError, rp2RTC.weekDay_many, years, ones,
+                          [1.5, 1, 1])
+
+    @unittest.skipUnless(numpy is not None, 'NumPy is not availible')
+    def test_validate_many_numpy(self):
+        (years, months, days) = self.dates()
+        years = years + [-1, 4096, 2020, 2020, 2020, 2020]
+        months = months + [1, 1, 0, 13, 1, 1]
+        days = days + [1, 1, 1, 1, 1, 1]
+        hours = [0] * (len(years) - 2) + [24, 0]
+        minutes = [59] * (len(years) - 1) + [60]
+        seconds = [0] * len(years)
+
+        # Each entry as the scalar __validDateTime() judges it
+        validDateTime = getattr(rp2RTC, '_rp2RTC__validDateTime',
+                                getattr(rp2RTC, '__validDateTime', None))
+        expected = []
+        for values in zip(years, months, days, hours, minutes, seconds):
+            try:
+                expected.append(int(validDateTime(*values)))
+            except (TypeError, ValueError):
+                expected.append(0)
+
+        result = rp2RTC.validate_many(numpy.array(years), numpy.array(months),
+                                      numpy.array(days), numpy.array(hours),
+                                      numpy.array(minutes), numpy.array(seconds))
+        self.assertEqual([int(v) for v in result], expected)
+        self.assertEqual(expected[-6:], [0] * 6)
+        self.assertTrue(sum(expected) > 0)
+
+    @unittest.skipUnless(numpy is not None, 'NumPy is not availible')
+    def test_validate_many_numpy_dtypes(self):
+        ones = numpy.ones(3, dtype=numpy.int16)
+        years = numpy.array([2020, 2021, 2022], dtype=numpy.uint16)
+        self.assertEqual(rp2RTC.validate_many(years, ones, ones, 0 * ones,
+                                              0 * ones, 0 * ones).tolist(),
+                         [True] * 3)
+
+        # Only integer dtypes are accepted
+        for dtype in (bool, float, object):
+            months = numpy.ones(3, dtype=dtype)
+            result = rp2RTC.validate_many(years, months, ones, 0 * ones,
+                                          0 * ones, 0 * ones)
+            self.assertEqual(result.tolist(), [False] * 3)
+        strings = numpy.array(['1', '1', '1'])
+        self.assertEqual(rp2RTC.validate_many(years, strings, ones, ones, ones,
+                                              ones).tolist(), [False] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()